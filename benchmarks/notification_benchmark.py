@@ -0,0 +1,95 @@
+# Drives check_and_send_birthday_reminders against a local SMTP sink with
+# synthetic members and recipients, under injected SMTP faults and latency.
+#
+#   python -m benchmarks.notification_benchmark --members 5000 --recipients 200
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+from utils.email_service import check_and_send_birthday_reminders, get_last_dispatch, set_email_settings
+from utils.smtp_sink import SMTPSink
+
+SCENARIOS = [
+    ("clean", {}),
+    ("5% temporary failures", {"fail_rate": 0.05}),
+    ("50 ms server latency", {"latency": 0.05}),
+    ("2% dropped connections", {"drop_rate": 0.02})
+]
+
+def synthetic_data(member_count, recipient_count, digest_share, seed=0):
+    """Build members, recipients and departments shaped like the database rows"""
+    rng = random.Random(seed)
+    departments = [{'id': i, 'name': f"Department {i}"} for i in range(1, 9)]
+    today = datetime.now()
+    members = []
+    for i in range(member_count):
+        # Spread birthdays over the year so a few land in every reminder window
+        birthday = today + timedelta(days=rng.randrange(365))
+        if birthday.month == 2 and birthday.day == 29:
+            birthday -= timedelta(days=1)
+        members.append({
+            'id': i,
+            'full_name': f"Member {i:05d}",
+            'birthday': birthday.strftime('%d/%m'),
+            'department_id': rng.choice(departments)['id']
+        })
+    recipients = [
+        {'email': f"recipient{i}@example.com", 'delivery_mode': 'digest' if rng.random() < digest_share else 'individual'}
+        for i in range(recipient_count)
+    ]
+    return members, recipients, departments
+
+def run_scenario(name, faults, data, args):
+    members, recipients, departments = data
+    sink = SMTPSink(keep_in_memory=False, seed=1, **faults).start()
+    set_email_settings({
+        'smtp_server': sink.host,
+        'smtp_port': sink.port,
+        'smtp_security': 'none',
+        'sender_email': 'benchmark@example.com',
+        'dispatch_mode': args.mode,
+        'send_workers': args.workers,
+        'smtp_sessions': args.sessions,
+        'send_rate_per_second': args.rate,
+        'send_retries': args.retries,
+        'send_backoff_seconds': 0.05
+    })
+    try:
+        started = time.perf_counter()
+        message, ok = check_and_send_birthday_reminders(
+            force_send=True, members=members, recipients=recipients, departments=departments, retry_queue=False
+        )
+        latency = time.perf_counter() - started
+    finally:
+        set_email_settings(None)
+        sink.stop()
+    metrics = get_last_dispatch() or {}
+    stats = sink.stats()
+    print(
+        f"{name:<24} {latency:>8.2f} {metrics.get('messages_per_second', 0):>8.1f} "
+        f"{metrics.get('sent', 0):>6} {metrics.get('failed', 0):>6} {metrics.get('retries', 0):>7} "
+        f"{stats['received']:>7} {stats['failed']:>6} {stats['dropped']:>7}  {'ok' if ok else message}"
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark birthday reminder delivery against a local SMTP sink")
+    parser.add_argument("--members", type=int, default=2000)
+    parser.add_argument("--recipients", type=int, default=100)
+    parser.add_argument("--digest-share", type=float, default=0.5, help="Share of recipients on the daily digest")
+    parser.add_argument("--mode", choices=["individual", "bcc"], default="individual")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--sessions", type=int, default=4)
+    parser.add_argument("--rate", type=float, default=1000, help="Send rate limit, messages per second")
+    parser.add_argument("--retries", type=int, default=3)
+    args = parser.parse_args()
+
+    data = synthetic_data(args.members, args.recipients, args.digest_share)
+    print(f"{args.members} members, {args.recipients} recipients, {args.mode} delivery, "
+          f"{args.workers} workers over {args.sessions} sessions")
+    print(f"{'scenario':<24} {'latency':>8} {'msg/s':>8} {'sent':>6} {'failed':>6} {'retries':>7} "
+          f"{'sink ok':>7} {'451s':>6} {'dropped':>7}")
+    for name, faults in SCENARIOS:
+        run_scenario(name, faults, data, args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+# Replays a stretch of reminder decisions on a simulated clock. The scheduler
+# fires each slot's job, check_and_send_birthday_reminders decides and renders,
+# and fake channels capture what would have gone out. Every slot's announcements
+# are checked against the birthdays it should have covered, including 29/02 and
+# the turn of the year.
+#
+#   python -m benchmarks.scheduler_simulation --start 2027-06-01 --days 366 --members 2000
+import argparse
+import calendar
+import random
+import sys
+import time
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+from functools import partial
+from utils.channels import Channel, empty_result
+from utils.email_service import check_and_send_birthday_reminders
+from utils.reminder_schedule import ReminderEngine
+from utils.scheduler import Job, Scheduler
+from scheduled_tasks import REMINDER_GRACE, reminder_job_name
+
+# Birthdays every run includes, on top of the random ones
+EDGE_BIRTHDAYS = ["29/02", "28/02", "01/03", "31/12", "01/01", "02/01"]
+
+class SimulatedClock:
+    """A UTC clock that only moves when told to"""
+
+    def __init__(self, start):
+        self.current = start
+
+    def now(self):
+        return self.current
+
+    def advance(self, delta):
+        self.current += delta
+
+class FakeMailer(Channel):
+    """Records each email notification with the local day it went out"""
+    name = "email"
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.sent = []
+
+    def send(self, notifications):
+        day = self.engine.now().date()
+        self.sent.extend((day, n['subject'], tuple(n['to'])) for n in notifications)
+        return dict(empty_result(self.name), sent=len(notifications), requests=len(notifications))
+
+class FakeWebhook(Channel):
+    """Records the structured windows each slot announced"""
+    name = "webhook"
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.announced = []
+
+    def send(self, notifications):
+        day = self.engine.now().date()
+        for n in notifications:
+            self.announced.append((day, n['data']['time_of_day'], n['data']['windows']))
+        return dict(empty_result(self.name), sent=len(notifications), requests=len(notifications))
+
+def synthetic_members(count, seed=0):
+    """Members with birthdays spread over every day of a leap year, plus the edge cases"""
+    rng = random.Random(seed)
+    days = [date(2028, 1, 1) + timedelta(days=i) for i in range(366)]
+    birthdays = [d.strftime('%d/%m') for d in (rng.choice(days) for _ in range(count))] + EDGE_BIRTHDAYS
+    return [
+        {'id': i, 'full_name': f"Member {i:05d}", 'birthday': birthday, 'department_id': 1}
+        for i, birthday in enumerate(birthdays)
+    ]
+
+def expected_announcements(members, first_day, last_day, slots, horizon_days):
+    """Every (day, slot, member, days_until) a correct run announces, worked out day by day"""
+    by_birthday = {}
+    for member in members:
+        by_birthday.setdefault(member['birthday'], []).append(member['full_name'])
+    expected = set()
+    day = first_day
+    while day <= last_day:
+        for days_until in range(horizon_days + 1):
+            target = day + timedelta(days=days_until)
+            names = list(by_birthday.get(target.strftime('%d/%m'), []))
+            # Leap-day birthdays are kept on 28/02 in common years
+            if (target.month, target.day) == (2, 28) and not calendar.isleap(target.year):
+                names += by_birthday.get("29/02", [])
+            for name in names:
+                for slot in slots:
+                    expected.add((day, slot, name, days_until))
+        day += timedelta(days=1)
+    return expected
+
+def percentile(values, share):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(share * len(ordered)))] if ordered else 0.0
+
+def simulate(args):
+    start = datetime.combine(args.start, datetime.min.time(), tzinfo=timezone.utc)
+    clock = SimulatedClock(start)
+    engine = ReminderEngine(args.timezone, args.slots, clock=clock.now)
+    members = synthetic_members(args.members, args.seed)
+    recipients = [{'email': f"recipient{i}@example.com", 'delivery_mode': 'digest'} for i in range(args.recipients)]
+    departments = [{'id': 1, 'name': "Department 1"}]
+    mailer, webhook = FakeMailer(engine), FakeWebhook(engine)
+    channels = {'email': mailer, 'webhook': webhook}
+
+    def send(slot):
+        message, ok = check_and_send_birthday_reminders(
+            horizon_days=args.horizon, members=members, recipients=recipients, departments=departments,
+            retry_queue=False, time_of_day=slot, engine=engine, channels=channels
+        )
+        if not ok:
+            raise RuntimeError(message)
+        return message
+
+    ran, skipped, failed = [], [], []
+
+    def save_run(name, last_fire_at, last_run_at, last_status, last_message=None):
+        if last_status == "ok":
+            ran.append((name, last_fire_at))
+        elif last_status == "skipped":
+            skipped.append((name, last_fire_at))
+        elif last_status == "failed":
+            failed.append((name, last_fire_at, last_message))
+
+    scheduler = Scheduler(
+        [Job(reminder_job_name(slot), engine.cron(slot), partial(send, slot), misfire_grace=REMINDER_GRACE) for slot, _ in engine.slots],
+        dict, save_run, clock=clock.now
+    )
+
+    # Random outages, during which nothing ticks
+    rng = random.Random(args.seed)
+    end = start + timedelta(days=args.days)
+    outages = []
+    for _ in range(args.outages):
+        down_at = start + timedelta(minutes=rng.randrange(args.days * 24 * 60))
+        outages.append((down_at, down_at + timedelta(hours=rng.uniform(1, args.max_outage_hours))))
+
+    tick = timedelta(minutes=args.tick)
+    idle_cpu, firing_cpu = [], []
+    started = time.perf_counter()
+    while clock.now() < end:
+        if not any(down <= clock.now() < up for down, up in outages):
+            fired = len(mailer.sent) + len(webhook.announced)
+            cpu = time.process_time()
+            scheduler.tick()
+            cpu = time.process_time() - cpu
+            (firing_cpu if len(mailer.sent) + len(webhook.announced) > fired else idle_cpu).append(cpu)
+        clock.advance(tick)
+    wall = time.perf_counter() - started
+
+    # Only days whose every slot fell inside the run are checked
+    first_day = start.astimezone(engine.tz).date() + timedelta(days=1)
+    last_day = end.astimezone(engine.tz).date() - timedelta(days=1)
+    slots = [slot for slot, _ in engine.slots]
+    expected = expected_announcements(members, first_day, last_day, slots, args.horizon)
+    observed = Counter(
+        (day, slot, member['name'], int(days_until))
+        for day, slot, windows in webhook.announced if first_day <= day <= last_day
+        for days_until, window in windows.items()
+        for member in window
+    )
+    missed = expected - set(observed)
+    unexpected = set(observed) - expected
+    duplicates = sum(count - 1 for count in observed.values())
+    excused = {(fire_at.date(), name) for name, fire_at in skipped}
+    birthdays = {m['full_name']: m['birthday'] for m in members}
+
+    def cause(miss):
+        day, slot, name, days_until = miss
+        if (day, reminder_job_name(slot)) in excused:
+            return "outage"
+        if birthdays[name] == "29/02":
+            return "29/02"
+        if (day + timedelta(days=days_until)).year != day.year:
+            return "year boundary"
+        return "other"
+
+    sends_per_day = Counter(day for day, _, _ in mailer.sent)
+    slot_runs_per_day = Counter(fire_at.date() for _, fire_at in ran)
+    days = [first_day + timedelta(days=i) for i in range((last_day - first_day).days + 1)]
+    ticks = idle_cpu + firing_cpu
+    return {
+        'days': len(days),
+        'ticks': len(ticks),
+        'wall_seconds': wall,
+        'cpu_seconds': sum(ticks),
+        'idle_tick_us': 1e6 * sum(idle_cpu) / len(idle_cpu) if idle_cpu else 0.0,
+        'firing_tick_ms': 1e3 * sum(firing_cpu) / len(firing_cpu) if firing_cpu else 0.0,
+        'p95_tick_ms': 1e3 * percentile(ticks, 0.95),
+        'max_tick_ms': 1e3 * max(ticks, default=0.0),
+        'sends_per_day': [sends_per_day[day] for day in days],
+        'days_without_every_slot': sum(1 for day in days if slot_runs_per_day[day] < len(slots)),
+        'expected': len(expected),
+        'missed': Counter(cause(miss) for miss in missed),
+        'unexpected': len(unexpected),
+        'duplicates': duplicates,
+        'skipped_runs': len(skipped),
+        'failed_runs': failed
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay reminder scheduling over simulated time and check every send")
+    parser.add_argument("--start", type=date.fromisoformat, default=date(2026, 6, 1), help="First simulated day (UTC)")
+    parser.add_argument("--days", type=int, default=366)
+    parser.add_argument("--tick", type=float, default=5, help="Simulated minutes per tick")
+    parser.add_argument("--timezone", default="Africa/Accra")
+    parser.add_argument("--slot", dest="slot_list", action="append", metavar="NAME=HH:MM",
+                        help="Reminder slot (repeatable; default morning=09:00 and afternoon=14:00)")
+    parser.add_argument("--members", type=int, default=2000)
+    parser.add_argument("--recipients", type=int, default=20)
+    parser.add_argument("--horizon", type=int, default=3, help="Days ahead reminders look")
+    parser.add_argument("--outages", type=int, default=0, help="Random periods with the scheduler down")
+    parser.add_argument("--max-outage-hours", type=float, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    args.slots = dict(slot.split("=", 1) for slot in args.slot_list) if args.slot_list else None
+
+    report = simulate(args)
+    sends = report['sends_per_day']
+    print(f"{report['days']} days in {args.timezone}, {args.members} members, {args.recipients} recipients, "
+          f"{args.tick:g}-minute ticks, {args.outages} outages")
+    print(f"{report['ticks']} ticks in {report['wall_seconds']:.2f}s wall, {report['cpu_seconds']:.2f}s CPU: "
+          f"{report['idle_tick_us']:.0f} us per idle tick, {report['firing_tick_ms']:.1f} ms per firing tick, "
+          f"p95 {report['p95_tick_ms']:.3f} ms, max {report['max_tick_ms']:.1f} ms")
+    print(f"sends per day: min {min(sends, default=0)}, mean {sum(sends) / max(len(sends), 1):.1f}, max {max(sends, default=0)}; "
+          f"{report['days_without_every_slot']} days missing a slot, {report['skipped_runs']} runs skipped")
+    missed = ", ".join(f"{count} {cause}" for cause, count in sorted(report['missed'].items())) or "none"
+    print(f"{report['expected']} expected announcements: missed {missed}; "
+          f"{report['unexpected']} unexpected, {report['duplicates']} duplicates")
+    for name, fire_at, message in report['failed_runs'][:5]:
+        print(f"failed: {name} at {fire_at}: {message}")
+
+    # Outages are allowed to cost sends; anything else is a regression
+    regressions = sum(count for cause, count in report['missed'].items() if cause != "outage")
+    sys.exit(1 if regressions or report['unexpected'] or report['duplicates'] or report['failed_runs'] else 0)
+
+if __name__ == "__main__":
+    main()
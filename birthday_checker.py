@@ -1,11 +1,17 @@
+import sys
 import streamlit as st
-from utils.email_service import check_and_send_birthday_reminders
+from utils.email_service import check_and_send_birthday_reminders, precompute_reminder_payloads
 from utils.database import init_connection
 
 def main():
     # Initialize database connection
     init_connection()
     
+    if "--precompute" in sys.argv:
+        # Off-peak run: render tomorrow's reminders ahead of their slots
+        st.success(precompute_reminder_payloads())
+        return
+
     # Check and send birthday reminders
     result_message, success = check_and_send_birthday_reminders()
     if success:
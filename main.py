@@ -3,34 +3,18 @@ from utils.auth import init_auth, check_auth, logout, try_login, try_reset_passw
 from utils.database import init_connection, check_users_exist, get_youth_members, get_contributions, get_departments, get_monthly_birthdays
 from utils.auth import check_authentication
 from datetime import datetime, timedelta
-from utils.email_service import check_and_send_birthday_reminders
+from utils.email_service import get_reminder_engine
+from scheduled_tasks import run_scheduled_tasks, reminder_job_name
 
 # Initialize authentication
 init_auth()
 
-# Initialize scheduler state
-if 'last_email_check' not in st.session_state:
-    st.session_state.last_email_check = None
-if 'last_email_status' not in st.session_state:
-    st.session_state.last_email_status = None
-
-# Run birthday reminder check if authenticated
-if st.session_state.authenticated:
-    current_time = datetime.now()
-    current_hour = current_time.hour
-    current_minute = current_time.minute
-    
-    # Check if it's time to send reminders (9 AM or 2 PM)
-    if current_hour in [9, 14] and 0 <= current_minute < 5:
-        # Only send if we haven't sent in the last 4 minutes
-        if (st.session_state.last_email_check is None or 
-            current_time - st.session_state.last_email_check > timedelta(minutes=4)):
-            try:
-                message, success = check_and_send_birthday_reminders()
-                st.session_state.last_email_check = current_time
-                st.session_state.last_email_status = f"{'✅' if success else '❌'} {message}"
-            except Exception as e:
-                st.session_state.last_email_status = f"❌ Error: {str(e)}"
+# Start the background scheduler; it fires reminders at their slot times whether or not anyone is on a page
+try:
+    scheduler = run_scheduled_tasks()
+except Exception as e:
+    scheduler = None
+    print(f"Error starting scheduler: {str(e)}")
 
 # Page config
 st.set_page_config(
@@ -178,24 +162,28 @@ if st.session_state.authenticated:
         # Add birthday reminder status
         st.markdown("---")
         st.markdown("#### 🎂 Birthday Reminders")
-        st.markdown("""
-            Scheduled times:
-            - 🌅 9:00 AM
-            - 🌇 2:00 PM
-        """)
+        engine = get_reminder_engine()
+        st.markdown("Scheduled times:\n" + "\n".join(
+            f"- {'🌅' if at.hour < 12 else '🌇'} {at.strftime('%I:%M %p').lstrip('0')}" for _, at in engine.slots
+        ))
+        st.caption(f"Times are in {engine.tz}")
         
-        if st.session_state.last_email_check:
-            st.markdown("**Last Check:**")
-            st.info(st.session_state.last_email_check.strftime("%Y-%m-%d %H:%M:%S"))
-            
-        if st.session_state.last_email_status:
-            st.markdown("**Status:**")
-            if "✅" in st.session_state.last_email_status:
-                st.success(st.session_state.last_email_status)
-            elif "❌" in st.session_state.last_email_status:
-                st.error(st.session_state.last_email_status)
-            else:
-                st.info(st.session_state.last_email_status)
+        if scheduler is not None:
+            reminder_jobs = {reminder_job_name(slot) for slot, _ in engine.slots}
+            reminder_runs = [job for job in scheduler.status() if job['name'] in reminder_jobs]
+            last_run = max((job for job in reminder_runs if job['last_run_at']), key=lambda job: job['last_run_at'], default=None)
+            if last_run:
+                st.markdown("**Last Check:**")
+                st.info(last_run['last_run_at'].strftime("%Y-%m-%d %H:%M:%S"))
+                st.markdown("**Status:**")
+                status = f"{last_run['last_status']}: {last_run['last_message'] or 'no details'}"
+                if last_run['last_status'] == "ok":
+                    st.success(f"✅ {status}")
+                elif last_run['last_status'] == "failed":
+                    st.error(f"❌ {status}")
+                else:
+                    st.info(status)
+            st.caption(f"Next run: {min(job['next_run_at'] for job in reminder_runs).strftime('%Y-%m-%d %H:%M')}")
         
         # Add some space before logout button
         st.write("")
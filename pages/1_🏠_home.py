@@ -1,5 +1,6 @@
 import streamlit as st
-from utils.database import init_connection, get_youth_members, get_contributions, get_monthly_birthdays, get_departments
+from utils.database import init_connection, get_youth_members, get_contributions, get_monthly_birthdays, get_departments, get_data_version
+from utils.charts import plot_cached
 import pandas as pd
 from datetime import datetime
 import plotly.express as px
@@ -29,6 +30,7 @@ all_contributions = get_contributions()
 # Get departments for mapping
 departments = get_departments()
 dept_mapping = {dept['id']: dept['name'] for dept in departments}
+data_version = get_data_version("youth_members", "contributions", "departments")
 
 # Create columns for different metrics
 col1, col2, col3 = st.columns(3)
@@ -54,16 +56,18 @@ with chart_col1:
     # Department Distribution Pie Chart
     st.subheader("Members by Department")
     if all_members:
-        df = pd.DataFrame(all_members)
-        dept_counts = df['department_id'].apply(lambda x: dept_mapping.get(x, 'No Department')).value_counts()
-        fig = px.pie(
-            values=dept_counts.values,
-            names=dept_counts.index,
-            hole=0.3,
-            color_discrete_sequence=CUSTOM_COLORS
-        )
-        fig.update_traces(textinfo='percent+label')
-        st.plotly_chart(fig, use_container_width=True)
+        def build_department_pie():
+            df = pd.DataFrame(all_members)
+            dept_counts = df['department_id'].apply(lambda x: dept_mapping.get(x, 'No Department')).value_counts()
+            fig = px.pie(
+                values=dept_counts.values,
+                names=dept_counts.index,
+                hole=0.3,
+                color_discrete_sequence=CUSTOM_COLORS
+            )
+            fig.update_traces(textinfo='percent+label')
+            return fig
+        plot_cached("home.members_by_department", data_version, (), build_department_pie)
     else:
         st.info("No member data available")
 
@@ -71,23 +75,25 @@ with chart_col2:
     # Monthly Contribution Trends
     st.subheader("Monthly Contribution Trends")
     if all_contributions:
-        contrib_df = pd.DataFrame(all_contributions)
-        contrib_df['month'] = pd.to_datetime(contrib_df['payment_date']).dt.strftime('%B %Y')
-        monthly_totals = contrib_df.groupby('month')['amount'].sum().reset_index()
-        fig = px.bar(
-            monthly_totals,
-            x='month',
-            y='amount',
-            title='Total Contributions by Month',
-            labels={'amount': 'Amount (GH₵)', 'month': 'Month'},
-            color_discrete_sequence=['#BE61CA']
-        )
-        fig.update_layout(
-            plot_bgcolor='rgba(0,0,0,0)',
-            yaxis_gridcolor='rgba(128,128,128,0.1)',
-            showlegend=False
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        def build_monthly_trends():
+            contrib_df = pd.DataFrame(all_contributions)
+            contrib_df['month'] = pd.to_datetime(contrib_df['payment_date']).dt.strftime('%B %Y')
+            monthly_totals = contrib_df.groupby('month')['amount'].sum().reset_index()
+            fig = px.bar(
+                monthly_totals,
+                x='month',
+                y='amount',
+                title='Total Contributions by Month',
+                labels={'amount': 'Amount (GH₵)', 'month': 'Month'},
+                color_discrete_sequence=['#BE61CA']
+            )
+            fig.update_layout(
+                plot_bgcolor='rgba(0,0,0,0)',
+                yaxis_gridcolor='rgba(128,128,128,0.1)',
+                showlegend=False
+            )
+            return fig
+        plot_cached("home.monthly_trends", data_version, (), build_monthly_trends)
     else:
         st.info("No contribution data available")
 
@@ -97,30 +103,37 @@ if current_month_birthdays:
     birthday_df = pd.DataFrame(current_month_birthdays)
     
     # Create birthday distribution bar chart
-    birthday_counts = birthday_df['birthday'].apply(lambda x: int(x.split('/')[0])).value_counts().sort_index()
-    
-    # Get month length
-    month_length = calendar.monthrange(datetime.now().year, current_month)[1]
-    
-    # Create a complete date range for the month
-    all_days = pd.Series(range(1, month_length + 1))
-    birthday_counts = birthday_counts.reindex(all_days).fillna(0)
-    
-    fig = px.bar(
-        x=birthday_counts.index,
-        y=birthday_counts.values,
-        title="Birthday Distribution",
-        labels={'x': 'Day of Month', 'y': 'Number of Birthdays'},
-        color_discrete_sequence=['#F13C59']
-    )
-    fig.update_xaxes(tickmode='linear', dtick=1)
-    fig.update_layout(
-        bargap=0.2,
-        plot_bgcolor='rgba(0,0,0,0)',
-        yaxis_gridcolor='rgba(128,128,128,0.1)',
-        showlegend=False
+    def build_birthday_distribution():
+        birthday_counts = birthday_df['birthday'].apply(lambda x: int(x.split('/')[0])).value_counts().sort_index()
+        
+        # Get month length
+        month_length = calendar.monthrange(datetime.now().year, current_month)[1]
+        
+        # Create a complete date range for the month
+        all_days = pd.Series(range(1, month_length + 1))
+        birthday_counts = birthday_counts.reindex(all_days).fillna(0)
+        
+        fig = px.bar(
+            x=birthday_counts.index,
+            y=birthday_counts.values,
+            title="Birthday Distribution",
+            labels={'x': 'Day of Month', 'y': 'Number of Birthdays'},
+            color_discrete_sequence=['#F13C59']
+        )
+        fig.update_xaxes(tickmode='linear', dtick=1)
+        fig.update_layout(
+            bargap=0.2,
+            plot_bgcolor='rgba(0,0,0,0)',
+            yaxis_gridcolor='rgba(128,128,128,0.1)',
+            showlegend=False
+        )
+        return fig
+    plot_cached(
+        "home.birthday_distribution",
+        data_version,
+        (datetime.now().year, current_month),
+        build_birthday_distribution
     )
-    st.plotly_chart(fig, use_container_width=True)
     
     # Birthday list
     st.subheader("Birthday List")
@@ -141,24 +154,26 @@ if all_contributions:
     recent_df['member_name'] = recent_df['youth_members'].apply(lambda x: x['full_name'])
     
     # Line chart for contribution trends
-    fig = go.Figure()
-    fig.add_trace(go.Scatter(
-        x=pd.to_datetime(recent_df['payment_date']),
-        y=recent_df['amount'].cumsum(),
-        mode='lines+markers',
-        name='Cumulative Amount',
-        line=dict(color='#633EBB', width=3),
-        marker=dict(color='#BE61CA', size=8)
-    ))
-    fig.update_layout(
-        title='Contribution Trend (Last 10 Contributions)',
-        xaxis_title='Date',
-        yaxis_title='Cumulative Amount (GH₵)',
-        plot_bgcolor='rgba(0,0,0,0)',
-        yaxis_gridcolor='rgba(128,128,128,0.1)',
-        xaxis_gridcolor='rgba(128,128,128,0.1)'
-    )
-    st.plotly_chart(fig, use_container_width=True)
+    def build_recent_trend():
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(
+            x=pd.to_datetime(recent_df['payment_date']),
+            y=recent_df['amount'].cumsum(),
+            mode='lines+markers',
+            name='Cumulative Amount',
+            line=dict(color='#633EBB', width=3),
+            marker=dict(color='#BE61CA', size=8)
+        ))
+        fig.update_layout(
+            title='Contribution Trend (Last 10 Contributions)',
+            xaxis_title='Date',
+            yaxis_title='Cumulative Amount (GH₵)',
+            plot_bgcolor='rgba(0,0,0,0)',
+            yaxis_gridcolor='rgba(128,128,128,0.1)',
+            xaxis_gridcolor='rgba(128,128,128,0.1)'
+        )
+        return fig
+    plot_cached("home.recent_trend", data_version, (), build_recent_trend)
     
     # Recent contributions table - only visible to admins
     if is_admin():
@@ -1,11 +1,30 @@
 import streamlit as st
-from utils.database import init_connection, get_contributions, get_youth_members
+from utils.database import (
+    init_connection,
+    get_contributions,
+    get_youth_members,
+    get_data_version,
+    get_contributions_page,
+    get_contribution_defaulters,
+    get_defaulters_by_department,
+    get_compliance_matrix,
+    get_departments
+)
 from utils.auth import is_admin
+from utils.charts import plot_cached
+from utils.compliance import get_compliance_engine
+from utils.ledger import get_contribution_ledger
+from utils.export import cached_export, download_export, write_contributions_report, XLSX_MIME
+from utils.reports import get_monthly_report, get_department_reports
+from utils.payment_reminders import start_payment_reminders, get_payment_reminder_job
+from utils.email_service import get_channels
+from utils.components import paginated_table, contributions_frame, member_picker
 import pandas as pd
 from datetime import datetime, timedelta
+import calendar
+import time
 import plotly.express as px
 import plotly.graph_objects as go
-import io
 
 # Define custom color scheme
 CUSTOM_COLORS = ['#F13C59', '#BE61CA', '#633EBB']
@@ -16,304 +35,536 @@ st.title("Contribution Tracker")
 # Get all data
 all_members = get_youth_members()
 all_contributions = get_contributions()
+data_version = get_data_version("contributions", "youth_members")
 
-# Contribution type selector
-contribution_type = st.selectbox(
-    "Select Contribution Type",
-    ["All", "BIRTHDAY", "PROJECT", "EVENT"]
-)
-
-# Date filters
-col1, col2 = st.columns(2)
-with col1:
-    start_date = st.date_input("Start Date", 
-                              value=datetime.now().date() - timedelta(days=30))
-with col2:
-    end_date = st.date_input("End Date", 
-                            value=datetime.now().date())
-
-# Add after the date filters
-payment_status = st.selectbox(
-    "Payment Status",
-    ["All", "Paid", "Pending", "Overdue"]
-)
+@st.cache_data(ttl=5, show_spinner=False)
+def build_contributions_frame(_contributions, version):
+    """Build the base contributions DataFrame once per data version"""
+    df = pd.DataFrame(_contributions)
+    if 'payment_date' in df.columns:
+        df['payment_date'] = pd.to_datetime(df['payment_date'])
+        df['member_name'] = df['youth_members'].apply(lambda x: x['full_name'])
+    return df
 
-# Add payment reminder button
-if st.button("Send Payment Reminders"):
-    # Implement SMS/Email reminder functionality
-    st.info("Payment reminders sent successfully!")
-
-# Check if there are any contributions
-if all_contributions:
-    # Convert contributions to DataFrame
-    df = pd.DataFrame(all_contributions)
-    
-    # Apply filters
+@st.cache_data(ttl=5, show_spinner=False)
+def filter_contributions(_base_df, version, contribution_type, start_date, end_date):
+    """Apply the type and date filters to the base contributions DataFrame"""
+    df = _base_df
     if contribution_type != "All":
         df = df[df['contribution_type'] == contribution_type]
+    df = df[
+        (df['payment_date'].dt.date >= start_date) &
+        (df['payment_date'].dt.date <= end_date)
+    ]
+    return df.copy()
 
-    if 'payment_date' in df.columns:
-        df['payment_date'] = pd.to_datetime(df['payment_date'])
-        df = df[
-            (df['payment_date'].dt.date >= start_date) &
-            (df['payment_date'].dt.date <= end_date)
-        ]
-
-        # Display contribution summary
-        st.subheader("Contribution Summary")
-        if not df.empty:
-            total_amount = df['amount'].sum()
-            total_contributors = df['member_id'].nunique()
-            
-            summary_col1, summary_col2 = st.columns(2)
-            with summary_col1:
-                st.metric("Total Amount Collected", f"GH₵{total_amount:,.2f}")
-            with summary_col2:
-                st.metric("Total Contributors", total_contributors)
-            
-            # Contribution Trends Chart
-            st.subheader("Contribution Trends")
-            daily_totals = df.groupby(df['payment_date'].dt.date)['amount'].sum().reset_index()
-            fig = go.Figure()
-            fig.add_trace(go.Scatter(
-                x=daily_totals['payment_date'],
-                y=daily_totals['amount'],
-                mode='lines+markers',
-                name='Daily Total',
-                line=dict(color='#633EBB', width=3),
-                marker=dict(color='#BE61CA', size=8)
-            ))
-            fig.update_layout(
-                title='Daily Contribution Trends',
-                xaxis_title='Date',
-                yaxis_title='Amount (GH₵)',
-                plot_bgcolor='rgba(0,0,0,0)',
-                yaxis_gridcolor='rgba(128,128,128,0.1)',
-                xaxis_gridcolor='rgba(128,128,128,0.1)'
+@st.cache_data(ttl=5, show_spinner=False)
+def build_payment_status(_members, _contributions, version, contribution_type, year, month):
+    """Classify every member as Paid, Pending or Overdue for the year's dues of a type
+
+    Paid members have paid this month; Pending ones owe only this month;
+    Overdue ones also missed an earlier month of the year.
+    """
+    paid_months = {}
+    for c in _contributions:
+        if contribution_type != "All" and c['contribution_type'] != contribution_type:
+            continue
+        paid_on = str(c['payment_date'])
+        if int(paid_on[:4]) == year:
+            paid_months.setdefault(c['member_id'], set()).add(int(paid_on[5:7]))
+    rows = []
+    for member in _members:
+        paid = paid_months.get(member['id'], set())
+        unpaid = [m for m in range(1, month + 1) if m not in paid]
+        if month in paid:
+            status = "Paid"
+        elif len(unpaid) > 1:
+            status = "Overdue"
+        else:
+            status = "Pending"
+        rows.append({'Name': member['full_name'], 'Status': status, f'Months Unpaid ({year})': len(unpaid)})
+    return pd.DataFrame(rows, columns=['Name', 'Status', f'Months Unpaid ({year})'])
+
+@st.fragment
+def payment_reminder_controls():
+    """Payment reminder button and progress, rerun on their own"""
+    # Reminders go to this month's defaulters for the chosen contribution type
+    now = datetime.now()
+    reminder_type = st.selectbox("Remind Defaulters Of", ["BIRTHDAY", "PROJECT", "EVENT"])
+    job = get_payment_reminder_job(now.month, now.year, reminder_type)
+    running = job is not None and not job.done
+
+    if st.button("Send Payment Reminders", disabled=running):
+        # The run continues in the background; this fragment only polls it
+        job = start_payment_reminders(now.month, now.year, reminder_type, get_channels())
+        running = True
+
+    if job is not None:
+        progress = job.progress()
+        st.progress(
+            progress['fraction'],
+            text=f"{progress['processed']} of {progress['total']} defaulters processed"
+        )
+        st.caption(
+            f"{progress['reminded']} reminded, {progress['no_contact']} without contact details · "
+            f"{progress['sent']} messages sent, {progress['failed']} failed · "
+            f"{progress['messages_per_second']} messages/second over {progress['elapsed_seconds']}s"
+        )
+        if progress['status'] == "failed":
+            st.error(f"Payment reminders stopped: {progress['error']}")
+        elif progress['status'] == "finished":
+            if progress['total']:
+                st.success(f"Payment reminders sent to {progress['reminded']} of {progress['total']} defaulters.")
+            else:
+                st.info(f"Every {reminder_type.lower()} defaulter has already been reminded this month.")
+        elif running:
+            time.sleep(1)
+            st.rerun(scope="fragment")
+
+def contribution_summary(df, filters):
+    """Totals, daily trends and month-over-month growth for the filtered contributions"""
+    st.subheader("Contribution Summary")
+    total_amount = df['amount'].sum()
+    total_contributors = df['member_id'].nunique()
+
+    summary_col1, summary_col2 = st.columns(2)
+    with summary_col1:
+        st.metric("Total Amount Collected", f"GH₵{total_amount:,.2f}")
+    with summary_col2:
+        st.metric("Total Contributors", total_contributors)
+
+    # Contribution Trends Chart
+    st.subheader("Contribution Trends")
+    def build_daily_trends():
+        daily_totals = df.groupby(df['payment_date'].dt.date)['amount'].sum().reset_index()
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(
+            x=daily_totals['payment_date'],
+            y=daily_totals['amount'],
+            mode='lines+markers',
+            name='Daily Total',
+            line=dict(color='#633EBB', width=3),
+            marker=dict(color='#BE61CA', size=8)
+        ))
+        fig.update_layout(
+            title='Daily Contribution Trends',
+            xaxis_title='Date',
+            yaxis_title='Amount (GH₵)',
+            plot_bgcolor='rgba(0,0,0,0)',
+            yaxis_gridcolor='rgba(128,128,128,0.1)',
+            xaxis_gridcolor='rgba(128,128,128,0.1)'
+        )
+        return fig
+    plot_cached("tracker.daily_trends", data_version, filters, build_daily_trends)
+
+    # Add after the contribution trends
+    st.subheader("Comparative Analysis")
+    compare_col1, compare_col2 = st.columns(2)
+
+    with compare_col1:
+        # Month-over-Month comparison
+        current_month = datetime.now().month
+        current_month_total = df[df['payment_date'].dt.month == current_month]['amount'].sum()
+        prev_month_total = df[df['payment_date'].dt.month == (current_month - 1)]['amount'].sum()
+        change = ((current_month_total - prev_month_total) / prev_month_total * 100) if prev_month_total > 0 else 0
+        st.metric(
+            "Month-over-Month Growth",
+            f"GH₵{current_month_total:,.2f}",
+            f"{change:+.1f}%"
+        )
+
+def contribution_distribution(df, filters):
+    """Type breakdown and top contributors for the filtered contributions"""
+    contribution_type, start_date, end_date = filters
+    st.subheader("Contribution Distribution")
+    chart_col1, chart_col2 = st.columns(2)
+
+    with chart_col1:
+        # Pie chart by contribution type
+        def build_type_distribution():
+            type_totals = df.groupby('contribution_type')['amount'].sum()
+            fig = px.pie(
+                values=type_totals.values,
+                names=type_totals.index,
+                title='Distribution by Contribution Type',
+                hole=0.3,
+                color_discrete_sequence=CUSTOM_COLORS
             )
-            st.plotly_chart(fig, use_container_width=True)
-            
-            # Add after the contribution trends
-            st.subheader("Comparative Analysis")
-            compare_col1, compare_col2 = st.columns(2)
-
-            with compare_col1:
-                # Month-over-Month comparison
-                current_month = datetime.now().month
-                current_month_total = df[df['payment_date'].dt.month == current_month]['amount'].sum()
-                prev_month_total = df[df['payment_date'].dt.month == (current_month - 1)]['amount'].sum()
-                change = ((current_month_total - prev_month_total) / prev_month_total * 100) if prev_month_total > 0 else 0
-                st.metric(
-                    "Month-over-Month Growth", 
-                    f"GH₵{current_month_total:,.2f}",
-                    f"{change:+.1f}%"
+            fig.update_traces(textinfo='percent+label')
+            return fig
+        plot_cached("tracker.type_distribution", data_version, filters, build_type_distribution)
+
+    with chart_col2:
+        if is_admin():
+            # Top contributors bar chart
+            def build_top_contributors():
+                ledger = get_contribution_ledger(all_contributions, data_version)
+                top_contributors = ledger.top_contributors(
+                    5, None if contribution_type == "All" else contribution_type, start_date, end_date
                 )
-            
-            # Contribution Distribution
-            st.subheader("Contribution Distribution")
-            chart_col1, chart_col2 = st.columns(2)
-            
-            with chart_col1:
-                # Pie chart by contribution type
-                type_totals = df.groupby('contribution_type')['amount'].sum()
-                fig = px.pie(
-                    values=type_totals.values,
-                    names=type_totals.index,
-                    title='Distribution by Contribution Type',
-                    hole=0.3,
-                    color_discrete_sequence=CUSTOM_COLORS
+                # Members can share a name, so tell them apart by ID
+                names = [row['full_name'] for row in top_contributors]
+                labels = [
+                    f"{row['full_name']} (#{row['member_id']})" if names.count(row['full_name']) > 1 else row['full_name']
+                    for row in top_contributors
+                ]
+
+                fig = px.bar(
+                    x=labels,
+                    y=[row['total'] for row in top_contributors],
+                    title='Top 5 Contributors',
+                    labels={'y': 'Amount (GH₵)', 'x': 'Member'},
+                    color_discrete_sequence=['#BE61CA']
                 )
-                fig.update_traces(textinfo='percent+label')
-                st.plotly_chart(fig, use_container_width=True)
-            
-            with chart_col2:
-                if is_admin():
-                    # Top contributors bar chart
-                    top_contributors = df.groupby('member_id').agg({
-                        'amount': 'sum',
-                        'youth_members': lambda x: x.iloc[0]['full_name']
-                    }).nlargest(5, 'amount')
-                    
-                    fig = px.bar(
-                        top_contributors,
-                        x='youth_members',
-                        y='amount',
-                        title='Top 5 Contributors',
-                        labels={'amount': 'Amount (GH₵)', 'youth_members': 'Member'},
-                        color_discrete_sequence=['#BE61CA']
-                    )
-                    fig.update_layout(
-                        plot_bgcolor='rgba(0,0,0,0)',
-                        yaxis_gridcolor='rgba(128,128,128,0.1)',
-                        showlegend=False,
-                        xaxis_tickangle=-45
-                    )
-                    st.plotly_chart(fig, use_container_width=True)
-                else:
-                    st.warning("⚠️ Top contributors information is only visible to administrators.")
-            
-            # Weekly contribution heatmap
-            st.subheader("Weekly Contribution Pattern")
-            df['weekday'] = df['payment_date'].dt.day_name()
-            df['week'] = df['payment_date'].dt.isocalendar().week
-            weekly_pattern = df.pivot_table(
-                values='amount',
-                index='week',
-                columns='weekday',
-                aggfunc='sum',
-                fill_value=0
+                fig.update_layout(
+                    plot_bgcolor='rgba(0,0,0,0)',
+                    yaxis_gridcolor='rgba(128,128,128,0.1)',
+                    showlegend=False,
+                    xaxis_tickangle=-45
+                )
+                return fig
+            plot_cached("tracker.top_contributors", data_version, filters, build_top_contributors)
+        else:
+            st.warning("⚠️ Top contributors information is only visible to administrators.")
+
+def weekly_heatmap(df, filters):
+    """Weekday by week heatmap of the filtered contributions"""
+    st.subheader("Weekly Contribution Pattern")
+    def build_weekly_heatmap():
+        weekly_pattern = df.assign(
+            weekday=df['payment_date'].dt.day_name(),
+            week=df['payment_date'].dt.isocalendar().week
+        ).pivot_table(
+            values='amount',
+            index='week',
+            columns='weekday',
+            aggfunc='sum',
+            fill_value=0
+        )
+
+        fig = px.imshow(
+            weekly_pattern,
+            labels=dict(color="Amount (GH₵)"),
+            title="Weekly Contribution Heatmap",
+            color_continuous_scale=CUSTOM_COLORSCALE
+        )
+        fig.update_layout(
+            plot_bgcolor='rgba(0,0,0,0)'
+        )
+        return fig
+    plot_cached("tracker.weekly_heatmap", data_version, filters, build_weekly_heatmap)
+
+@st.fragment
+def contribution_records(filters):
+    """Paginated records, rerun on their own when paging or sorting"""
+    contribution_type, start_date, end_date = filters
+    # Filters are pushed down so only the visible page is fetched
+    paginated_table(
+        "contribution_records",
+        lambda after, limit, sort_by, descending: get_contributions_page(
+            after, limit, sort_by, descending,
+            contribution_type=contribution_type,
+            start_date=start_date,
+            end_date=end_date
+        ),
+        contributions_frame,
+        sort_options={"Date": "payment_date", "Amount": "amount"},
+        filters=filters,
+        version=data_version
+    )
+
+@st.fragment
+def member_contribution_analysis(contribution_type, start_date, end_date):
+    """Member metrics, rerun only when the selected member changes"""
+    selected_member = member_picker("Search Member", "analysis_member")
+
+    if selected_member:
+        # Range and lifetime totals come from the member's running-total ledger
+        ledger = get_contribution_ledger(all_contributions, data_version)
+        type_filter = None if contribution_type == "All" else contribution_type
+        period = ledger.summary(selected_member['id'], type_filter, start_date, end_date)
+        lifetime = ledger.summary(selected_member['id'], type_filter)
+
+        # Member metrics
+        metric_col1, metric_col2, metric_col3 = st.columns(3)
+        with metric_col1:
+            st.metric("Total Contributed", f"GH₵{period['total']:,.2f}")
+        with metric_col2:
+            st.metric("Number of Contributions", period['count'])
+        with metric_col3:
+            st.metric("Average Contribution", f"GH₵{period['average']:,.2f}")
+        st.caption(
+            f"Lifetime: GH₵{lifetime['total']:,.2f} across {lifetime['count']} contributions "
+            f"(average GH₵{lifetime['average']:,.2f})"
+        )
+
+@st.fragment
+def contribution_goals(df):
+    """Monthly goal progress, rerun only when the goal changes"""
+    goal_col1, goal_col2 = st.columns(2)
+
+    with goal_col1:
+        monthly_goal = st.number_input("Monthly Goal (GH₵)", min_value=0.0, step=100.0)
+        if monthly_goal > 0:
+            current_month = datetime.now().month
+            monthly_total = df[df['payment_date'].dt.month == current_month]['amount'].sum()
+            progress = (monthly_total / monthly_goal) * 100
+            st.progress(min(progress/100, 1.0))
+            st.text(f"Progress: GH₵{monthly_total:,.2f} / GH₵{monthly_goal:,.2f} ({progress:.1f}%)")
+
+def birthday_compliance():
+    """This month's birthday defaulters and the year's compliance, independent of the date filters"""
+    st.subheader("Birthday Contribution Analysis")
+
+    # Defaulters are computed in the database as an anti-join
+    current_month = datetime.now().month
+    current_year = datetime.now().year
+    compliance_version = get_data_version("contributions", "youth_members", "departments")
+
+    dept_summary = get_defaulters_by_department(current_month, current_year, "BIRTHDAY")
+    defaulters = get_contribution_defaulters(current_month, current_year, "BIRTHDAY")
+
+    # Create metrics for compliance
+    total_members = sum(row['member_count'] for row in dept_summary)
+    defaulter_count = sum(row['defaulter_count'] for row in dept_summary)
+    compliance_rate = ((total_members - defaulter_count) / total_members * 100) if total_members > 0 else 0
+
+    metrics_col1, metrics_col2, metrics_col3 = st.columns(3)
+    with metrics_col1:
+        st.metric("Total Members", total_members)
+    with metrics_col2:
+        st.metric("Defaulters", defaulter_count)
+    with metrics_col3:
+        st.metric("Compliance Rate", f"{compliance_rate:.1f}%")
+
+    # Monthly compliance for the year, from the members x months matrix
+    if total_members > 0:
+        def build_monthly_compliance():
+            matrix = pd.DataFrame(
+                get_compliance_matrix(current_year, "BIRTHDAY"),
+                columns=['member_id', 'month', 'payments', 'total_amount']
             )
-            
-            fig = px.imshow(
-                weekly_pattern,
-                labels=dict(color="Amount (GH₵)"),
-                title="Weekly Contribution Heatmap",
-                color_continuous_scale=CUSTOM_COLORSCALE
+            payers = matrix.groupby('month')['member_id'].nunique()\
+                .reindex(range(1, current_month + 1), fill_value=0)
+            fig = px.bar(
+                x=[datetime(current_year, m, 1).strftime('%B') for m in payers.index],
+                y=payers.values / total_members * 100,
+                title=f"Monthly Compliance Rate ({current_year})",
+                labels={'x': 'Month', 'y': 'Compliance (%)'},
+                color_discrete_sequence=['#633EBB']
             )
             fig.update_layout(
-                plot_bgcolor='rgba(0,0,0,0)'
+                plot_bgcolor='rgba(0,0,0,0)',
+                yaxis_gridcolor='rgba(128,128,128,0.1)',
+                yaxis_range=[0, 100],
+                showlegend=False
             )
-            st.plotly_chart(fig, use_container_width=True)
-            
-            # Detailed contribution records
-            st.subheader("Contribution Records")
-            if is_admin():
-                df['member_name'] = df['youth_members'].apply(lambda x: x['full_name'])
-                display_df = df[['member_name', 'amount', 'contribution_type', 'payment_date', 'week_number']]
-                display_df.columns = ['Member', 'Amount (GH₵)', 'Type', 'Date', 'Week']
-                st.dataframe(display_df, use_container_width=True)
-            else:
-                st.warning("⚠️ Detailed contribution records are only visible to administrators.")
-
-            # Member Contribution Analysis
-            st.subheader("Member Contribution Analysis")
-            if is_admin():
-                selected_member = st.selectbox(
-                    "Select Member",
-                    options=[member['full_name'] for member in all_members]
-                )
+            return fig
+        plot_cached(
+            "tracker.monthly_compliance",
+            compliance_version,
+            (current_month, current_year),
+            build_monthly_compliance
+        )
 
-                if selected_member:
-                    member_contributions = df[df['member_name'] == selected_member]
-                    
-                    # Member metrics
-                    total_contributed = member_contributions['amount'].sum()
-                    contribution_count = len(member_contributions)
-                    avg_contribution = total_contributed / contribution_count if contribution_count > 0 else 0
-                    
-                    metric_col1, metric_col2, metric_col3 = st.columns(3)
-                    with metric_col1:
-                        st.metric("Total Contributed", f"GH₵{total_contributed:,.2f}")
-                    with metric_col2:
-                        st.metric("Number of Contributions", contribution_count)
-                    with metric_col3:
-                        st.metric("Average Contribution", f"GH₵{avg_contribution:,.2f}")
-            else:
-                st.warning("⚠️ Member contribution analysis is only visible to administrators.")
-
-            # Contribution Goals
-            st.subheader("Contribution Goals")
-            if is_admin():
-                goal_col1, goal_col2 = st.columns(2)
-
-                with goal_col1:
-                    monthly_goal = st.number_input("Monthly Goal (GH₵)", min_value=0.0, step=100.0)
-                    if monthly_goal > 0:
-                        current_month = datetime.now().month
-                        monthly_total = df[df['payment_date'].dt.month == current_month]['amount'].sum()
-                        progress = (monthly_total / monthly_goal) * 100
-                        st.progress(min(progress/100, 1.0))
-                        st.text(f"Progress: GH₵{monthly_total:,.2f} / GH₵{monthly_goal:,.2f} ({progress:.1f}%)")
-            else:
-                st.warning("⚠️ Contribution goals management is only visible to administrators.")
-
-            # Defaulters Analysis
-            if contribution_type == "BIRTHDAY":
-                st.subheader("Birthday Contribution Analysis")
-                
-                # Get defaulters
-                current_month = datetime.now().month
-                current_year = datetime.now().year
-                
-                monthly_contributors = set(
-                    df[
-                        (df['contribution_type'] == 'BIRTHDAY') &
-                        (df['payment_date'].dt.month == current_month) &
-                        (df['payment_date'].dt.year == current_year)
-                    ]['member_id'].unique()
-                )
-                
-                defaulters = [
-                    member for member in all_members 
-                    if member['id'] not in monthly_contributors
-                ]
-                
-                # Create metrics for compliance
-                total_members = len(all_members)
-                defaulter_count = len(defaulters)
-                compliance_rate = ((total_members - defaulter_count) / total_members * 100) if total_members > 0 else 0
-                
-                metrics_col1, metrics_col2, metrics_col3 = st.columns(3)
-                with metrics_col1:
-                    st.metric("Total Members", total_members)
-                with metrics_col2:
-                    st.metric("Defaulters", defaulter_count)
-                with metrics_col3:
-                    st.metric("Compliance Rate", f"{compliance_rate:.1f}%")
-                
-                if defaulters:
-                    defaulter_df = pd.DataFrame(defaulters)
-                    
-                    # Defaulters by department
-                    dept_defaulters = defaulter_df['departments'].apply(lambda x: x['name'] if x else 'No Department').value_counts()
-                    fig = px.bar(
-                        x=dept_defaulters.index,
-                        y=dept_defaulters.values,
-                        title="Defaulters by Department",
-                        labels={'x': 'Department', 'y': 'Number of Defaulters'},
-                        color_discrete_sequence=['#F13C59']
-                    )
-                    fig.update_layout(
-                        plot_bgcolor='rgba(0,0,0,0)',
-                        yaxis_gridcolor='rgba(128,128,128,0.1)',
-                        showlegend=False,
-                        xaxis_tickangle=-45
+    if defaulters:
+        # Defaulters by department
+        def build_defaulters_by_department():
+            dept_defaulters = [row for row in dept_summary if row['defaulter_count'] > 0]
+            fig = px.bar(
+                x=[row['department_name'] for row in dept_defaulters],
+                y=[row['defaulter_count'] for row in dept_defaulters],
+                title="Defaulters by Department",
+                labels={'x': 'Department', 'y': 'Number of Defaulters'},
+                color_discrete_sequence=['#F13C59']
+            )
+            fig.update_layout(
+                plot_bgcolor='rgba(0,0,0,0)',
+                yaxis_gridcolor='rgba(128,128,128,0.1)',
+                showlegend=False,
+                xaxis_tickangle=-45
+            )
+            return fig
+        plot_cached(
+            "tracker.defaulters_by_department",
+            compliance_version,
+            (current_month, current_year),
+            build_defaulters_by_department
+        )
+
+        # Display defaulters list
+        st.subheader("Defaulters List")
+        display_df = pd.DataFrame(defaulters)[['full_name', 'department_name', 'phone_number']]
+        display_df.columns = ['Name', 'Department', 'Phone']
+        st.dataframe(display_df, use_container_width=True)
+    else:
+        st.success("No defaulters this month!")
+
+    # Streaks and arrears from the shared bit-packed compliance matrix
+    st.subheader("Payment Streaks & Arrears")
+    summary = get_compliance_engine().member_summary("BIRTHDAY", current_year, current_month)
+    in_arrears = [row for row in summary if row['arrears'] > 0]
+    if in_arrears:
+        display_df = pd.DataFrame(in_arrears)[['full_name', 'department', 'arrears', 'streak']]
+        display_df.columns = ['Name', 'Department', f'Months Unpaid ({current_year})', 'Current Streak']
+        st.dataframe(display_df, use_container_width=True, hide_index=True)
+    else:
+        st.success("Every member is up to date this year!")
+
+def payment_status_section(contribution_type, payment_status):
+    """Members by payment status for this year's dues, narrowed to the chosen status"""
+    st.subheader("Payment Status")
+    now = datetime.now()
+    statuses = build_payment_status(all_members, all_contributions, data_version, contribution_type, now.year, now.month)
+    counts = statuses['Status'].value_counts()
+    paid_col, pending_col, overdue_col = st.columns(3)
+    with paid_col:
+        st.metric("Paid", int(counts.get("Paid", 0)))
+    with pending_col:
+        st.metric("Pending", int(counts.get("Pending", 0)))
+    with overdue_col:
+        st.metric("Overdue", int(counts.get("Overdue", 0)))
+    if payment_status != "All":
+        statuses = statuses[statuses['Status'] == payment_status]
+    st.dataframe(statuses, use_container_width=True, hide_index=True)
+
+@st.fragment
+def export_options(filters):
+    """Excel and PDF exports, rerun on their own when report options change"""
+    contribution_type, start_date, end_date = filters
+    export_col1, export_col2 = st.columns(2)
+
+    with export_col1:
+        if st.button("Export to Excel"):
+            # Streamed from the database and reused until the data changes
+            month, year = datetime.now().month, datetime.now().year
+            try:
+                with st.spinner("Generating report..."):
+                    path = cached_export(
+                        "contributions_report",
+                        get_data_version("contributions", "youth_members", "departments"),
+                        filters + (month, year),
+                        ".xlsx",
+                        lambda path: write_contributions_report(path, *filters, month, year)
                     )
-                    st.plotly_chart(fig, use_container_width=True)
-                    
-                    # Display defaulters list
-                    st.subheader("Defaulters List")
-                    display_df = defaulter_df[['full_name', 'phone_number']]
-                    display_df.columns = ['Name', 'Phone']
-                    st.dataframe(display_df, use_container_width=True)
-                else:
-                    st.success("No defaulters this month!")
+                download_export(
+                    "Download Excel Report",
+                    path,
+                    f"contributions_{datetime.now().strftime('%Y%m%d')}.xlsx",
+                    XLSX_MIME
+                )
+            except Exception as e:
+                st.error(f"Error generating report: {str(e)}")
+
+    with export_col2:
+        now = datetime.now()
+        report_col1, report_col2 = st.columns(2)
+        with report_col1:
+            report_month = st.selectbox(
+                "Report Month",
+                options=list(range(1, 13)),
+                index=now.month - 1,
+                format_func=lambda m: calendar.month_name[m]
+            )
+        with report_col2:
+            report_year = st.number_input("Report Year", min_value=2000, max_value=now.year, value=now.year, step=1)
+        report_scope = st.selectbox(
+            "Report Scope",
+            ["All Departments", "Each Department (ZIP)"] + [dept['name'] for dept in get_departments()]
+        )
+
+        if st.button("Generate PDF Report"):
+            # Rendered in worker processes and reused until the data changes
+            try:
+                with st.spinner("Generating report..."):
+                    if report_scope == "Each Department (ZIP)":
+                        path = get_department_reports(report_month, int(report_year), contribution_type)
+                        file_name, mime = f"contribution_reports_{report_year}_{report_month:02d}.zip", "application/zip"
+                    else:
+                        department = None if report_scope == "All Departments" else report_scope
+                        path = get_monthly_report(report_month, int(report_year), contribution_type, department)
+                        file_name, mime = f"contribution_report_{report_year}_{report_month:02d}.pdf", "application/pdf"
+                download_export("Download PDF Report", path, file_name, mime)
+            except Exception as e:
+                st.error(f"Error generating report: {str(e)}")
+
+@st.fragment
+def contribution_dashboard():
+    """Filters and the sections that read them; a filter change reruns only this fragment"""
+    # Contribution type selector
+    contribution_type = st.selectbox(
+        "Select Contribution Type",
+        ["All", "BIRTHDAY", "PROJECT", "EVENT"]
+    )
+
+    # Date filters
+    col1, col2 = st.columns(2)
+    with col1:
+        start_date = st.date_input("Start Date",
+                                  value=datetime.now().date() - timedelta(days=30))
+    with col2:
+        end_date = st.date_input("End Date",
+                                value=datetime.now().date())
+    filters = (contribution_type, start_date, end_date)
+
+    # Narrows the member payment status list
+    payment_status = st.selectbox(
+        "Payment Status",
+        ["All", "Paid", "Pending", "Overdue"]
+    )
+
+    payment_reminder_controls()
+
+    # Check if there are any contributions
+    if not all_contributions:
+        st.info("No contributions have been recorded yet.")
+        return
+
+    base_df = build_contributions_frame(all_contributions, data_version)
+    if 'payment_date' not in base_df.columns:
+        st.warning("Contribution data format is incorrect. Please check the database.")
+        return
+
+    payment_status_section(contribution_type, payment_status)
+
+    df = filter_contributions(base_df, data_version, *filters)
+    if not df.empty:
+        contribution_summary(df, filters)
+        contribution_distribution(df, filters)
+        weekly_heatmap(df, filters)
+
+        # Detailed contribution records
+        st.subheader("Contribution Records")
+        if is_admin():
+            contribution_records(filters)
         else:
-            st.info("No contributions found for the selected criteria")
+            st.warning("⚠️ Detailed contribution records are only visible to administrators.")
 
-        # Export Options
-        st.subheader("Export Options")
+        # Member Contribution Analysis
+        st.subheader("Member Contribution Analysis")
         if is_admin():
-            export_col1, export_col2 = st.columns(2)
-
-            with export_col1:
-                if st.button("Export to Excel"):
-                    output = io.BytesIO()
-                    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-                        display_df.to_excel(writer, sheet_name='Contributions', index=False)
-                    st.download_button(
-                        label="Download Excel Report",
-                        data=output.getvalue(),
-                        file_name=f"contributions_{datetime.now().strftime('%Y%m%d')}.xlsx",
-                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                    )
+            member_contribution_analysis(*filters)
+        else:
+            st.warning("⚠️ Member contribution analysis is only visible to administrators.")
 
-            with export_col2:
-                if st.button("Generate PDF Report"):
-                    st.info("PDF report generation feature coming soon!")
+        # Contribution Goals
+        st.subheader("Contribution Goals")
+        if is_admin():
+            contribution_goals(df)
         else:
-            st.warning("⚠️ Export options are only available to administrators.")
+            st.warning("⚠️ Contribution goals management is only visible to administrators.")
+
+        # Defaulters Analysis
+        if contribution_type == "BIRTHDAY":
+            birthday_compliance()
     else:
-        st.warning("Contribution data format is incorrect. Please check the database.")
-else:
-    st.info("No contributions have been recorded yet.") 
\ No newline at end of file
+        st.info("No contributions found for the selected criteria")
+
+    # Export Options
+    st.subheader("Export Options")
+    if is_admin():
+        export_options(filters)
+    else:
+        st.warning("⚠️ Export options are only available to administrators.")
+
+contribution_dashboard()
@@ -13,9 +13,23 @@ from utils.database import (
     delete_department,
     get_contributions,
     get_email_recipients,
+    email_recipient_exists,
     add_email_recipient,
-    delete_email_recipient
+    delete_email_recipient,
+    update_email_recipient_mode,
+    update_email_recipient_subscription,
+    get_notification_retries,
+    get_dead_letters,
+    bump_data_version,
+    get_data_version,
+    get_members_page,
+    get_contributions_page
 )
+from utils.components import paginated_table, contributions_frame, member_picker, contribution_picker
+from utils.search import get_member_search_index
+from scheduled_tasks import get_scheduler, reminder_job_name
+from utils.locks import get_lease_store
+from utils.export import cached_export, download_export, write_members_csv, CSV_MIME
 import pandas as pd
 from datetime import datetime, timedelta
 import re
@@ -83,21 +97,20 @@ with tab1:
     exp_col1, exp_col2 = st.columns(2)
     
     with exp_col1:
-        # Export functionality
-        members = get_youth_members()
-        if members:
-            df = pd.DataFrame(members)
-            df['department'] = df['department_id'].apply(lambda x: dept_options.get(x, 'No Department'))
-            export_df = df[['full_name', 'birthday', 'department', 'phone_number', 'email']]
-            export_df.columns = ['Name', 'Birthday', 'Department', 'Phone', 'Email']
-            
-            csv = export_df.to_csv(index=False)
-            st.download_button(
-                label="Export Members to CSV",
-                data=csv,
-                file_name="youth_members.csv",
-                mime="text/csv"
-            )
+        # Export functionality, streamed from the database in batches
+        if st.button("Export Members to CSV"):
+            try:
+                with st.spinner("Generating export..."):
+                    path = cached_export(
+                        "members_csv",
+                        get_data_version("youth_members", "departments"),
+                        (),
+                        ".csv",
+                        write_members_csv
+                    )
+                download_export("Download Members CSV", path, "youth_members.csv", CSV_MIME)
+            except Exception as e:
+                st.error(f"Error generating export: {str(e)}")
     
     with exp_col2:
         # Import functionality
@@ -176,13 +189,8 @@ with tab1:
             # Filter members based on search and department
             filtered_members = members
             if search_query:
-                search_query = search_query.lower()
-                filtered_members = [
-                    m for m in members
-                    if search_query in m['full_name'].lower()
-                    or (m.get('phone_number') and search_query in m['phone_number'])
-                    or (m.get('email') and search_query in m['email'].lower())
-                ]
+                search_index = get_member_search_index(members, get_data_version("youth_members"))
+                filtered_members = search_index.search(search_query, limit=None)
             
             if filter_department != "All Departments":
                 filtered_members = [
@@ -312,36 +320,32 @@ with tab1:
     # Display existing members
     st.subheader("Existing Members")
     # Get fresh data after any changes
-    members = get_youth_members()
     departments = get_departments()  # Get departments for mapping
+    dept_mapping = {dept['id']: dept['name'] for dept in departments}
 
-    if members:
-        # Create department mapping dictionary
-        dept_mapping = {dept['id']: dept['name'] for dept in departments}
-        
-        # Convert to DataFrame and map departments
-        df = pd.DataFrame(members)
+    def members_frame(rows):
+        df = pd.DataFrame(rows)
         # Map department_id to department name using the mapping
         df['department'] = df['department_id'].map(dept_mapping)
-        
-        # Create display DataFrame with selected columns
         display_df = df[['full_name', 'birthday', 'department', 'phone_number', 'email']]
         display_df.columns = ['Name', 'Birthday', 'Department', 'Phone', 'Email']
-        
-        # Apply filters to display
-        if search_query:
-            display_df = display_df[
-                display_df['Name'].str.contains(search_query, case=False) |
-                display_df['Phone'].str.contains(search_query, case=False, na=False) |
-                display_df['Email'].str.contains(search_query, case=False, na=False)
-            ]
-        
-        if filter_department != "All Departments":
-            display_df = display_df[display_df['Department'] == filter_department]
-            
-        st.dataframe(display_df, use_container_width=True)
-    else:
-        st.info("No members found in the database")
+        return display_df
+
+    # Search and department filters are pushed down into the page query; the
+    # search is the same typo-tolerant one as the member list above
+    filter_dept_id = dept_options.get(filter_department)
+    paginated_table(
+        "existing_members",
+        lambda after, limit, sort_by, descending: get_members_page(
+            after, limit, sort_by, descending,
+            department_id=filter_dept_id,
+            search=search_query or None
+        ),
+        members_frame,
+        sort_options={"Name": "full_name", "Birthday": "birthday"},
+        filters=(search_query, filter_dept_id),
+        version=get_data_version("youth_members", "departments")
+    )
 
 with tab2:
     st.subheader("Contribution Management")
@@ -351,12 +355,10 @@ with tab2:
     
     with contrib_col1:
         st.subheader("Add New Contribution")
+        # The picker sits outside the form so typing refreshes the matches
+        selected_member = member_picker("Search Member", "add_contribution_member")
+        
         with st.form("add_contribution_form"):
-            # Get members for dropdown
-            members = get_youth_members()
-            member_options = {member['full_name']: member['id'] for member in members}
-            selected_member = st.selectbox("Select Member", options=list(member_options.keys()))
-            
             amount = st.number_input("Amount (GH₵)", min_value=0.0, step=5.0)
             
             contribution_type = st.selectbox(
@@ -379,120 +381,112 @@ with tab2:
                     try:
                         # Add contribution to database
                         add_contribution(
-                            member_id=member_options[selected_member],
+                            member_id=selected_member['id'],
                             amount=amount,
                             contribution_type=contribution_type,
                             payment_date=payment_date.strftime('%Y-%m-%d'),
                             week_number=week_number
                         )
-                        st.success(f"Successfully added contribution for {selected_member}")
+                        st.success(f"Successfully added contribution for {selected_member['full_name']}")
                     except Exception as e:
                         st.error(f"Error adding contribution: {str(e)}")
     
     with contrib_col2:
         st.subheader("Edit/Delete Contribution")
-        contributions = get_contributions()
-        if contributions:
-            # Select contribution to manage
-            selected_contrib = st.selectbox(
-                "Select Contribution",
-                options=[f"{c['youth_members']['full_name']} - GH₵{c['amount']} ({c['payment_date']})" 
-                        for c in contributions]
-            )
-            
-            if selected_contrib:
-                # Get selected contribution
-                selected_idx = [f"{c['youth_members']['full_name']} - GH₵{c['amount']} ({c['payment_date']})" 
-                              for c in contributions].index(selected_contrib)
-                selected_contribution = contributions[selected_idx]
-                
-                # Initialize delete confirmation state
-                if 'show_delete_confirm' not in st.session_state:
-                    st.session_state.show_delete_confirm = False
+        # Select contribution to manage
+        selected_contribution = contribution_picker("Search by Member Name", "manage_contribution")
+        if selected_contribution:
+            # Initialize delete confirmation state
+            if 'show_delete_confirm' not in st.session_state:
+                st.session_state.show_delete_confirm = False
                 
-                with st.form("manage_contribution_form"):
-                    edit_amount = st.number_input(
-                        "Amount (GH₵)", 
-                        min_value=0.0, 
-                        value=float(selected_contribution['amount'])
-                    )
-                    edit_type = st.selectbox(
-                        "Contribution Type",
-                        options=['BIRTHDAY', 'PROJECT', 'EVENT'],
-                        index=['BIRTHDAY', 'PROJECT', 'EVENT'].index(selected_contribution['contribution_type'])
-                    )
-                    edit_date = st.date_input(
-                        "Payment Date",
-                        value=datetime.strptime(selected_contribution['payment_date'], '%Y-%m-%d').date()
-                    )
+            with st.form("manage_contribution_form"):
+                edit_amount = st.number_input(
+                    "Amount (GH₵)", 
+                    min_value=0.0, 
+                    value=float(selected_contribution['amount'])
+                )
+                edit_type = st.selectbox(
+                    "Contribution Type",
+                    options=['BIRTHDAY', 'PROJECT', 'EVENT'],
+                    index=['BIRTHDAY', 'PROJECT', 'EVENT'].index(selected_contribution['contribution_type'])
+                )
+                edit_date = st.date_input(
+                    "Payment Date",
+                    value=datetime.strptime(selected_contribution['payment_date'], '%Y-%m-%d').date()
+                )
                     
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        update_button = st.form_submit_button("Update")
-                    with col2:
-                        delete_button = st.form_submit_button("Delete", type="secondary")
+                col1, col2 = st.columns(2)
+                with col1:
+                    update_button = st.form_submit_button("Update")
+                with col2:
+                    delete_button = st.form_submit_button("Delete", type="secondary")
                     
-                    if update_button:
-                        try:
-                            supabase = init_connection()
-                            result = supabase.table("contributions").update({
-                                "amount": edit_amount,
-                                "contribution_type": edit_type,
-                                "payment_date": edit_date.strftime('%Y-%m-%d')
-                            }).eq("id", selected_contribution['id']).execute()
+                if update_button:
+                    try:
+                        supabase = init_connection()
+                        result = supabase.table("contributions").update({
+                            "amount": edit_amount,
+                            "contribution_type": edit_type,
+                            "payment_date": edit_date.strftime('%Y-%m-%d'),
+                            # Keep the month/year columns used by compliance queries in sync
+                            "month": edit_date.month,
+                            "year": edit_date.year
+                        }).eq("id", selected_contribution['id']).execute()
+                        bump_data_version("contributions")
                             
-                            st.success("Contribution updated successfully!")
-                            st.cache_data.clear()
-                            time.sleep(0.5)
-                            st.rerun()
-                        except Exception as e:
-                            st.error(f"Error updating contribution: {str(e)}")
+                        st.success("Contribution updated successfully!")
+                        st.cache_data.clear()
+                        time.sleep(0.5)
+                        st.rerun()
+                    except Exception as e:
+                        st.error(f"Error updating contribution: {str(e)}")
                     
-                    if delete_button:
-                        st.session_state.show_delete_confirm = True
+                if delete_button:
+                    st.session_state.show_delete_confirm = True
                 
-                # Show delete confirmation outside the form
-                if st.session_state.show_delete_confirm:
-                    st.warning("⚠️ Are you sure you want to delete this contribution?")
-                    st.write(f"Member: {selected_contribution['youth_members']['full_name']}")
-                    st.write(f"Amount: GH₵{selected_contribution['amount']}")
-                    st.write(f"Date: {selected_contribution['payment_date']}")
+            # Show delete confirmation outside the form
+            if st.session_state.show_delete_confirm:
+                st.warning("⚠️ Are you sure you want to delete this contribution?")
+                st.write(f"Member: {selected_contribution['youth_members']['full_name']}")
+                st.write(f"Amount: GH₵{selected_contribution['amount']}")
+                st.write(f"Date: {selected_contribution['payment_date']}")
                     
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        if st.button("Yes, Delete", type="primary"):
-                            try:
-                                supabase = init_connection()
-                                result = supabase.table("contributions")\
-                                    .delete()\
-                                    .eq("id", selected_contribution['id'])\
-                                    .execute()
+                col1, col2 = st.columns(2)
+                with col1:
+                    if st.button("Yes, Delete", type="primary"):
+                        try:
+                            supabase = init_connection()
+                            result = supabase.table("contributions")\
+                                .delete()\
+                                .eq("id", selected_contribution['id'])\
+                                .execute()
+                            bump_data_version("contributions")
                                 
-                                st.session_state.show_delete_confirm = False
-                                st.success("Contribution deleted successfully!")
-                                st.cache_data.clear()
-                                time.sleep(0.5)
-                                st.rerun()
-                            except Exception as e:
-                                st.error(f"Error deleting contribution: {str(e)}")
-                    
-                    with col2:
-                        if st.button("No, Cancel"):
                             st.session_state.show_delete_confirm = False
+                            st.success("Contribution deleted successfully!")
+                            st.cache_data.clear()
+                            time.sleep(0.5)
                             st.rerun()
-        else:
-            st.info("No contributions found")
+                        except Exception as e:
+                            st.error(f"Error deleting contribution: {str(e)}")
+                    
+                with col2:
+                    if st.button("No, Cancel"):
+                        st.session_state.show_delete_confirm = False
+                        st.rerun()
     
     # Display existing contributions
     st.subheader("Existing Contributions")
-    if contributions:
-        df = pd.DataFrame(contributions)
-        df['member_name'] = df['youth_members'].apply(lambda x: x['full_name'])
-        display_df = df[['member_name', 'amount', 'contribution_type', 'payment_date', 'week_number']]
-        display_df.columns = ['Member', 'Amount (GH₵)', 'Type', 'Date', 'Week']
-        st.dataframe(display_df, use_container_width=True)
-    else:
-        st.info("No contributions found in the database")
+    paginated_table(
+        "existing_contributions",
+        lambda after, limit, sort_by, descending: get_contributions_page(
+            after, limit, sort_by, descending
+        ),
+        contributions_frame,
+        sort_options={"Date": "payment_date", "Amount": "amount"},
+        version=get_data_version("contributions", "youth_members")
+    )
 
 with tab3:
     st.header("Department Management")
@@ -554,8 +548,7 @@ with tab3:
                                 st.success("Department deleted successfully!")
                                 # Clear any cached data
                                 st.cache_data.clear()
-                                # Use experimental rerun to refresh the page
-                                st.experimental_rerun()
+                                st.rerun()
                             except Exception as e:
                                 st.error(f"Error deleting department: {str(e)}")
         else:
@@ -596,6 +589,46 @@ with tab4:  # New last tab for User Management
                 except Exception as e:
                     st.error(f"Error creating user: {str(e)}")
 
+# How a recipient receives birthday reminders
+DELIVERY_MODES = {
+    "digest": "Daily digest",
+    "individual": "Separate emails"
+}
+NOTIFICATION_CHANNELS = {
+    "email": "Email",
+    "sms": "SMS"
+}
+
+def subscription_fields(key, recipient=None):
+    """Department, window and channel pickers for a recipient; nothing picked means everything"""
+    from utils.email_service import get_reminder_horizon, window_label
+    recipient = recipient or {}
+    departments = {d['id']: d['name'] for d in get_departments()}
+    department_ids = st.multiselect(
+        "Departments (all if empty)",
+        options=list(departments.keys()),
+        default=[d for d in recipient.get('department_ids') or [] if d in departments],
+        format_func=lambda d: departments[d],
+        key=f"departments_{key}"
+    )
+    window_options = list(range(get_reminder_horizon() + 1))
+    windows = st.multiselect(
+        "Birthdays (all if empty)",
+        options=window_options,
+        default=[w for w in recipient.get('windows') or [] if w in window_options],
+        format_func=lambda w: window_label(w).capitalize(),
+        key=f"windows_{key}"
+    )
+    channels = st.multiselect(
+        "Channels",
+        options=list(NOTIFICATION_CHANNELS.keys()),
+        default=recipient.get('channels') or ["email"],
+        format_func=lambda c: NOTIFICATION_CHANNELS[c],
+        key=f"channels_{key}"
+    )
+    phone_number = st.text_input("Phone Number (for SMS)", value=recipient.get('phone_number') or "", key=f"phone_{key}")
+    return department_ids, windows, channels, phone_number.strip()
+
 # Add the new Birthday Notifications tab
 with tab5:
     st.header("Birthday Notification Settings")
@@ -610,6 +643,13 @@ with tab5:
         # Add new email recipient
         with st.form("add_email_recipient"):
             new_email = st.text_input("Add Email Recipient")
+            new_mode = st.radio(
+                "Delivery",
+                options=list(DELIVERY_MODES.keys()),
+                format_func=lambda mode: DELIVERY_MODES[mode],
+                horizontal=True
+            )
+            new_subscription = subscription_fields("new_recipient")
             submit = st.form_submit_button("Add Recipient")
             
             if submit and new_email:
@@ -617,21 +657,16 @@ with tab5:
                 if not re.match(r"[^@]+@[^@]+\.[^@]+", new_email):
                     st.error("Please enter a valid email address!")
                 else:
-                    # Get existing recipients
-                    recipients = get_email_recipients()
-                    existing_emails = [r['email'] for r in recipients]
-                    
                     # Check if email already exists
-                    if new_email in existing_emails:
-                        st.error("This email is already in the list!")
-                    else:
+                    try:
+                        if email_recipient_exists(new_email):
+                            st.error("This email is already in the list!")
                         # Add new email to database
-                        try:
-                            if add_email_recipient(new_email):
-                                st.success(f"Added {new_email} to recipients!")
-                                st.rerun()
-                        except Exception as e:
-                            st.error(f"Error adding recipient: {str(e)}")
+                        elif add_email_recipient(new_email, new_mode, *new_subscription):
+                            st.success(f"Added {new_email} to recipients!")
+                            st.rerun()
+                    except Exception as e:
+                        st.error(f"Error adding recipient: {str(e)}")
 
     with col2:
         # Display and manage existing recipients
@@ -640,9 +675,27 @@ with tab5:
         
         if recipients:
             for recipient in recipients:
-                col_email, col_delete = st.columns([3, 1])
+                col_email, col_mode, col_subscription, col_delete = st.columns([3, 2, 1, 1])
                 with col_email:
                     st.text(recipient['email'])
+                with col_mode:
+                    current_mode = recipient.get('delivery_mode', 'digest')
+                    mode = st.selectbox(
+                        "Delivery",
+                        options=list(DELIVERY_MODES.keys()),
+                        index=list(DELIVERY_MODES.keys()).index(current_mode),
+                        format_func=lambda mode: DELIVERY_MODES[mode],
+                        key=f"mode_{recipient['email']}",
+                        label_visibility="collapsed"
+                    )
+                    if mode != current_mode and update_email_recipient_mode(recipient['email'], mode):
+                        st.rerun()
+                with col_subscription:
+                    with st.popover("⚙️"):
+                        subscription = subscription_fields(recipient['email'], recipient)
+                        if st.button("Save", key=f"save_subscription_{recipient['email']}"):
+                            if update_email_recipient_subscription(recipient['email'], *subscription):
+                                st.rerun()
                 with col_delete:
                     if st.button("🗑️", key=f"delete_{recipient['email']}"):
                         try:
@@ -679,22 +732,10 @@ with tab5:
                         department_name = dept_mapping.get(test_member['department_id'], 'No Department')
                         
                         # Format the test email
-                        test_body = f"""
-                        <html>
-                        <body style="font-family: Arial, sans-serif;">
-                            <h2>🎂 Birthday Notification Test</h2>
-                            <p>This is a test email from your Birthday Reminder System.</p>
-                            <p>The following member would be notified if it were their birthday:</p>
-                            <div style="padding: 15px; background-color: #f8f9fa; border-radius: 5px; margin: 10px 0;">
-                                <p><strong>Name:</strong> {test_member['full_name']}</p>
-                                <p><strong>Birthday:</strong> {test_member['birthday']}</p>
-                                <p><strong>Department:</strong> {department_name}</p>
-                            </div>
-                            <p>If you received this email, your notification system is working correctly! 🎉</p>
-                            <p>Best regards,<br>Birthday Reminder System</p>
-                        </body>
-                        </html>
-                        """
+                        from utils.email_service import format_test_email
+                        test_body, test_text = format_test_email(
+                            test_member['full_name'], test_member['birthday'], department_name
+                        )
                         
                         from utils.email_service import send_birthday_email
                         recipient_emails = [r['email'] for r in recipients]
@@ -702,7 +743,8 @@ with tab5:
                         success = send_birthday_email(
                             recipients=recipient_emails,
                             subject="🎉 Birthday Reminder System - Test Email",
-                            body=test_body
+                            body=test_body,
+                            text_body=test_text
                         )
                         
                         if success:
@@ -740,9 +782,57 @@ with tab5:
                 else:
                     st.warning("No email recipients configured")
                 
+                # Metrics from the most recent send in this app process
+                from utils.email_service import get_last_dispatch
+                last_dispatch = get_last_dispatch()
+                if last_dispatch:
+                    st.write(f"📈 Last Dispatch ({last_dispatch['finished_at'].strftime('%Y-%m-%d %H:%M:%S')}):")
+                    st.write(f"- Sent: {last_dispatch['sent']} messages to {last_dispatch['recipients']} recipients")
+                    st.write(f"- Failed: {last_dispatch['failed']} (after {last_dispatch['retries']} retries)")
+                    st.write(f"- Throughput: {last_dispatch['messages_per_second']} messages/second over {last_dispatch['elapsed_seconds']}s")
+                
             except Exception as e:
                 st.error(f"Error checking email configuration: {str(e)}")
 
+    # Notifications that failed and are waiting to be retried or replayed
+    st.markdown("---")
+    st.subheader("📮 Failed Notifications")
+    try:
+        retries = get_notification_retries()
+        dead_letters = get_dead_letters()
+    except Exception as e:
+        retries, dead_letters = [], []
+        st.error(f"Error loading failed notifications: {str(e)}")
+
+    if retries or dead_letters:
+        retry_col, dead_col = st.columns(2)
+        with retry_col:
+            st.write(f"🔁 Waiting for retry: {len(retries)}")
+            if retries:
+                st.dataframe(pd.DataFrame(retries)[['subject', 'attempts', 'next_attempt_at', 'last_error']], hide_index=True)
+                if st.button("Retry Due Now"):
+                    from utils.email_service import retry_failed_notifications
+                    summary = retry_failed_notifications()
+                    if summary.get('in_progress'):
+                        st.info("The retry queue is already being sent; refresh in a minute.")
+                    else:
+                        st.success(f"{summary['sent']} sent, {summary['retrying']} still retrying, {summary['dead_lettered']} dead-lettered")
+        with dead_col:
+            st.write(f"☠️ Dead letters: {len(dead_letters)}")
+            if dead_letters:
+                st.dataframe(pd.DataFrame(dead_letters)[['subject', 'attempts', 'failed_at', 'last_error']], hide_index=True)
+                if st.button("Replay Dead Letters"):
+                    from utils.notification_queue import replay_dead_letters
+                    from utils.email_service import retry_failed_notifications
+                    replayed = replay_dead_letters()
+                    summary = retry_failed_notifications()
+                    if summary.get('in_progress'):
+                        st.info(f"Replayed {replayed}; they go out with the retry run already in progress.")
+                    else:
+                        st.success(f"Replayed {replayed}: {summary['sent']} sent, {summary['retrying'] + summary['dead_lettered']} failed again")
+    else:
+        st.info("No failed notifications.")
+
     # Upcoming Birthdays Display
     st.markdown("---")
     st.subheader("📅 Upcoming Birthdays")
@@ -968,7 +1058,7 @@ with tab5:
         st.markdown("### Test Reminder Schedule")
         if st.button("🔄 Test Reminder Schedule"):
             try:
-                from utils.email_service import check_and_send_birthday_reminders
+                from utils.email_service import check_and_send_birthday_reminders, get_reminder_engine
                 message, success = check_and_send_birthday_reminders()
                 
                 if success:
@@ -991,9 +1081,7 @@ with tab5:
                                 st.info(f"""
                                     {member['full_name']} - {member['birthday']}
                                     - Days until birthday: {days_until}
-                                    - Will send reminders:
-                                        • Morning (9 AM)
-                                        • Afternoon (2 PM)
+                                    - Will send reminders at {get_reminder_engine().describe()}
                                 """)
                 else:
                     st.error(message)
@@ -1010,16 +1098,17 @@ with tab5:
         st.markdown("### 📊 System Status")
         
         # Check current time and next run times
-        current_time = datetime.now()
-        next_morning = datetime.now().replace(hour=9, minute=0, second=0, microsecond=0)
-        next_afternoon = datetime.now().replace(hour=14, minute=0, second=0, microsecond=0)
-        
-        if current_time > next_morning:
-            next_morning += timedelta(days=1)
-        if current_time > next_afternoon:
-            next_afternoon += timedelta(days=1)
-        
-        next_run = next_morning if next_morning < next_afternoon else next_afternoon
+        from utils.email_service import get_reminder_engine
+        engine = get_reminder_engine()
+        current_time = engine.now()
+        scheduler = get_scheduler()
+        slot_checks = "".join(
+            f"""
+                <div class="time-info">
+                    ⏰ Next {slot.title()} Check: {scheduler.next_run_at(reminder_job_name(slot), current_time).strftime('%Y-%m-%d %H:%M:%S')}
+                </div>"""
+            for slot, _ in engine.slots
+        )
         
         # Display automation status
         st.markdown("""
@@ -1041,17 +1130,24 @@ with tab5:
         st.markdown(f"""
             <div class="status-box">
                 <div class="time-info">
-                    🕒 Current Time: {current_time.strftime('%Y-%m-%d %H:%M:%S')}
-                </div>
-                <div class="time-info">
-                    ⏰ Next Morning Check: {next_morning.strftime('%Y-%m-%d %H:%M:%S')}
-                </div>
-                <div class="time-info">
-                    ⏰ Next Afternoon Check: {next_afternoon.strftime('%Y-%m-%d %H:%M:%S')}
-                </div>
+                    🕒 Current Time: {current_time.strftime('%Y-%m-%d %H:%M:%S')} ({engine.tz})
+                </div>{slot_checks}
             </div>
             """, unsafe_allow_html=True)
 
+        st.caption(f"Each run is locked through {get_lease_store().name} leases, so one replica does it")
+        st.dataframe(pd.DataFrame([
+            {
+                'Job': job['name'],
+                'Schedule': job['schedule'],
+                'Last Run': job['last_run_at'].strftime('%Y-%m-%d %H:%M') if job['last_run_at'] else "Never",
+                'Status': job['last_status'] or "",
+                'Details': job['last_message'] or "",
+                'Next Run': job['next_run_at'].strftime('%Y-%m-%d %H:%M')
+            }
+            for job in scheduler.status()
+        ]), hide_index=True, use_container_width=True)
+
     with monitor_col2:
         st.markdown("### 📝 Recent Activity")
         
@@ -1163,9 +1259,10 @@ with tab5:
     # Add help information
     st.markdown("---")
     st.markdown("### ℹ️ How Automation Works")
-    st.info("""
+    from utils.email_service import get_reminder_engine
+    st.info(f"""
         The birthday reminder system:
-        1. Checks for birthdays twice daily (9 AM and 2 PM)
+        1. Checks for birthdays at {get_reminder_engine().describe()}
         2. Sends reminders for birthdays today through 3 days ahead
         3. Requires the application to be running
         4. Uses Gmail SMTP for sending emails
@@ -1,19 +1,83 @@
-import streamlit as st
-from datetime import datetime
-from utils.email_service import check_and_send_birthday_reminders
+import argparse
+import threading
+import time
+from datetime import timedelta
+from functools import partial
+from utils.database import get_scheduler_state, save_scheduler_run
+from utils.email_service import (
+    check_and_send_birthday_reminders,
+    retry_failed_notifications,
+    precompute_reminder_payloads,
+    get_reminder_engine
+)
+from utils.reports import get_monthly_report, get_department_reports
+from utils.locks import hold_lease
+from utils.scheduler import Job, Scheduler
+
+# How late a slot's reminders may still go out after downtime
+REMINDER_GRACE = timedelta(hours=3)
+
+def reminder_job_name(slot):
+    return f"{slot}_reminders"
+
+def _send_reminders(time_of_day, engine):
+    message, success = check_and_send_birthday_reminders(time_of_day=time_of_day, engine=engine)
+    if not success:
+        raise RuntimeError(message)
+    return message
+
+def _render_reports(engine):
+    """Render this month's reports so the first download of the day is a cache hit"""
+    today = engine.now()
+    get_monthly_report(today.month, today.year)
+    get_department_reports(today.month, today.year)
+    return f"Rendered the {today.strftime('%B %Y')} reports"
+
+def build_jobs(engine):
+    """Get the scheduled jobs, with one reminder job per configured slot"""
+    jobs = [
+        Job(reminder_job_name(slot), engine.cron(slot), partial(_send_reminders, slot, engine), misfire_grace=REMINDER_GRACE)
+        for slot, _ in engine.slots
+    ]
+    return jobs + [
+        Job("retry_notifications", "*/15 * * * *", retry_failed_notifications, misfire_grace=timedelta(minutes=15)),
+        Job("precompute_reminders", "0 22 * * *", partial(precompute_reminder_payloads, engine=engine), misfire_grace=timedelta(hours=10)),
+        Job("nightly_reports", "30 1 * * *", partial(_render_reports, engine), misfire_grace=timedelta(hours=6)),
+    ]
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+def get_scheduler():
+    """Get this process's scheduler, creating it on first use"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            # Jobs fire on the organisation's wall clock, not the host's
+            engine = get_reminder_engine()
+            _scheduler = Scheduler(build_jobs(engine), get_scheduler_state, save_scheduler_run, hold_lease, clock=engine.now)
+        return _scheduler
 
 def run_scheduled_tasks():
-    """Run scheduled tasks for birthday reminders"""
-    current_hour = datetime.now().hour
-    
-    # Check if it's time to send reminders (9 AM or 2 PM)
-    if current_hour in [9, 14]:  # 9 AM and 2 PM
+    """Start the background scheduler once per server process"""
+    scheduler = get_scheduler()
+    with _scheduler_lock:
+        return scheduler.start()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the birthday reminder scheduler without the app")
+    parser.add_argument("--once", action="store_true", help="Run whatever is due (or missed) and exit")
+    args = parser.parse_args()
+
+    scheduler = get_scheduler()
+    if args.once:
+        scheduler.tick()
+    else:
+        scheduler.start()
         try:
-            message, success = check_and_send_birthday_reminders()
-            if success:
-                st.session_state.last_check = datetime.now()
-                st.session_state.last_status = f"Success: {message}"
-            else:
-                st.session_state.last_status = f"Failed: {message}"
-        except Exception as e:
-            st.session_state.last_status = f"Error: {str(e)}" 
\ No newline at end of file
+            while True:
+                time.sleep(60)
+        except KeyboardInterrupt:
+            scheduler.stop()
+    for job in scheduler.status():
+        print(f"{job['name']}: last {job['last_status'] or 'never run'} at {job['last_run_at']}, next at {job['next_run_at']}")
@@ -0,0 +1,21 @@
+-- Indexes backing the keyset-paginated member and contribution tables.
+-- Pages are ordered by (sort column, id), so each sort option needs a
+-- matching composite index for the "after cursor" range scan.
+
+create index if not exists youth_members_full_name_id_idx
+    on youth_members (full_name, id);
+
+create index if not exists youth_members_birthday_id_idx
+    on youth_members (birthday, id);
+
+create index if not exists youth_members_department_full_name_idx
+    on youth_members (department_id, full_name, id);
+
+create index if not exists contributions_payment_date_id_idx
+    on contributions (payment_date, id);
+
+create index if not exists contributions_amount_id_idx
+    on contributions (amount, id);
+
+create index if not exists contributions_type_payment_date_idx
+    on contributions (contribution_type, payment_date, id);
@@ -0,0 +1,11 @@
+-- Indexes backing the typeahead member and contribution pickers.
+-- The trigram GIN index serves both prefix (ilike 'query%') and
+-- substring (ilike '%query%') matches on member names.
+
+create extension if not exists pg_trgm;
+
+create index if not exists youth_members_full_name_trgm_idx
+    on youth_members using gin (full_name gin_trgm_ops);
+
+create index if not exists contributions_member_payment_date_idx
+    on contributions (member_id, payment_date desc, id desc);
@@ -0,0 +1,40 @@
+-- Ranked, typo-tolerant member search across name, phone and email.
+-- Requires 002_member_search.sql (pg_trgm).
+
+alter table youth_members
+    add column if not exists phone_digits text
+    generated always as (regexp_replace(coalesce(phone_number, ''), '\D', '', 'g')) stored;
+
+create index if not exists youth_members_phone_digits_trgm_idx
+    on youth_members using gin (phone_digits gin_trgm_ops);
+
+create index if not exists youth_members_email_trgm_idx
+    on youth_members using gin (email gin_trgm_ops);
+
+create index if not exists youth_members_phone_number_trgm_idx
+    on youth_members using gin (phone_number gin_trgm_ops);
+
+create or replace function search_youth_members(search_query text, max_results integer default 20)
+returns setof youth_members
+language sql
+stable
+as $$
+    with q as (
+        select lower(trim(search_query)) as term,
+               regexp_replace(search_query, '\D', '', 'g') as digits
+    )
+    select m.*
+    from youth_members m, q
+    where q.term <% m.full_name
+       or m.email ilike '%' || q.term || '%'
+       or (length(q.digits) >= 3 and m.phone_digits like '%' || q.digits || '%')
+    order by
+        greatest(
+            word_similarity(q.term, lower(m.full_name)),
+            case when m.email ilike '%' || q.term || '%' then 1 else 0 end,
+            case when length(q.digits) >= 3 and m.phone_digits like '%' || q.digits || '%' then 1 else 0 end
+        ) desc,
+        m.full_name,
+        m.id
+    limit max_results;
+$$;
@@ -0,0 +1,83 @@
+-- Contribution compliance: who has not paid a given contribution type in a
+-- given month, computed in the database as an indexed anti-join.
+
+create index if not exists contributions_compliance_idx
+    on contributions (contribution_type, year, month, member_id);
+
+create index if not exists youth_members_department_id_idx
+    on youth_members (department_id);
+
+-- Members with their department name resolved
+create or replace view member_directory as
+select
+    m.id,
+    m.full_name,
+    m.birthday,
+    m.phone_number,
+    m.email,
+    m.department_id,
+    coalesce(d.name, 'No Department') as department_name
+from youth_members m
+left join departments d on d.id = m.department_id;
+
+-- Members without a contribution of target_type in the target month
+create or replace function contribution_defaulters(
+    target_month integer,
+    target_year integer,
+    target_type text default 'BIRTHDAY'
+)
+returns setof member_directory
+language sql
+stable
+as $$
+    select md.*
+    from member_directory md
+    where not exists (
+        select 1
+        from contributions c
+        where c.member_id = md.id
+          and c.contribution_type = target_type
+          and c.year = target_year
+          and c.month = target_month
+    )
+    order by md.department_name, md.full_name, md.id;
+$$;
+
+-- Member and defaulter counts per department for the target month
+create or replace function contribution_defaulters_by_department(
+    target_month integer,
+    target_year integer,
+    target_type text default 'BIRTHDAY'
+)
+returns table (department_name text, member_count bigint, defaulter_count bigint)
+language sql
+stable
+as $$
+    select
+        md.department_name,
+        count(*) as member_count,
+        count(*) filter (where not exists (
+            select 1
+            from contributions c
+            where c.member_id = md.id
+              and c.contribution_type = target_type
+              and c.year = target_year
+              and c.month = target_month
+        )) as defaulter_count
+    from member_directory md
+    group by md.department_name
+    order by defaulter_count desc, md.department_name;
+$$;
+
+-- One row per (member, year, month, type) that has at least one payment;
+-- the members x months compliance matrix is the complement of the gaps
+create or replace view contribution_compliance as
+select
+    member_id,
+    year,
+    month,
+    contribution_type,
+    count(*) as payments,
+    sum(amount) as total_amount
+from contributions
+group by member_id, year, month, contribution_type;
@@ -0,0 +1,13 @@
+-- How each notification recipient receives birthday reminders:
+-- 'digest' gets one email per reminder slot covering every window,
+-- 'individual' gets a separate email for each window with birthdays.
+
+alter table email_recipients
+    add column if not exists delivery_mode text not null default 'digest';
+
+alter table email_recipients
+    drop constraint if exists email_recipients_delivery_mode_check;
+
+alter table email_recipients
+    add constraint email_recipients_delivery_mode_check
+    check (delivery_mode in ('digest', 'individual'));
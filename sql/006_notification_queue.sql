@@ -0,0 +1,27 @@
+-- Failed notifications: sends that failed with a temporary error wait in
+-- notification_retries until next_attempt_at; after too many attempts, or
+-- on a permanent error, they move to notification_dead_letters for replay.
+
+create table if not exists notification_retries (
+    id bigint generated always as identity primary key,
+    recipients text[] not null,
+    subject text,
+    message text not null,
+    attempts integer not null default 1,
+    last_error text,
+    next_attempt_at timestamptz not null default now(),
+    created_at timestamptz not null default now()
+);
+
+create index if not exists notification_retries_due_idx
+    on notification_retries (next_attempt_at);
+
+create table if not exists notification_dead_letters (
+    id bigint generated always as identity primary key,
+    recipients text[] not null,
+    subject text,
+    message text not null,
+    attempts integer not null,
+    last_error text,
+    failed_at timestamptz not null default now()
+);
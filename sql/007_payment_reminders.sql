@@ -0,0 +1,34 @@
+-- Payment reminders: one row per member reminded about a contribution type
+-- in a given month (a "cycle"), so repeated runs skip members already reminded.
+
+create table if not exists payment_reminders (
+    member_id bigint not null references youth_members (id) on delete cascade,
+    contribution_type text not null,
+    year integer not null,
+    month integer not null,
+    channels text[] not null default '{}',
+    sent_at timestamptz not null default now(),
+    primary key (contribution_type, year, month, member_id)
+);
+
+-- Defaulters for the cycle who haven't been reminded yet
+create or replace function payment_reminder_targets(
+    target_month integer,
+    target_year integer,
+    target_type text default 'BIRTHDAY'
+)
+returns setof member_directory
+language sql
+stable
+as $$
+    select d.*
+    from contribution_defaulters(target_month, target_year, target_type) d
+    where not exists (
+        select 1
+        from payment_reminders r
+        where r.member_id = d.id
+          and r.contribution_type = target_type
+          and r.year = target_year
+          and r.month = target_month
+    );
+$$;
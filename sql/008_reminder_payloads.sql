@@ -0,0 +1,13 @@
+-- Reminder payloads precomputed overnight: the windows and every channel's
+-- rendered notifications for a slot, with a fingerprint of the data they
+-- were built from. The send step ships them only if the fingerprint matches.
+
+create table if not exists reminder_payloads (
+    slot_date date not null,
+    time_of_day text not null check (time_of_day in ('morning', 'afternoon')),
+    version text not null,
+    payload jsonb not null,
+    created_at timestamptz not null default now(),
+    primary key (slot_date, time_of_day)
+);
+
@@ -0,0 +1,16 @@
+-- What each notification recipient hears about. NULL department_ids or
+-- windows mean every department or every window (days before a birthday);
+-- channels lists how they are reached, with SMS going to phone_number.
+
+alter table email_recipients
+    add column if not exists department_ids bigint[],
+    add column if not exists windows integer[],
+    add column if not exists channels text[] not null default '{email}',
+    add column if not exists phone_number text;
+
+alter table email_recipients
+    drop constraint if exists email_recipients_channels_check;
+
+alter table email_recipients
+    add constraint email_recipients_channels_check
+    check (channels <@ array['email', 'sms']::text[]);
@@ -0,0 +1,3 @@
+-- Duplicate checks look recipients up by address
+create index if not exists email_recipients_email_idx
+    on email_recipients (email);
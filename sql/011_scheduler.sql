@@ -0,0 +1,33 @@
+-- In-process scheduler state: the last fire time each job handled, so a
+-- restarted replica knows which runs it missed, and a lease so only one
+-- replica fires jobs at a time. Fire times are server-local timestamps.
+
+create table if not exists scheduler_jobs (
+    name text primary key,
+    last_fire_at timestamp,
+    last_run_at timestamp,
+    last_status text,
+    last_message text
+);
+
+create table if not exists scheduler_leases (
+    name text primary key,
+    holder text not null,
+    expires_at timestamptz not null
+);
+
+-- Take or renew a lease; true if lease_holder now holds it
+create or replace function acquire_scheduler_lease(lease_name text, lease_holder text, ttl_seconds integer)
+returns boolean
+language plpgsql
+as $$
+begin
+    insert into scheduler_leases (name, holder, expires_at)
+    values (lease_name, lease_holder, now() + make_interval(secs => ttl_seconds))
+    on conflict (name) do update
+        set holder = excluded.holder, expires_at = excluded.expires_at
+        where scheduler_leases.holder = excluded.holder
+           or scheduler_leases.expires_at < now();
+    return found;
+end;
+$$;
@@ -0,0 +1,9 @@
+-- Reminder slots are configured per organisation timezone: slots may have
+-- any name, and scheduler times keep their offset. Earlier scheduler times
+-- were written by hosts running in UTC.
+
+alter table reminder_payloads drop constraint if exists reminder_payloads_time_of_day_check;
+
+alter table scheduler_jobs
+    alter column last_fire_at type timestamptz using last_fire_at at time zone 'UTC',
+    alter column last_run_at type timestamptz using last_run_at at time zone 'UTC';
@@ -0,0 +1,192 @@
+import json
+import re
+import httpx
+import pytest
+import streamlit as st
+from postgrest import SyncPostgrestClient
+from postgrest.utils import SyncClient
+import utils.database as database
+
+# Query params PostgREST reads itself rather than as column filters
+RESERVED_PARAMS = {"select", "order", "limit", "offset", "or", "and", "on_conflict", "columns"}
+
+def _split_top_level(text):
+    """Split a PostgREST logic list on the commas outside quotes and parentheses"""
+    parts, depth, quoted, current = [], 0, False, ""
+    i = 0
+    while i < len(text):
+        char = text[i]
+        if quoted and char == "\\":
+            current += text[i:i + 2]
+            i += 2
+            continue
+        if char == '"':
+            quoted = not quoted
+        elif not quoted and char == "(":
+            depth += 1
+        elif not quoted and char == ")":
+            depth -= 1
+        elif not quoted and depth == 0 and char == ",":
+            parts.append(current)
+            current = ""
+            i += 1
+            continue
+        current += char
+        i += 1
+    parts.append(current)
+    return parts
+
+def _unquote(value):
+    if value.startswith('"') and value.endswith('"'):
+        return re.sub(r"\\(.)", r"\1", value[1:-1])
+    return value
+
+def _coerce(value, like):
+    """Read a filter value as the type of the column it's compared with"""
+    if isinstance(like, bool):
+        return value == "true"
+    if isinstance(like, int):
+        return int(value)
+    if isinstance(like, float):
+        return float(value)
+    return value
+
+def _matches(row, column, op, value):
+    actual = row.get(column)
+    if op == "ilike":
+        pattern = "".join(".*" if c in "%*" else re.escape(c) for c in value)
+        return actual is not None and re.fullmatch(pattern, str(actual), re.IGNORECASE | re.DOTALL) is not None
+    if actual is None:
+        return False
+    if op == "in":
+        return actual in [_coerce(_unquote(item), actual) for item in _split_top_level(value[1:-1])]
+    value = _coerce(value, actual)
+    return {
+        "eq": actual == value,
+        "neq": actual != value,
+        "gt": actual > value,
+        "gte": actual >= value,
+        "lt": actual < value,
+        "lte": actual <= value
+    }[op]
+
+def _condition(text):
+    """Parse one condition of an or=()/and() list into a row predicate"""
+    for logic, combine in (("and(", all), ("or(", any)):
+        if text.startswith(logic):
+            parts = [_condition(part) for part in _split_top_level(text[len(logic):-1])]
+            return lambda row: combine(part(row) for part in parts)
+    column, op, value = text.split(".", 2)
+    value = _unquote(value)
+    return lambda row: _matches(row, column, op, value)
+
+class FakePostgREST:
+    """Serves table reads and writes and RPC calls the way PostgREST does, from rows held in memory
+
+    Functions are Python callables taking the RPC's arguments; rows they
+    return are filtered, ordered and limited like a table's. Inserted rows
+    get the next id unless they bring one, and upserts merge into the row
+    matching their on_conflict columns. Records every request's query
+    params, and rejects a request with more than one order= param, which
+    PostgREST would not combine.
+    """
+
+    def __init__(self, tables, functions=None):
+        self.tables = tables
+        self.functions = functions or {}
+        self.requests = []
+        self.calls = []
+        self._next_id = 1000
+
+    def _filtered(self, rows, params):
+        for key, value in params:
+            if key == "or":
+                predicate = _condition(f"or{value}")
+            elif key not in RESERVED_PARAMS:
+                predicate = _condition(f"{key}.{value}")
+            else:
+                continue
+            rows = [row for row in rows if predicate(row)]
+        return rows
+
+    def _write(self, method, table, params, body):
+        rows = self.tables.setdefault(table, [])
+        if method == "POST":
+            on_conflict = dict(params).get("on_conflict")
+            conflict = on_conflict.split(",") if on_conflict else None
+            written = []
+            for new in body if isinstance(body, list) else [body]:
+                existing = next((row for row in rows if conflict and all(row.get(c) == new.get(c) for c in conflict)), None)
+                if existing is not None:
+                    existing.update(new)
+                    written.append(existing)
+                    continue
+                row = dict(new)
+                if 'id' not in row:
+                    self._next_id += 1
+                    row['id'] = self._next_id
+                rows.append(row)
+                written.append(row)
+            return written
+        matched = self._filtered(rows, params)
+        if method == "PATCH":
+            for row in matched:
+                row.update(body)
+        else:
+            self.tables[table] = [row for row in rows if not any(row is m for m in matched)]
+        return matched
+
+    def handle(self, request):
+        params = list(httpx.QueryParams(request.url.query).multi_items())
+        self.requests.append(params)
+        orders = [value for key, value in params if key == "order"]
+        if len(orders) > 1:
+            return httpx.Response(400, json={"message": f"order given {len(orders)} times: {orders}"})
+
+        path = request.url.path.strip("/")
+        if path.startswith("rpc/"):
+            name = path[len("rpc/"):]
+            if name not in self.functions:
+                return httpx.Response(404, json={"code": "PGRST202", "message": f"Could not find the function {name}"})
+            arguments = json.loads(request.content or b"{}")
+            self.calls.append((name, arguments))
+            rows = self.functions[name](**arguments)
+            if not isinstance(rows, list):
+                return httpx.Response(200, content=json.dumps(rows), headers={"content-type": "application/json"})
+        elif request.method != "GET":
+            rows = self._write(request.method, path, params, json.loads(request.content or b"{}"))
+            return httpx.Response(201 if request.method == "POST" else 200, content=json.dumps(rows),
+                                  headers={"content-type": "application/json"})
+        else:
+            rows = list(self.tables[path])
+        rows = self._filtered(rows, params)
+
+        for term in reversed(orders[0].split(",") if orders else []):
+            column, _, direction = term.partition(".")
+            # Missing values sort as NULLS LAST would ascending
+            rows.sort(key=lambda row: (row.get(column) is None, row.get(column)), reverse=direction == "desc")
+        limit = dict(params).get("limit")
+        if limit is not None:
+            rows = rows[:int(limit)]
+        return httpx.Response(200, content=json.dumps(rows), headers={"content-type": "application/json"})
+
+    def client(self):
+        """A real postgrest client whose requests are answered in memory"""
+        handler = self.handle
+
+        class Client(SyncPostgrestClient):
+            def create_session(self, base_url, headers, timeout):
+                return SyncClient(base_url=base_url, headers=headers, timeout=timeout,
+                                  transport=httpx.MockTransport(handler))
+
+        return Client("http://postgrest.test")
+
+@pytest.fixture
+def postgrest(monkeypatch):
+    """Point the database helpers at a FakePostgREST; fill its tables in the test"""
+    server = FakePostgREST({"youth_members": [], "contributions": []})
+    client = server.client()
+    monkeypatch.setattr(database, "init_connection", lambda: client)
+    st.cache_data.clear()
+    yield server
+    st.cache_data.clear()
@@ -0,0 +1,15 @@
+def members(count, names=("Ama", "Kofi", "Esi")):
+    # Few distinct names, so pages have to break ties on id
+    return [
+        {'id': i, 'full_name': names[i % len(names)], 'birthday': "01/01", 'department_id': i % 2,
+         'phone_number': f"0244{i:06d}", 'email': f"member{i}@example.com"}
+        for i in range(1, count + 1)
+    ]
+
+def contributions(count, days=3):
+    return [
+        {'id': i, 'amount': 10.0, 'contribution_type': "BIRTHDAY" if i % 3 else "PROJECT",
+         'payment_date': f"2026-03-{1 + i % days:02d}", 'week_number': None, 'month': 3, 'year': 2026,
+         'member_id': i, 'youth_members': {'full_name': f"Member {i}", 'department_id': 1}}
+        for i in range(1, count + 1)
+    ]
@@ -0,0 +1,83 @@
+import hashlib
+import hmac
+import json
+import pytest
+from utils.channels import SMSChannel, WebhookChannel
+from utils.mock_gateway import MockGateway
+
+@pytest.fixture
+def gateway():
+    server = MockGateway().start()
+    yield server
+    server.stop()
+
+def header(request, name):
+    return next(value for key, value in request['headers'].items() if key.lower() == name.lower())
+
+def sms(text, *numbers):
+    return {'to': list(numbers), 'subject': "Birthdays", 'text': text}
+
+def test_numbers_are_normalised_to_the_country_code():
+    channel = SMSChannel("http://gateway.test", country_code="233")
+
+    assert channel.normalize("024 412-3456") == "+233244123456"
+    assert channel.normalize("+233 (24) 412 3456") == "+233244123456"
+    assert channel.normalize(None) == ""
+    assert SMSChannel("http://gateway.test").normalize("024 412 3456") == "0244123456"
+
+def test_batches_pack_numbers_up_to_the_batch_size():
+    channel = SMSChannel("http://gateway.test", batch_size=3, country_code="233")
+    notifications = [
+        sms("Happy birthday", "0244000001", "0244000002"),
+        # The same number written two ways is sent once
+        sms("Happy birthday", "+233 24 400 0002", "0244000003", "0244000004"),
+        sms("Pay up", "0244000005")
+    ]
+
+    batches = channel.batches(notifications)
+
+    assert [sum(len(m['to']) for m in batch) for batch in batches] == [3, 2]
+    assert batches[0] == [{'to': ["+233244000001", "+233244000002", "+233244000003"], 'text': "Happy birthday"}]
+    assert batches[1] == [{'to': ["+233244000004"], 'text': "Happy birthday"}, {'to': ["+233244000005"], 'text': "Pay up"}]
+
+def test_sms_batches_reach_the_gateway(gateway):
+    channel = SMSChannel(f"{gateway.url}/sms", api_key="key", sender_id="Church", batch_size=2, country_code="233")
+    numbers = ["0244000001", "0244000002", "0244000003", "12"]
+
+    result = channel.send([sms("Happy birthday", *numbers)])
+
+    assert result['requests'] == 2
+    assert (result['sent'], result['failed']) == (3, 1)
+    assert result['failures'] == [(["12"], "Rejected by gateway")]
+    assert sorted(len(r['payload']['messages'][0]['to']) for r in gateway.requests) == [2, 2]
+    assert all(header(r, "Authorization") == "Bearer key" for r in gateway.requests)
+    assert {r['payload']['sender'] for r in gateway.requests} == {"Church"}
+
+def test_webhook_signatures_verify_against_the_body(gateway):
+    channel = WebhookChannel([f"{gateway.url}/hook-a", f"{gateway.url}/hook-b"], secret="s3cret")
+    notification = dict(sms("Ama turns 20 today", "ignored"), data={'member_id': 7})
+
+    result = channel.send([notification])
+
+    assert (result['sent'], result['requests']) == (2, 2)
+    assert sorted(r['path'] for r in gateway.requests) == ["/hook-a", "/hook-b"]
+    for request in gateway.requests:
+        assert request['payload'] == {'subject': "Birthdays", 'text': "Ama turns 20 today", 'data': {'member_id': 7}}
+        body = json.dumps(request['payload']).encode("utf-8")
+        expected = hmac.new(b"s3cret", body, hashlib.sha256).hexdigest()
+        assert hmac.compare_digest(header(request, "X-Signature-SHA256"), expected)
+        assert header(request, "X-Signature-SHA256") != hmac.new(b"wrong", body, hashlib.sha256).hexdigest()
+
+def test_unsigned_webhooks_and_gateway_failures(gateway):
+    gateway.fail_rate = 1.0
+    sleeps = []
+    channel = WebhookChannel(f"{gateway.url}/hook", max_retries=1, sleep=sleeps.append)
+
+    result = channel.send([sms("Hello", "ignored")])
+
+    assert (result['sent'], result['failed']) == (0, 1)
+    assert "503" in result['failures'][0][1]
+    assert len(sleeps) == 1
+    gateway.fail_rate = 0.0
+    channel.send([sms("Hello", "ignored")])
+    assert not any(key.lower() == "x-signature-sha256" for key in gateway.requests[-1]['headers'])
@@ -0,0 +1,115 @@
+from datetime import datetime
+import numpy as np
+import utils.compliance as compliance
+import utils.database as database
+from utils.compliance import ComplianceMatrix
+
+MEMBERS = [
+    {'id': 1, 'full_name': "Ama", 'department_id': 10},
+    {'id': 2, 'full_name': "Kofi", 'department_id': 10},
+    {'id': 3, 'full_name': "Esi", 'department_id': 20},
+    {'id': 4, 'full_name': "Yaw", 'department_id': None}
+]
+DEPARTMENTS = [{'id': 10, 'name': "Choir"}, {'id': 20, 'name': "Ushers"}]
+TODAY = datetime(2026, 6, 15)
+
+def paid(member_id, year, month, contribution_type="BIRTHDAY"):
+    return {'member_id': member_id, 'contribution_type': contribution_type, 'year': year, 'month': month}
+
+CONTRIBUTIONS = (
+    # Ama paid every month this year, Kofi all but March, Esi only in June
+    [paid(1, 2026, m) for m in range(1, 7)]
+    + [paid(2, 2026, m) for m in (1, 2, 4, 5, 6)]
+    + [paid(3, 2026, 6), paid(3, 2026, 2, "PROJECT")]
+    # Last year's payments extend Ama's streak back
+    + [paid(1, 2025, 11), paid(1, 2025, 12)]
+)
+
+def build(contributions=CONTRIBUTIONS):
+    return ComplianceMatrix.from_rows(MEMBERS, contributions, DEPARTMENTS, today=TODAY)
+
+def test_member_summary_counts_arrears_and_streaks():
+    summary = build().member_summary("BIRTHDAY", 2026, 6)
+
+    assert summary == [
+        {'member_id': 4, 'full_name': "Yaw", 'department': "No Department", 'streak': 0, 'arrears': 6},
+        {'member_id': 3, 'full_name': "Esi", 'department': "Ushers", 'streak': 1, 'arrears': 5},
+        {'member_id': 2, 'full_name': "Kofi", 'department': "Choir", 'streak': 3, 'arrears': 1},
+        {'member_id': 1, 'full_name': "Ama", 'department': "Choir", 'streak': 8, 'arrears': 0}
+    ]
+
+def test_types_are_tracked_separately():
+    matrix = build()
+
+    assert matrix.paid("PROJECT", (2026, 1), (2026, 6))[2].tolist() == [False, True, False, False, False, False]
+    assert not matrix.paid("EVENT", (2025, 11), (2026, 6)).any()
+
+def test_department_rates():
+    matrix = build()
+
+    assert matrix.department_rates("BIRTHDAY", 2026, 3) == {"Choir": 0.5, "No Department": 0.0, "Ushers": 0.0}
+    assert matrix.department_rates("BIRTHDAY", 2026, 6) == {"Choir": 1.0, "No Department": 0.0, "Ushers": 1.0}
+
+def test_paid_outside_the_built_range_is_unpaid():
+    grid = build().paid("BIRTHDAY", (2025, 9), (2026, 8))
+
+    assert grid.shape == (4, 12)
+    assert grid[0].tolist() == [False, False, True, True] + [True] * 6 + [False, False]
+
+def test_matrix_grows_for_months_before_and_after_its_range():
+    matrix = build()
+    matrix.record(4, "BIRTHDAY", 2023, 5)
+    matrix.record(4, "BIRTHDAY", 2027, 1)
+
+    grid = matrix.paid("BIRTHDAY", (2023, 5), (2027, 1))
+    assert np.flatnonzero(grid[3]).tolist() == [0, 44]
+    # Earlier rows kept their bits through the shift
+    assert matrix.member_summary("BIRTHDAY", 2026, 6)[-1]['streak'] == 8
+
+def test_unknown_members_and_types_are_ignored():
+    matrix = build()
+    before = matrix.bits.copy()
+    matrix.record(99, "BIRTHDAY", 2026, 6)
+    matrix.record(1, "DONATION", 2026, 6)
+
+    assert (matrix.bits == before).all()
+
+def test_incremental_contribution_matches_a_full_rebuild(monkeypatch):
+    rows = list(CONTRIBUTIONS)
+    monkeypatch.setattr(compliance, "get_youth_members", lambda: MEMBERS)
+    monkeypatch.setattr(compliance, "get_departments", lambda: DEPARTMENTS)
+    monkeypatch.setattr(compliance, "get_contributions", lambda: list(rows))
+    monkeypatch.setattr(database, "_data_versions", {})
+    monkeypatch.setattr(compliance, "_engine", {})
+
+    engine = compliance.get_compliance_engine()
+
+    # What add_contribution does: bump the version, then tell the listeners
+    new_rows = [paid(2, 2026, 3), paid(4, 2026, 6), paid(3, 2026, 7, "EVENT")]
+    rows.extend(new_rows)
+    database.bump_data_version("contributions")
+    compliance._on_contributions_added(new_rows)
+
+    assert compliance._engine['matrix'] is engine
+    assert engine.version == database.get_data_version(*compliance.TRACKED_TABLES)
+    rebuilt = build(rows)
+    for contribution_type in compliance.CONTRIBUTION_TYPES:
+        assert (engine.paid(contribution_type, (2025, 1), (2026, 12))
+                == rebuilt.paid(contribution_type, (2025, 1), (2026, 12))).all()
+    assert engine.member_summary("BIRTHDAY", 2026, 6) == rebuilt.member_summary("BIRTHDAY", 2026, 6)
+
+def test_other_writes_since_the_build_force_a_rebuild_instead(monkeypatch):
+    monkeypatch.setattr(compliance, "get_youth_members", lambda: MEMBERS)
+    monkeypatch.setattr(compliance, "get_departments", lambda: DEPARTMENTS)
+    monkeypatch.setattr(compliance, "get_contributions", lambda: list(CONTRIBUTIONS))
+    monkeypatch.setattr(database, "_data_versions", {})
+    monkeypatch.setattr(compliance, "_engine", {})
+
+    engine = compliance.get_compliance_engine()
+    database.bump_data_version("youth_members")
+    database.bump_data_version("contributions")
+    compliance._on_contributions_added([paid(4, 2026, 6)])
+
+    # The stale matrix is left alone and replaced on the next read
+    assert not engine.paid("BIRTHDAY", (2026, 6), (2026, 6))[3, 0]
+    assert compliance.get_compliance_engine() is not engine
@@ -0,0 +1,84 @@
+from utils.database import get_members_page, get_contributions_page, search_members
+from utils.search import MemberSearchIndex
+from factories import contributions, members
+
+def walk_pages(fetch, limit, cursor):
+    """Follow a keyset-paginated listing from the first page to the last"""
+    rows, after = [], None
+    while True:
+        page = fetch(after, limit)
+        rows += page
+        if len(page) < limit:
+            return rows
+        after = cursor(page[-1])
+
+def test_member_pages_cover_every_row_once_with_duplicate_names(postgrest):
+    postgrest.tables['youth_members'] = members(23)
+
+    for descending in (False, True):
+        rows = walk_pages(
+            lambda after, limit: get_members_page(after, limit, "full_name", descending),
+            5, lambda row: (row['full_name'], row['id'])
+        )
+        expected = sorted(postgrest.tables['youth_members'], key=lambda m: (m['full_name'], m['id']), reverse=descending)
+        assert [row['id'] for row in rows] == [m['id'] for m in expected]
+
+def test_pages_send_one_order_param_and_an_or_cursor(postgrest):
+    postgrest.tables['youth_members'] = members(10)
+
+    first = get_members_page(limit=4)
+    get_members_page((first[-1]['full_name'], first[-1]['id']), 4)
+
+    params = postgrest.requests[-1]
+    assert [value for key, value in params if key == "order"] == ["full_name,id"]
+    assert ("or", f'(full_name.gt."{first[-1]["full_name"]}",'
+                  f'and(full_name.eq."{first[-1]["full_name"]}",id.gt."{first[-1]["id"]}"))') in params
+
+def search_youth_members(postgrest):
+    """Stand in for the search_youth_members SQL function with the same trigram matching"""
+    def search(search_query, max_results):
+        return MemberSearchIndex(postgrest.tables['youth_members']).search(search_query, max_results)
+    return search
+
+def test_member_pages_search_through_the_ranked_search(postgrest):
+    postgrest.tables['youth_members'] = members(12) + [
+        {'id': 13, 'full_name': "Christiana Aboagye", 'birthday': "02/02", 'department_id': 1,
+         'phone_number': None, 'email': None}
+    ]
+    postgrest.functions['search_youth_members'] = search_youth_members(postgrest)
+
+    # Typos match here just as they do in the member search box
+    assert [m['id'] for m in get_members_page(limit=50, search="Christiana Aboagey")] == [13]
+    assert postgrest.calls[-1] == ("search_youth_members", {"search_query": "Christiana Aboagey", "max_results": 10000})
+
+    rows = walk_pages(
+        lambda after, limit: get_members_page(after, limit, search="kofi"), 2, lambda row: (row['full_name'], row['id'])
+    )
+    assert [m['id'] for m in rows] == [1, 4, 7, 10]
+    assert [m['id'] for m in get_members_page(limit=50, department_id=1, search="esi")] == [5, 11]
+
+def test_member_search_falls_back_to_substring_matching_without_the_rpc(postgrest):
+    postgrest.tables['youth_members'] = members(12)
+
+    assert {m['id'] for m in get_members_page(limit=50, search="kofi")} == {1, 4, 7, 10}
+    assert [m['id'] for m in get_members_page(limit=50, search="0244000007")] == [7]
+    assert [m['id'] for m in get_members_page(limit=50, search="MEMBER12@")] == [12]
+    assert [m['id'] for m in get_members_page(limit=50, department_id=1, search="esi")] == [5, 11]
+
+def test_contribution_pages_newest_first_with_filters(postgrest):
+    postgrest.tables['contributions'] = contributions(40)
+
+    rows = walk_pages(
+        lambda after, limit: get_contributions_page(after, limit, contribution_type="BIRTHDAY"),
+        6, lambda row: (row['payment_date'], row['id'])
+    )
+    expected = sorted(
+        (c for c in postgrest.tables['contributions'] if c['contribution_type'] == "BIRTHDAY"),
+        key=lambda c: (c['payment_date'], c['id']), reverse=True
+    )
+    assert [row['id'] for row in rows] == [c['id'] for c in expected]
+
+def test_search_members_orders_ties_by_id(postgrest):
+    postgrest.tables['youth_members'] = members(9)
+
+    assert [m['id'] for m in search_members("", limit=4)] == [3, 6, 9, 2]
@@ -0,0 +1,85 @@
+import csv
+import os
+import time
+import pytest
+import utils.export as export
+from utils.export import cached_export, write_contributions_report, write_members_csv
+from factories import contributions, members
+
+DEPARTMENTS = [{'id': 0, 'name': "Choir"}, {'id': 1, 'name': "Ushers"}]
+
+@pytest.fixture
+def export_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(export, "EXPORT_DIR", str(tmp_path))
+    return tmp_path
+
+def test_members_csv_streams_every_batch(postgrest, tmp_path, monkeypatch):
+    # Over two full batches of 1000, with names repeating across batch edges
+    postgrest.tables['youth_members'] = members(2500)
+    monkeypatch.setattr(export, "get_departments", lambda: DEPARTMENTS)
+
+    path = tmp_path / "members.csv"
+    write_members_csv(str(path))
+
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == export.MEMBER_HEADERS
+    assert len(rows) == 2501
+    assert sorted(row[3] for row in rows[1:]) == sorted(m['phone_number'] for m in postgrest.tables['youth_members'])
+    assert len([params for params in postgrest.requests if ("limit", "1000") in params]) == 3
+
+def test_contributions_report_streams_every_batch(postgrest, tmp_path, monkeypatch):
+    openpyxl = pytest.importorskip("openpyxl")
+    postgrest.tables['contributions'] = contributions(2300, days=28)
+    monkeypatch.setattr(export, "get_departments", lambda: DEPARTMENTS)
+    monkeypatch.setattr(export, "get_contribution_defaulters", lambda *args: [])
+    monkeypatch.setattr(export, "get_defaulters_by_department", lambda *args: [
+        {'department_name': "Ushers", 'member_count': 2300, 'defaulter_count': 0}
+    ])
+
+    path = tmp_path / "report.xlsx"
+    write_contributions_report(str(path), "All", None, None, 3, 2026)
+
+    workbook = openpyxl.load_workbook(path, read_only=True)
+    assert workbook["Contributions"].max_row == 2301
+    summary = list(workbook["Department Summary"].iter_rows(min_row=2, values_only=True))
+    assert summary == [("Ushers", 2300, 0, 100, 2300, 23000)]
+
+def test_cached_export_reuses_a_file_until_it_expires(export_dir, monkeypatch):
+    writes = []
+
+    def write(path):
+        writes.append(path)
+        with open(path, "w") as f:
+            f.write(str(len(writes)))
+
+    first = cached_export("report", (1, 2), ("All",), ".txt", write)
+    assert cached_export("report", (1, 2), ("All",), ".txt", write) == first
+    assert len(writes) == 1
+
+    expired = time.time() - export.EXPORT_TTL_SECONDS - 1
+    os.utime(first, (expired, expired))
+    assert cached_export("report", (1, 2), ("All",), ".txt", write) == first
+    assert len(writes) == 2
+    with open(first) as f:
+        assert f.read() == "2"
+
+def test_cached_export_is_not_shared_across_version_scopes(export_dir, monkeypatch):
+    write = lambda path: open(path, "w").close()
+
+    # Another process, or this one after a restart, counts versions from zero again
+    monkeypatch.setattr(export, "get_data_version_scope", lambda: "process:a")
+    first = cached_export("report", (0,), (), ".txt", write)
+    monkeypatch.setattr(export, "get_data_version_scope", lambda: "process:b")
+    assert cached_export("report", (0,), (), ".txt", write) != first
+
+def test_cached_export_prunes_expired_and_abandoned_files(export_dir):
+    stale = time.time() - export.STALE_TMP_SECONDS - 1
+    for name in ("old-report.txt", "abandoned.tmp"):
+        (export_dir / name).write_text("")
+        os.utime(export_dir / name, (stale, stale))
+    (export_dir / "running.tmp").write_text("")
+
+    kept = cached_export("report", (0,), (), ".txt", lambda path: open(path, "w").close())
+
+    assert sorted(os.listdir(export_dir)) == sorted([os.path.basename(kept), "running.tmp"])
@@ -0,0 +1,95 @@
+import random
+from datetime import date, timedelta
+import pandas as pd
+import pytest
+from utils.ledger import ContributionLedger
+
+TYPES = ["BIRTHDAY", "PROJECT", "EVENT"]
+
+def random_contributions(count=600, members=15, seed=1):
+    rng = random.Random(seed)
+    first = date(2026, 1, 1)
+    return [
+        {'id': i, 'member_id': rng.randint(1, members), 'contribution_type': rng.choice(TYPES),
+         'amount': round(rng.uniform(1, 200), 2),
+         'payment_date': (first + timedelta(days=rng.randrange(90))).isoformat(),
+         'youth_members': {'full_name': f"Member {i % members}"}}
+        for i in range(1, count + 1)
+    ]
+
+def frame(rows, contribution_type=None, start=None, end=None):
+    """The same selection done the plain pandas way"""
+    df = pd.DataFrame(rows)
+    df['day'] = pd.to_datetime(df['payment_date']).dt.date
+    if contribution_type:
+        df = df[df['contribution_type'] == contribution_type]
+    if start:
+        df = df[df['day'] >= start]
+    if end:
+        df = df[df['day'] <= end]
+    return df
+
+RANGES = [
+    (None, None),
+    (date(2026, 2, 1), date(2026, 2, 28)),
+    # A single day, and bounds that land exactly on payment days
+    (date(2026, 1, 10), date(2026, 1, 10)),
+    (date(2026, 1, 1), date(2026, 3, 31)),
+    # Ranges with nothing in them
+    (date(2025, 1, 1), date(2025, 12, 31)),
+    (date(2026, 3, 10), date(2026, 3, 1))
+]
+
+@pytest.mark.parametrize("start,end", RANGES)
+@pytest.mark.parametrize("contribution_type", [None] + TYPES)
+def test_summaries_match_a_groupby(contribution_type, start, end):
+    rows = random_contributions()
+    ledger = ContributionLedger(rows)
+    expected = frame(rows, contribution_type, start, end).groupby('member_id')['amount'].agg(['sum', 'count'])
+
+    for member_id in range(1, 16):
+        summary = ledger.summary(member_id, contribution_type, start, end)
+        total, count = expected.loc[member_id] if member_id in expected.index else (0.0, 0)
+        assert summary['count'] == count
+        assert summary['total'] == pytest.approx(total)
+        assert summary['average'] == pytest.approx(total / count if count else 0.0)
+
+@pytest.mark.parametrize("start,end", RANGES)
+@pytest.mark.parametrize("contribution_type", [None, "PROJECT"])
+def test_top_contributors_match_a_groupby(contribution_type, start, end):
+    rows = random_contributions()
+    ledger = ContributionLedger(rows)
+    totals = frame(rows, contribution_type, start, end).groupby('member_id')['amount'].sum()
+    expected = totals[totals > 0].sort_values(ascending=False).head(5)
+
+    top = ledger.top_contributors(5, contribution_type, start, end)
+
+    assert [row['member_id'] for row in top] == list(expected.index)
+    assert [row['total'] for row in top] == pytest.approx(list(expected.values))
+
+def test_boundaries_are_inclusive_and_accept_dates_or_strings():
+    rows = [
+        {'member_id': 1, 'contribution_type': "BIRTHDAY", 'amount': 5, 'payment_date': "2026-01-31"},
+        {'member_id': 1, 'contribution_type': "BIRTHDAY", 'amount': 7, 'payment_date': "2026-02-01T10:30:00"},
+        {'member_id': 1, 'contribution_type': "BIRTHDAY", 'amount': 11, 'payment_date': "2026-02-28"},
+        {'member_id': 1, 'contribution_type': "BIRTHDAY", 'amount': 13, 'payment_date': "2026-03-01"}
+    ]
+    ledger = ContributionLedger(rows)
+
+    assert ledger.summary(1, start=date(2026, 2, 1), end=date(2026, 2, 28))['total'] == 18.0
+    assert ledger.summary(1, start="2026-01-31", end="2026-02-01")['count'] == 2
+    assert ledger.summary(1, start=date(2026, 3, 1))['total'] == 13.0
+    assert ledger.summary(1, end=date(2026, 1, 31))['total'] == 5.0
+
+def test_members_without_contributions_and_undated_rows():
+    ledger = ContributionLedger([
+        {'member_id': 1, 'contribution_type': "EVENT", 'amount': 20, 'payment_date': None},
+        {'member_id': 2, 'contribution_type': "EVENT", 'amount': None, 'payment_date': "2026-01-05"}
+    ])
+
+    assert ledger.summary(1) == {'total': 0.0, 'count': 0, 'average': 0.0}
+    assert ledger.summary(2) == {'total': 0.0, 'count': 1, 'average': 0.0}
+    assert ledger.summary(3, "BIRTHDAY") == {'total': 0.0, 'count': 0, 'average': 0.0}
+    # Zero totals never make the top list
+    assert ledger.top_contributors(5) == []
+    assert ContributionLedger([]).top_contributors(5) == []
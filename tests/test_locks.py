@@ -0,0 +1,79 @@
+import time
+import pytest
+import utils.email_service as email_service
+import utils.locks as locks
+from utils.locks import FallbackLeases, FileLeases, hold_lease
+
+class BrokenLeases:
+    name = "broken"
+
+    def acquire(self, name, holder, ttl):
+        raise ConnectionError("database unreachable")
+
+    def release(self, name, holder):
+        raise ConnectionError("database unreachable")
+
+@pytest.fixture
+def store(tmp_path):
+    return FileLeases(str(tmp_path))
+
+def test_a_held_lease_is_refused_to_a_second_holder(store):
+    with hold_lease("reminders", store=store) as first:
+        with hold_lease("reminders", store=store) as second:
+            assert first.acquired and not second.acquired
+        # Other names are independent
+        with hold_lease("reports", store=store) as other:
+            assert other.acquired
+    with hold_lease("reminders", store=store) as after:
+        assert after.acquired
+
+def test_an_expired_lease_can_be_taken_over(store):
+    # A holder that crashed without releasing, so nothing renews its lease
+    assert store.acquire("reminders", "crashed-host:1", 0.2)
+    with hold_lease("reminders", store=store) as early:
+        assert not early.acquired
+
+    time.sleep(0.3)
+    with hold_lease("reminders", store=store) as late:
+        assert late.acquired
+
+def test_the_heartbeat_keeps_extending_the_lease(store):
+    with hold_lease("reminders", ttl=0.3, store=store) as held:
+        time.sleep(0.8)
+        with hold_lease("reminders", store=store) as other:
+            assert not other.acquired
+        assert not held.lost
+
+def test_a_lease_taken_over_after_a_stall_is_reported_lost(store):
+    with hold_lease("reminders", ttl=0.3, store=store) as held:
+        # Someone else's lease replaces ours, as if we had stalled past the ttl
+        store.release("reminders", held.holder)
+        assert store.acquire("reminders", "other-host:2", 60)
+        time.sleep(0.3)
+        assert held.lost
+
+def test_an_unreachable_store_counts_as_acquired():
+    with hold_lease("reminders", store=BrokenLeases()) as lease:
+        assert lease.acquired
+
+def test_the_fallback_store_is_used_while_the_primary_errors(store):
+    fallback = FallbackLeases(BrokenLeases(), store)
+    with hold_lease("reminders", store=fallback) as first:
+        assert first.acquired
+        with hold_lease("reminders", store=fallback) as second:
+            assert not second.acquired
+
+def test_only_one_retry_queue_drain_runs_at_a_time(store, monkeypatch):
+    drains = []
+    monkeypatch.setattr(locks, "_store", store)
+    monkeypatch.setattr(email_service, "get_dispatcher", lambda: "dispatcher")
+    monkeypatch.setattr(email_service, "drain_retries", lambda dispatcher, max_attempts: drains.append(dispatcher) or
+                        {'sent': 1, 'retrying': 0, 'dead_lettered': 0})
+
+    # The 15-minute job is draining on another replica
+    with hold_lease("notification_retries"):
+        assert email_service.retry_failed_notifications() == {'sent': 0, 'retrying': 0, 'dead_lettered': 0, 'in_progress': True}
+    assert drains == []
+
+    assert email_service.retry_failed_notifications() == {'sent': 1, 'retrying': 0, 'dead_lettered': 0}
+    assert drains == ["dispatcher"]
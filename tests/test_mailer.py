@@ -0,0 +1,106 @@
+import smtplib
+import time
+from email import message_from_bytes
+import pytest
+from utils.mailer import Dispatcher, SMTPPool, TokenBucket, build_messages, is_transient
+from utils.smtp_sink import SMTPSink
+
+RECIPIENTS = [f"member{i}@example.com" for i in range(7)]
+
+@pytest.fixture
+def sink():
+    server = SMTPSink().start()
+    yield server
+    server.stop()
+
+def connect_to(sink):
+    def connect():
+        session = smtplib.SMTP(sink.host, sink.port, timeout=5)
+        session.login("user", "secret")
+        return session
+    return connect
+
+def test_individual_mode_sends_everyone_their_own_copy(sink):
+    messages = build_messages("office@example.com", RECIPIENTS, "Birthdays", "<p>Hi</p>", "Hi")
+    result = Dispatcher(connect_to(sink), rate_per_second=1000).send(messages)
+
+    assert result.sent == 7 and result.delivered_recipients == 7
+    assert sorted(m['rcpt_tos'][0] for m in sink.messages) == RECIPIENTS
+    for received in sink.messages:
+        parsed = message_from_bytes(received['data'])
+        assert parsed["To"] == received['rcpt_tos'][0]
+        # Text first, so clients that can show HTML pick it
+        assert [part.get_content_type() for part in parsed.get_payload()] == ["text/plain", "text/html"]
+
+def test_bcc_mode_batches_hidden_recipients(sink):
+    messages = build_messages("office@example.com", RECIPIENTS, "Birthdays", "<p>Hi</p>", mode="bcc", batch_size=3)
+
+    assert [recipients for _, recipients in messages] == [RECIPIENTS[0:3], RECIPIENTS[3:6], RECIPIENTS[6:]]
+    result = Dispatcher(connect_to(sink), rate_per_second=1000).send(messages)
+
+    assert result.sent == 3 and result.delivered_recipients == 7
+    assert sorted(len(m['rcpt_tos']) for m in sink.messages) == [1, 3, 3]
+    for received in sink.messages:
+        data = received['data'].decode()
+        assert message_from_bytes(received['data'])["To"] == "office@example.com"
+        assert not any(address in data for address in RECIPIENTS)
+
+def test_token_bucket_holds_the_rate_after_the_burst():
+    bucket = TokenBucket(rate=20, capacity=2)
+    started = time.monotonic()
+    for _ in range(12):
+        bucket.acquire()
+
+    # Two tokens up front, then ten more at 20 a second
+    assert time.monotonic() - started == pytest.approx(0.5, abs=0.15)
+
+def test_dispatcher_sends_at_the_bucket_rate(sink):
+    messages = build_messages("office@example.com", RECIPIENTS[:6], "Birthdays", "<p>Hi</p>")
+    result = Dispatcher(connect_to(sink), max_workers=4, rate_per_second=10, burst=1).send(messages)
+
+    assert result.sent == 6
+    assert result.elapsed >= 0.45
+
+def test_transient_failures_are_retried_then_reported_as_transient(sink):
+    sink.fail_rate = 1.0
+    sleeps = []
+    messages = build_messages("office@example.com", RECIPIENTS[:2], "Birthdays", "<p>Hi</p>")
+    result = Dispatcher(connect_to(sink), rate_per_second=1000, max_retries=2, sleep=sleeps.append).send(messages)
+
+    assert result.sent == 0 and result.failed == 2 and result.retries == 4
+    assert sink.stats()["failed"] == 6
+    assert all(transient for _, _, _, transient in result.failed_messages)
+    assert all("451" in error for _, _, error, _ in result.failed_messages)
+    assert len(sleeps) == 4
+
+def test_permanent_failures_are_not_retried():
+    def refuse_login():
+        raise smtplib.SMTPAuthenticationError(535, b"Bad credentials")
+
+    sleeps = []
+    messages = build_messages("office@example.com", RECIPIENTS[:2], "Birthdays", "<p>Hi</p>")
+    result = Dispatcher(refuse_login, rate_per_second=1000, sleep=sleeps.append).send(messages)
+
+    assert result.failed == 2 and result.retries == 0 and sleeps == []
+    assert [transient for _, _, _, transient in result.failed_messages] == [False, False]
+
+def test_error_classification():
+    assert is_transient(smtplib.SMTPDataError(451, b"Try later"))
+    assert is_transient(smtplib.SMTPServerDisconnected())
+    assert is_transient(ConnectionResetError())
+    assert not is_transient(smtplib.SMTPRecipientsRefused({"a@example.com": (550, b"No such user")}))
+    assert not is_transient(smtplib.SMTPDataError(554, b"Rejected"))
+    assert not is_transient(ValueError())
+
+def test_pool_reuses_sessions_up_to_its_size(sink):
+    pool = SMTPPool(connect_to(sink), size=2)
+    first, second = pool.acquire(), pool.acquire()
+    pool.release(first)
+
+    assert pool.acquire() is first
+    assert pool.opened == 2
+    pool.discard(second)
+    assert pool.opened == 1
+    pool.release(first)
+    pool.close()
+    assert pool.opened == 0
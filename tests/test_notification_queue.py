@@ -0,0 +1,110 @@
+from datetime import datetime, timedelta, timezone
+from email.mime.text import MIMEText
+import smtplib
+import pytest
+import utils.notification_queue as notification_queue
+from utils.mailer import DispatchResult, is_transient
+from utils.notification_queue import (
+    MAX_ATTEMPTS, RETRY_BASE_SECONDS, RETRY_MAX_SECONDS, drain_retries, next_attempt_at, replay_dead_letters
+)
+
+NOW = datetime(2026, 6, 1, 9, 0, tzinfo=timezone.utc)
+
+class StubDispatcher:
+    """Fails sends to the given addresses with the given errors and delivers the rest"""
+
+    def __init__(self, errors=None):
+        self.errors = errors or {}
+        self.sent = []
+
+    def send(self, messages):
+        result = DispatchResult()
+        for message, recipients in messages:
+            error = self.errors.get(recipients[0])
+            if error is None:
+                self.sent.append(recipients)
+                result.sent += 1
+            else:
+                result.failed += 1
+                result.failed_messages.append((message, recipients, str(error), is_transient(error)))
+        return result
+
+def retry(retry_id, address, attempts=1, due=NOW):
+    message = MIMEText("Happy birthday")
+    message["Subject"] = f"To {address}"
+    return {'id': retry_id, 'recipients': [address], 'subject': message["Subject"], 'message': message.as_string(),
+            'attempts': attempts, 'last_error': "451 busy", 'next_attempt_at': due.isoformat()}
+
+@pytest.fixture
+def queue(postgrest, monkeypatch):
+    postgrest.tables["notification_retries"] = []
+    postgrest.tables["notification_dead_letters"] = []
+    # No jitter, so the backoff can be checked exactly
+    monkeypatch.setattr(notification_queue.random, "random", lambda: 1.0)
+    return postgrest.tables
+
+def test_next_attempt_backs_off_exponentially_up_to_the_cap(monkeypatch):
+    monkeypatch.setattr(notification_queue.random, "random", lambda: 1.0)
+    delays = [(next_attempt_at(attempts, NOW) - NOW).total_seconds() for attempts in range(1, 10)]
+
+    assert delays[:4] == [RETRY_BASE_SECONDS, 2 * RETRY_BASE_SECONDS, 4 * RETRY_BASE_SECONDS, 8 * RETRY_BASE_SECONDS]
+    assert delays[-1] == RETRY_MAX_SECONDS
+    # Jitter only ever shortens the delay, by up to half
+    monkeypatch.setattr(notification_queue.random, "random", lambda: 0.0)
+    assert next_attempt_at(3, NOW) - NOW == timedelta(seconds=2 * RETRY_BASE_SECONDS)
+
+def test_sent_rows_are_deleted_and_rows_not_yet_due_are_left(queue):
+    queue["notification_retries"] += [retry(1, "ama@example.com"), retry(2, "kofi@example.com", due=NOW + timedelta(hours=1))]
+    dispatcher = StubDispatcher()
+
+    summary = drain_retries(dispatcher, now=NOW)
+
+    assert summary == {'sent': 1, 'retrying': 0, 'dead_lettered': 0}
+    assert dispatcher.sent == [["ama@example.com"]]
+    assert [row['id'] for row in queue["notification_retries"]] == [2]
+
+def test_transient_failures_are_rescheduled_with_backoff(queue):
+    queue["notification_retries"].append(retry(1, "ama@example.com", attempts=2))
+    dispatcher = StubDispatcher({"ama@example.com": smtplib.SMTPDataError(451, b"Try later")})
+
+    summary = drain_retries(dispatcher, now=NOW)
+
+    assert summary == {'sent': 0, 'retrying': 1, 'dead_lettered': 0}
+    row, = queue["notification_retries"]
+    assert row['attempts'] == 3
+    assert "Try later" in row['last_error']
+    assert datetime.fromisoformat(row['next_attempt_at']) == NOW + timedelta(seconds=4 * RETRY_BASE_SECONDS)
+    assert queue["notification_dead_letters"] == []
+
+def test_last_attempts_and_permanent_failures_are_dead_lettered(queue):
+    queue["notification_retries"] += [retry(1, "ama@example.com", attempts=MAX_ATTEMPTS - 1), retry(2, "kofi@example.com")]
+    dispatcher = StubDispatcher({
+        "ama@example.com": smtplib.SMTPDataError(451, b"Try later"),
+        "kofi@example.com": smtplib.SMTPRecipientsRefused({"kofi@example.com": (550, b"No such user")})
+    })
+
+    summary = drain_retries(dispatcher, now=NOW)
+
+    assert summary == {'sent': 0, 'retrying': 0, 'dead_lettered': 2}
+    assert queue["notification_retries"] == []
+    letters = {row['recipients'][0]: row for row in queue["notification_dead_letters"]}
+    assert letters["ama@example.com"]['attempts'] == MAX_ATTEMPTS
+    assert letters["kofi@example.com"]['attempts'] == 2
+    assert letters["kofi@example.com"]['subject'] == "To kofi@example.com"
+
+def test_replay_requeues_dead_letters_with_attempts_reset(queue):
+    queue["notification_dead_letters"] += [
+        dict(retry(1, "ama@example.com", attempts=MAX_ATTEMPTS), failed_at="2026-05-30T00:00:00"),
+        dict(retry(2, "kofi@example.com", attempts=2), failed_at="2026-05-31T00:00:00")
+    ]
+
+    assert replay_dead_letters([2], now=NOW) == 1
+    row, = queue["notification_retries"]
+    assert (row['recipients'], row['attempts']) == (["kofi@example.com"], 0)
+    assert [letter['id'] for letter in queue["notification_dead_letters"]] == [1]
+
+    assert replay_dead_letters(now=NOW) == 1
+    # Both are due at once and go out on the next drain
+    summary = drain_retries(StubDispatcher(), now=NOW)
+    assert summary['sent'] == 2
+    assert queue["notification_retries"] == [] and queue["notification_dead_letters"] == []
@@ -0,0 +1,95 @@
+import pytest
+import utils.locks as locks
+from utils.channels import empty_result
+from utils.locks import FileLeases
+from utils.payment_reminders import PaymentReminderJob
+
+DEFAULTERS = [
+    {'id': 1, 'full_name': "Ama", 'email': "ama@example.com", 'phone_number': "0244000001", 'department_name': "Choir"},
+    {'id': 2, 'full_name': "Kofi", 'email': "kofi@example.com", 'phone_number': None, 'department_name': None},
+    {'id': 3, 'full_name': "Esi", 'email': None, 'phone_number': "0244000003", 'department_name': "Ushers"},
+    {'id': 4, 'full_name': "Yaw", 'email': None, 'phone_number': None, 'department_name': None}
+]
+
+class RecordingChannel:
+    """Accepts every notification except those to the given addresses"""
+
+    def __init__(self, name, failing=()):
+        self.name = name
+        self.failing = set(failing)
+        self.sent = []
+
+    def send(self, notifications):
+        result = empty_result(self.name)
+        for notification in notifications:
+            if self.failing & set(notification['to']):
+                result['failed'] += 1
+                result['failures'].append((notification['to'], "Rejected"))
+            else:
+                result['sent'] += 1
+                self.sent.extend(notification['to'])
+        return result
+
+@pytest.fixture
+def reminders(postgrest, monkeypatch, tmp_path):
+    """Serve payment_reminder_targets from DEFAULTERS less the members recorded in payment_reminders"""
+    postgrest.tables["payment_reminders"] = []
+
+    def payment_reminder_targets(target_month, target_year, target_type):
+        reminded = {
+            row['member_id'] for row in postgrest.tables["payment_reminders"]
+            if (row['contribution_type'], row['year'], row['month']) == (target_type, target_year, target_month)
+        }
+        return [member for member in DEFAULTERS if member['id'] not in reminded]
+
+    postgrest.functions["payment_reminder_targets"] = payment_reminder_targets
+    monkeypatch.setattr(locks, "_store", FileLeases(str(tmp_path)))
+    return postgrest.tables
+
+def run(channels, batch_size=2, month=6):
+    job = PaymentReminderJob(month, 2026, "BIRTHDAY", channels, batch_size=batch_size)
+    job.run()
+    return job
+
+def test_a_second_run_in_the_same_month_sends_nothing(reminders):
+    email, sms = RecordingChannel("email"), RecordingChannel("sms")
+
+    first = run({'email': email, 'sms': sms}).progress()
+    assert first['status'] == "finished"
+    assert (first['total'], first['reminded'], first['no_contact'], first['sent']) == (4, 3, 1, 4)
+    assert sorted(email.sent) == ["ama@example.com", "kofi@example.com"]
+    assert sorted(sms.sent) == ["0244000001", "0244000003"]
+    channels = {row['member_id']: row['channels'] for row in reminders["payment_reminders"]}
+    assert channels == {1: ["email", "sms"], 2: ["email"], 3: ["sms"]}
+
+    email.sent.clear()
+    sms.sent.clear()
+    second = run({'email': email, 'sms': sms}).progress()
+    assert second['status'] == "finished"
+    # Only the member with no contact details is left, and nothing can reach them
+    assert (second['total'], second['sent'], second['reminded']) == (1, 0, 0)
+    assert email.sent == [] and sms.sent == []
+    assert len(reminders["payment_reminders"]) == 3
+
+def test_members_not_reached_are_tried_again_and_other_months_are_separate(reminders):
+    email, sms = RecordingChannel("email", failing={"kofi@example.com"}), RecordingChannel("sms")
+    run({'email': email, 'sms': sms})
+    assert {row['member_id'] for row in reminders["payment_reminders"]} == {1, 3}
+
+    email.failing.clear()
+    email.sent.clear()
+    run({'email': email, 'sms': sms})
+    assert email.sent == ["kofi@example.com"]
+
+    email.sent.clear()
+    assert run({'email': email, 'sms': sms}, month=7).progress()['reminded'] == 3
+    assert sorted(email.sent) == ["ama@example.com", "kofi@example.com"]
+
+def test_a_cycle_held_elsewhere_is_not_sent(reminders):
+    email = RecordingChannel("email")
+    with locks.hold_lease("payment_reminders:BIRTHDAY:2026:6") as lease:
+        assert lease.acquired
+        job = run({'email': email})
+
+    assert job.status == "failed" and "another server" in job.error
+    assert email.sent == [] and reminders["payment_reminders"] == []
@@ -0,0 +1,66 @@
+from datetime import date, datetime, timezone
+from zoneinfo import ZoneInfo
+import pytest
+from utils.email_service import route_birthday_reminders
+from utils.reminder_schedule import ReminderEngine
+
+LONDON = ZoneInfo("Europe/London")
+SLOTS = {"morning": "09:00", "evening": "20:00"}
+
+def engine_at(*utc, tz="Europe/London", slots=SLOTS, window_minutes=60):
+    return ReminderEngine(tz, slots, window_minutes, clock=lambda: datetime(*utc, tzinfo=timezone.utc))
+
+def test_now_follows_the_zone_across_the_clock_change():
+    # Clocks went forward at 01:00 UTC on 29 March 2026
+    before, after = engine_at(2026, 3, 29, 0, 30).now(), engine_at(2026, 3, 29, 1, 30).now()
+
+    assert (before.hour, before.utcoffset().total_seconds()) == (0, 0)
+    assert (after.hour, after.utcoffset().total_seconds()) == (2, 3600)
+    assert after.tzinfo == LONDON
+
+@pytest.mark.parametrize("utc,slot", [
+    # Winter: 09:00 local is 09:00 UTC
+    ((2026, 3, 28, 8, 30), "morning"),
+    ((2026, 3, 28, 9, 59), "morning"),
+    ((2026, 3, 28, 10, 0), None),
+    # Summer time from the 29th: 09:00 local is 08:00 UTC
+    ((2026, 3, 29, 7, 0), "morning"),
+    ((2026, 3, 29, 8, 59), "morning"),
+    ((2026, 3, 29, 9, 0), None),
+    ((2026, 3, 29, 19, 30), "evening"),
+    # Back to winter time on 25 October
+    ((2026, 10, 24, 7, 30), "morning"),
+    ((2026, 10, 25, 7, 30), None),
+    ((2026, 10, 25, 8, 30), "morning")
+])
+def test_current_slot_is_on_the_local_wall_clock(utc, slot):
+    engine = engine_at(*utc)
+
+    assert engine.current_slot() == slot
+    assert engine.current_slot(datetime(*utc, tzinfo=timezone.utc)) == slot
+
+def test_slot_windows_reach_across_midnight():
+    engine = engine_at(2026, 3, 28, 23, 50, slots={"late": "23:30", "morning": "09:00"})
+
+    assert engine.current_slot() == "late"
+    assert engine.current_slot(datetime(2026, 3, 29, 0, 20, tzinfo=LONDON)) == "late"
+    assert engine.first_slot == "morning"
+
+def test_slot_times_and_next_slot_take_the_day_offset():
+    engine = engine_at(2026, 3, 28, 21, 0)
+
+    assert engine.slot_time("morning", date(2026, 3, 29)).astimezone(timezone.utc).hour == 8
+    assert engine.slot_time("morning", date(2026, 3, 28)).astimezone(timezone.utc).hour == 9
+    name, at = engine.next_slot()
+    assert (name, at.astimezone(timezone.utc)) == ("morning", datetime(2026, 3, 29, 8, 0, tzinfo=timezone.utc))
+
+def test_sms_goes_out_with_the_given_engines_first_slot():
+    windows = {0: [{'name': "Ama", 'birthday': "March 29", 'department': "Choir", 'department_id': 1}]}
+    recipients = [{'email': "pastor@example.com", 'phone_number': "0244000001", 'channels': ['email', 'sms']}]
+    engine = engine_at(2026, 3, 29, 5, 0, slots={"dawn": "06:00", "morning": "09:00"})
+
+    dawn = route_birthday_reminders(windows, recipients, "dawn", ["email", "sms"], engine=engine)
+    morning = route_birthday_reminders(windows, recipients, "morning", ["email", "sms"], engine=engine)
+
+    assert [text['to'] for text in dawn["sms"]] == [["0244000001"]]
+    assert "sms" not in morning
@@ -0,0 +1,27 @@
+import utils.reports as reports
+from factories import contributions
+
+def test_rollup_totals_every_batch(postgrest, monkeypatch):
+    # More contributions in the month than fit in one batch of 1000
+    rows = contributions(2300, days=28)
+    for c in rows:
+        c['youth_members']['department_id'] = c['id'] % 2
+    postgrest.tables['contributions'] = rows
+    monkeypatch.setattr(reports, "get_departments", lambda: [{'id': 0, 'name': "Choir"}, {'id': 1, 'name': "Ushers"}])
+    monkeypatch.setattr(reports, "get_defaulters_by_department", lambda *args: [])
+    monkeypatch.setattr(reports, "get_contribution_defaulters", lambda *args: [])
+    monkeypatch.setattr(reports, "get_monthly_birthdays", lambda month: [])
+
+    rollup = reports._build_rollup((1, 1, 1), 3, 2026, "All")
+
+    overall = rollup['overall']
+    assert overall['count'] == 2300
+    assert overall['total'] == 23000.0
+    assert overall['contributors'] == 2300
+    assert overall['by_type'] == {
+        "BIRTHDAY": 10.0 * sum(1 for c in rows if c['contribution_type'] == "BIRTHDAY"),
+        "PROJECT": 10.0 * sum(1 for c in rows if c['contribution_type'] == "PROJECT")
+    }
+    assert sum(overall['by_day']) == 23000.0
+    assert {name: section['count'] for name, section in rollup['departments'].items()} == {"Choir": 1150, "Ushers": 1150}
+    assert len([params for params in postgrest.requests if ("limit", "1000") in params]) == 3
@@ -0,0 +1,77 @@
+from utils.email_service import route_birthday_reminders
+from utils.routing import RoutingTable
+
+CHOIR, USHERS = 10, 20
+
+def member(name, department_id):
+    return {'name': name, 'birthday': "June 01", 'department': str(department_id), 'department_id': department_id}
+
+AMA, KOFI, ESI, YAW = member("Ama", CHOIR), member("Kofi", USHERS), member("Esi", CHOIR), member("Yaw", 99)
+WINDOWS = {0: [AMA, KOFI], 3: [ESI, YAW]}
+
+RECIPIENTS = [
+    {'email': "pastor@example.com"},
+    {'email': "elder@example.com"},
+    {'email': "choir@example.com", 'department_ids': [CHOIR], 'delivery_mode': 'individual'},
+    {'email': "today@example.com", 'windows': [0], 'delivery_mode': 'individual'},
+    {'email': "texts@example.com", 'phone_number': "0244000001", 'channels': ['sms']},
+    {'email': "both@example.com", 'phone_number': "0244000002", 'channels': ['email', 'sms'], 'department_ids': [USHERS]}
+]
+
+def table():
+    return RoutingTable(RECIPIENTS, [CHOIR, USHERS], horizon_days=7)
+
+def names(view):
+    return {days: [m['name'] for m in members] for days, members in view.items()}
+
+def test_recipients_with_the_same_view_share_one_message():
+    fanned_out = {tuple(addresses): names(view) for addresses, view in table().fan_out(WINDOWS, "email")}
+
+    assert fanned_out == {
+        ("elder@example.com", "pastor@example.com"): {0: ["Ama", "Kofi"], 3: ["Esi", "Yaw"]},
+        ("choir@example.com",): {0: ["Ama"], 3: ["Esi"]},
+        ("today@example.com",): {0: ["Ama", "Kofi"]},
+        ("both@example.com",): {0: ["Kofi"]}
+    }
+
+def test_subscriptions_are_per_channel():
+    routing = table()
+
+    assert routing.audience("sms", USHERS, 0) == {"0244000001", "0244000002"}
+    assert routing.audience("sms", CHOIR, 0) == {"0244000001"}
+    assert "texts@example.com" not in routing.audience("email", CHOIR, 0)
+    # Members of an unknown department are routed under None, which only unfiltered recipients see
+    assert routing.audience("email", None, 3) == {"pastor@example.com", "elder@example.com"}
+    assert routing.audience("email", None, 0) == {"pastor@example.com", "elder@example.com", "today@example.com"}
+    assert routing.audience("email", CHOIR, 8) == frozenset()
+    texts = {tuple(numbers): names(view) for numbers, view in routing.fan_out(WINDOWS, "sms")}
+    assert texts == {("0244000001",): names(WINDOWS), ("0244000002",): {0: ["Kofi"]}}
+
+def test_digest_recipients_get_one_email_and_individual_recipients_one_per_window():
+    emails = route_birthday_reminders(WINDOWS, RECIPIENTS, "morning", ["email"], routing=table())["email"]
+    by_recipient = {}
+    for email in emails:
+        for address in email['to']:
+            by_recipient.setdefault(address, []).append(email['subject'])
+
+    assert by_recipient["pastor@example.com"] == by_recipient["elder@example.com"]
+    assert len(by_recipient["pastor@example.com"]) == 1
+    assert by_recipient["pastor@example.com"][0].startswith("🎂 Birthday Digest")
+    # Furthest window first
+    assert len(by_recipient["choir@example.com"]) == 2
+    assert "Today" not in by_recipient["choir@example.com"][0]
+    assert len(by_recipient["today@example.com"]) == 1
+    # Digest is the default delivery mode
+    assert by_recipient["both@example.com"][0].startswith("🎂 Birthday Digest")
+    assert "texts@example.com" not in by_recipient
+    # Pastor and elder share a single message rather than getting a copy each
+    assert sum("pastor@example.com" in email['to'] for email in emails) == 1
+    assert next(e for e in emails if "pastor@example.com" in e['to'])['to'] == ["elder@example.com", "pastor@example.com"]
+
+def test_delivery_modes_sharing_a_view_are_split():
+    recipients = [{'email': "a@example.com"}, {'email': "b@example.com", 'delivery_mode': 'individual'}]
+    emails = route_birthday_reminders(WINDOWS, recipients, "evening", ["email"],
+                                      routing=RoutingTable(recipients, [CHOIR, USHERS], 7))["email"]
+
+    assert [email['to'] for email in emails] == [["a@example.com"], ["b@example.com"], ["b@example.com"]]
+    assert "Esi" in emails[1]['text'] and "Ama" in emails[2]['text']
@@ -0,0 +1,119 @@
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+import pytest
+from utils.scheduler import CronSchedule, Job, Scheduler
+
+def at(*args):
+    return datetime(*args)
+
+@pytest.mark.parametrize("expression,moment,following,preceding", [
+    # Steps, on and between the boundaries
+    ("*/15 * * * *", at(2026, 6, 1, 10, 7), at(2026, 6, 1, 10, 15), at(2026, 6, 1, 10, 0)),
+    ("*/15 * * * *", at(2026, 6, 1, 10, 15, 30), at(2026, 6, 1, 10, 30), at(2026, 6, 1, 10, 15)),
+    ("*/15 * * * *", at(2026, 12, 31, 23, 50), at(2027, 1, 1, 0, 0), at(2026, 12, 31, 23, 45)),
+    ("5-20/5 */6 * * *", at(2026, 6, 1, 6, 21), at(2026, 6, 1, 12, 5), at(2026, 6, 1, 6, 20)),
+    # Across the end of a month and of a year
+    ("0 9 1 * *", at(2026, 1, 31, 10, 0), at(2026, 2, 1, 9, 0), at(2026, 1, 1, 9, 0)),
+    ("0 9 31 * *", at(2026, 4, 15, 0, 0), at(2026, 5, 31, 9, 0), at(2026, 3, 31, 9, 0)),
+    ("30 6 * 2,8 *", at(2026, 8, 31, 7, 0), at(2027, 2, 1, 6, 30), at(2026, 8, 31, 6, 30)),
+    ("0 0 29 2 *", at(2026, 3, 1, 0, 0), at(2028, 2, 29, 0, 0), at(2024, 2, 29, 0, 0)),
+    # Days of the week: 2026-06-05 is a Friday
+    ("0 8 * * 1-5", at(2026, 6, 5, 9, 0), at(2026, 6, 8, 8, 0), at(2026, 6, 5, 8, 0)),
+    ("0 8 * * 1-5", at(2026, 6, 7, 12, 0), at(2026, 6, 8, 8, 0), at(2026, 6, 5, 8, 0)),
+    ("0 7 * * 7", at(2026, 6, 5, 0, 0), at(2026, 6, 7, 7, 0), at(2026, 5, 31, 7, 0)),
+    # Day of month and day of week together match either
+    ("0 0 13 * 5", at(2026, 6, 6, 0, 0), at(2026, 6, 12, 0, 0), at(2026, 6, 5, 0, 0)),
+    ("0 0 13 * 5", at(2026, 6, 12, 1, 0), at(2026, 6, 13, 0, 0), at(2026, 6, 12, 0, 0))
+])
+def test_next_and_previous_fire_times(expression, moment, following, preceding):
+    schedule = CronSchedule(expression)
+
+    assert schedule.next_after(moment) == following
+    assert schedule.previous_before(moment) == preceding
+
+def test_fire_times_keep_the_timezone():
+    moment = datetime(2026, 6, 1, 10, 7, tzinfo=timezone.utc)
+
+    assert CronSchedule("0 * * * *").next_after(moment) == datetime(2026, 6, 1, 11, 0, tzinfo=timezone.utc)
+
+@pytest.mark.parametrize("expression", ["* * * *", "60 * * * *", "* 24 * * *", "0 0 0 * *", "0 0 * 13 *", "0 0 * * 8", "5-1 * * * *"])
+def test_invalid_expressions_are_refused(expression):
+    with pytest.raises(ValueError):
+        CronSchedule(expression)
+
+class Store:
+    """Scheduler state kept in a dict, as the scheduler_runs table would keep it"""
+
+    def __init__(self, state=None):
+        self.state = state or {}
+
+    def load(self):
+        return {name: dict(run) for name, run in self.state.items()}
+
+    def save(self, job_name, **run):
+        self.state[job_name] = run
+
+def scheduler(store, calls, now, lease=None, misfire_grace=timedelta(hours=1)):
+    job = Job("reminders", "0 9 * * *", lambda: calls.append(now) or "sent", misfire_grace)
+    return Scheduler([job], store.load, store.save, lease=lease, clock=lambda: now)
+
+def test_a_missed_run_inside_the_grace_is_caught_up_once():
+    store, calls = Store(), []
+    late = scheduler(store, calls, at(2026, 6, 1, 9, 40))
+
+    assert late.run_pending() == ["reminders"]
+    assert late.run_pending() == []
+    assert len(calls) == 1
+    assert store.state["reminders"]['last_fire_at'] == at(2026, 6, 1, 9, 0)
+    assert (store.state["reminders"]['last_status'], store.state["reminders"]['last_message']) == ("ok", "sent")
+
+def test_a_missed_run_outside_the_grace_is_skipped():
+    store, calls = Store(), []
+    too_late = scheduler(store, calls, at(2026, 6, 1, 10, 1))
+
+    assert too_late.run_pending() == []
+    assert calls == []
+    assert store.state["reminders"]['last_status'] == "skipped"
+    assert "2026-06-01 09:00" in store.state["reminders"]['last_message']
+    # The next day's run goes ahead as usual
+    assert too_late.run_pending(at(2026, 6, 2, 9, 0)) == ["reminders"]
+
+def test_a_run_recorded_elsewhere_is_not_repeated():
+    store, calls = Store({"reminders": {'last_fire_at': at(2026, 6, 1, 9, 0), 'last_run_at': at(2026, 6, 1, 9, 0, 5),
+                                        'last_status': "ok", 'last_message': None}}), []
+    leases = []
+
+    @contextmanager
+    def lease(name, ttl):
+        leases.append(name)
+        yield type("Lease", (), {'acquired': True})()
+
+    replica = scheduler(store, calls, at(2026, 6, 1, 9, 10), lease=lease)
+
+    # The state is reread under the lease, after this replica last looked
+    assert replica.run_pending() == []
+    assert calls == [] and leases == ["job:reminders"]
+    assert replica.run_pending(at(2026, 6, 2, 9, 10)) == ["reminders"]
+    assert len(calls) == 1
+
+def test_a_job_leased_to_another_replica_is_left_to_it():
+    store, calls = Store(), []
+
+    @contextmanager
+    def taken(name, ttl):
+        yield type("Lease", (), {'acquired': False})()
+
+    assert scheduler(store, calls, at(2026, 6, 1, 9, 0), lease=taken).run_pending() == []
+    assert calls == [] and store.state == {}
+
+def test_failures_are_recorded_and_not_retried_for_the_same_fire_time():
+    store = Store()
+
+    def fail():
+        raise RuntimeError("SMTP down")
+
+    failing = Scheduler([Job("reminders", "0 9 * * *", fail)], store.load, store.save, clock=lambda: at(2026, 6, 1, 9, 5))
+
+    assert failing.run_pending() == ["reminders"]
+    assert (store.state["reminders"]['last_status'], store.state["reminders"]['last_message']) == ("failed", "SMTP down")
+    assert failing.run_pending() == []
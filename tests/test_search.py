@@ -0,0 +1,57 @@
+from utils.search import MIN_SCORE, MemberSearchIndex
+
+MEMBERS = [
+    {'id': 1, 'full_name': "Kwame Mensah", 'phone_number': "+233 24 123 4567", 'email': "kwame.mensah@example.com"},
+    {'id': 2, 'full_name': "Adjoa Mensah", 'phone_number': "020-555-0101", 'email': "adjoa@example.com"},
+    {'id': 3, 'full_name': "Efua Owusu", 'phone_number': None, 'email': "efua.owusu@example.org"},
+    {'id': 4, 'full_name': "Christiana Aboagye", 'phone_number': "0277000111", 'email': None},
+    {'id': 5, 'full_name': "Ama Ásante", 'phone_number': "0501234567", 'email': "ama@example.com"}
+]
+
+def test_exact_and_partial_names_match():
+    index = MemberSearchIndex(MEMBERS)
+
+    assert index.search_ids("Kwame Mensah")[0] == 1
+    assert set(index.search_ids("mensah")) == {1, 2}
+
+def test_single_typos_are_tolerated():
+    index = MemberSearchIndex(MEMBERS)
+
+    assert index.search_ids("Christiana Aboagey") == [4]
+    assert index.search_ids("Efua Owsu") == [3]
+    # Accents are ignored both ways
+    assert index.search_ids("ama asante") == [5]
+
+def test_transposed_letters_near_the_cutoff():
+    index = MemberSearchIndex(MEMBERS)
+
+    # 9 of the query's 13 trigrams (0.69) are in the name
+    assert index.search_ids("Kwame Mnesah") == [1]
+    # A lone transposed surname keeps only 4 of 7 (0.57), just under MIN_SCORE
+    assert MIN_SCORE == 0.6
+    assert index.search_ids("Mensha") == []
+    assert set(index.search_ids("Mensha", min_score=0.55)) == {1, 2}
+
+def test_phone_numbers_match_on_digits_whatever_the_formatting():
+    index = MemberSearchIndex(MEMBERS)
+
+    # Member 5's number shares "1234567", but the exact match ranks first
+    assert index.search_ids("24 123 4567") == [1, 5]
+    assert index.search_ids("0205550101") == [2]
+    assert index.search_ids("0277-000-111") == [4]
+
+def test_email_matches():
+    index = MemberSearchIndex(MEMBERS)
+
+    assert index.search_ids("efua.owusu@example.org") == [3]
+    assert index.search_ids("adjoa@example")[0] == 2
+
+def test_exact_substring_matches_outrank_fuzzy_ones():
+    members = MEMBERS + [{'id': 6, 'full_name': "Kwame Mensa", 'phone_number': None, 'email': None}]
+    index = MemberSearchIndex(members)
+
+    assert index.search_ids("kwame mensah")[:2] == [1, 6]
+
+def test_empty_queries_and_indexes_match_nothing():
+    assert MemberSearchIndex(MEMBERS).search("") == []
+    assert MemberSearchIndex([]).search("kwame") == []
@@ -0,0 +1,71 @@
+import time
+import pytest
+from utils.shared_cache import SharedCache, SQLiteBackend
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "cache.sqlite3")
+
+def test_values_round_trip(path):
+    cache = SharedCache(SQLiteBackend(path))
+    key = cache.key("get_youth_members", [None, {'youth_members': 3}])
+    members = [{'id': 1, 'full_name': "Ama", 'department_id': None, 'active': True}]
+
+    assert cache.get(key) is None
+    cache.set(key, members)
+
+    assert cache.get(key) == members
+    assert (cache.hits, cache.misses) == (1, 1)
+    # Another process on the host reads the same file
+    assert SharedCache(SQLiteBackend(path)).get(key) == members
+
+def test_large_values_are_compressed(path):
+    backend = SQLiteBackend(path)
+    cache = SharedCache(backend, compress_min_bytes=1024)
+    rows = [{'id': i, 'full_name': f"Member {i}", 'email': f"member{i}@example.com"} for i in range(500)]
+    cache.set("small", rows[:2])
+    cache.set("large", rows)
+
+    assert backend.get("small")[:1] == b"j"
+    raw = backend.get("large")
+    assert raw[:1] == b"z"
+    assert len(raw) < len(str(rows)) / 4
+    assert cache.get("large") == rows
+
+def test_bumped_versions_are_shared_and_change_the_keys(path):
+    writer, reader = SharedCache(SQLiteBackend(path)), SharedCache(SQLiteBackend(path))
+
+    assert reader.versions(["youth_members", "contributions"]) == {}
+    before = reader.key("get_youth_members", [reader.versions(["youth_members"])])
+    assert writer.bump(["youth_members", "contributions"]) == {'youth_members': 1, 'contributions': 1}
+    assert writer.bump(["youth_members"]) == {'youth_members': 2}
+
+    assert reader.versions(["youth_members", "contributions", "departments"]) == {'youth_members': 2, 'contributions': 1}
+    assert reader.key("get_youth_members", [reader.versions(["youth_members"])]) != before
+    assert reader.key("get_youth_members", [{'youth_members': 2}]) == writer.key("get_youth_members", [{'youth_members': 2}])
+
+def test_entries_expire_after_the_ttl(path):
+    cache = SharedCache(SQLiteBackend(path), ttl=0.2)
+    cache.set("members", [1, 2, 3])
+    assert cache.get("members") == [1, 2, 3]
+
+    time.sleep(0.3)
+    assert cache.get("members") is None
+    assert cache.misses == 1
+
+def test_backend_errors_count_as_misses(path):
+    class Broken:
+        def get(self, key):
+            raise OSError("disk full")
+
+        def set(self, key, value, ttl):
+            raise OSError("disk full")
+
+        def versions(self, names):
+            raise OSError("disk full")
+
+    cache = SharedCache(Broken())
+    cache.set("members", [1])
+
+    assert cache.get("members") is None
+    assert cache.versions(["youth_members"]) is None
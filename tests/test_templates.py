@@ -0,0 +1,43 @@
+from utils.templates import MEMBER_HTML, REMINDER_HTML, REMINDER_TEXT, Safe, html_template, render_member, render_members
+
+def test_values_are_escaped_in_html():
+    rendered = MEMBER_HTML.render(name='<script>alert("x")</script>', birthday="March 3",
+                                  department="Ushers & Greeters 'A'")
+
+    assert "<script>" not in rendered
+    assert "&lt;script&gt;alert(&quot;x&quot;)&lt;/script&gt;" in rendered
+    assert "Ushers &amp; Greeters &#x27;A&#x27;" in rendered
+    assert isinstance(rendered, Safe)
+
+def test_text_templates_are_left_alone():
+    rendered = REMINDER_TEXT.render(header="Tom & Jerry", intro="<b>", members="", sent_on="today", time_of_day="morning")
+
+    assert rendered.startswith("Tom & Jerry\n\n<b>\n")
+    assert not isinstance(rendered, Safe)
+
+def test_safe_fragments_are_not_escaped_twice():
+    members_html, members_text = render_members([{'name': "Ama & Kofi", 'birthday': "May 1", 'department': "Choir"}])
+    rendered = REMINDER_HTML.render(header="Today", intro="<hi>", members=members_html,
+                                    sent_on="today", time_of_day="morning")
+
+    assert "Ama &amp; Kofi" in rendered
+    assert "&amp;amp;" not in rendered
+    assert '<div style="margin-bottom: 15px;' in rendered
+    assert "&lt;hi&gt;" in rendered
+    assert members_text == "  - Ama & Kofi (May 1, Choir)\n"
+    # A nested Safe value renders verbatim, while the same text as a str is escaped
+    outer = html_template("<p>{body}</p>")
+    assert outer.render(body=Safe("<i>x</i>")) == "<p><i>x</i></p>"
+    assert outer.render(body="<i>x</i>") == "<p>&lt;i&gt;x&lt;/i&gt;</p>"
+
+def test_cached_member_fragments_follow_the_member_data():
+    render_member.cache_clear()
+    first = render_members([{'name': "Esi", 'birthday': "June 2", 'department': "Choir"}])
+    again = render_members([{'name': "Esi", 'birthday': "June 2", 'department': "Choir"}])
+    moved = render_members([{'name': "Esi", 'birthday': "June 2", 'department': "Ushers"}])
+    renamed = render_members([{'name': "Esi <Jr>", 'birthday': "June 2", 'department': "Ushers"}])
+
+    assert again == first
+    assert render_member.cache_info().hits == 1
+    assert "Ushers" in moved[0] and "Choir" not in moved[0]
+    assert "Esi &lt;Jr&gt;" in renamed[0] and "Esi <Jr>" in renamed[1]
@@ -0,0 +1,192 @@
+import argparse
+import socketserver
+import threading
+import time
+
+class _RESPHandler(socketserver.StreamRequestHandler):
+    """Serve one client's RESP commands until it disconnects"""
+
+    def _read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        if not line.startswith(b"*"):
+            # Inline commands, as typed into telnet
+            return line.split()
+        args = []
+        for _ in range(int(line[1:-2])):
+            length = int(self.rfile.readline()[1:-2])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def write(self, reply):
+        self.wfile.write(encode(reply))
+
+    def handle(self):
+        server = self.server.cache
+        try:
+            while True:
+                try:
+                    args = self._read_command()
+                except (OSError, ValueError):
+                    return
+                if not args:
+                    return
+                with server.write_lock(self):
+                    reply = server.execute(self, args[0].decode().upper(), args[1:])
+                    if reply is not _SUBSCRIBED:
+                        self.write(reply)
+        finally:
+            server.disconnect(self)
+
+class _Error(str):
+    pass
+
+_SUBSCRIBED = object()
+
+def encode(reply):
+    """Encode a Python value as a RESP reply"""
+    if reply is None:
+        return b"$-1\r\n"
+    if isinstance(reply, _Error):
+        return b"-" + reply.encode() + b"\r\n"
+    if isinstance(reply, bool):
+        return b":" + str(int(reply)).encode() + b"\r\n"
+    if isinstance(reply, int):
+        return b":" + str(reply).encode() + b"\r\n"
+    if isinstance(reply, str):
+        return b"+" + reply.encode() + b"\r\n"
+    if isinstance(reply, bytes):
+        return b"$" + str(len(reply)).encode() + b"\r\n" + reply + b"\r\n"
+    return b"*" + str(len(reply)).encode() + b"\r\n" + b"".join(encode(item) for item in reply)
+
+class CacheServer:
+    """Local stand-in for Redis with the commands the shared cache tier uses
+
+    Supports PING, GET, SET (with EX/PX), MGET, INCR, DEL, PUBLISH,
+    SUBSCRIBE, FLUSHALL, DBSIZE, SELECT and AUTH, and counts hits and misses.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0):
+        self.data = {}
+        self.hits = 0
+        self.misses = 0
+        self.commands = 0
+        self._lock = threading.Lock()
+        self._subscribers = {}
+        self._write_locks = {}
+        self._server = socketserver.ThreadingTCPServer((host, port), _RESPHandler, bind_and_activate=False)
+        self._server.allow_reuse_address = True
+        self._server.daemon_threads = True
+        self._server.server_bind()
+        self._server.server_activate()
+        self._server.cache = self
+        self.host, self.port = self._server.server_address[:2]
+        self.url = f"redis://{self.host}:{self.port}/0"
+
+    def write_lock(self, handler):
+        # Replies and published messages to one client mustn't interleave
+        with self._lock:
+            return self._write_locks.setdefault(handler, threading.RLock())
+
+    def disconnect(self, handler):
+        """Forget a client that went away"""
+        with self._lock:
+            self._write_locks.pop(handler, None)
+            for subscribers in self._subscribers.values():
+                subscribers.discard(handler)
+
+    def _get(self, key):
+        entry = self.data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.time():
+            del self.data[key]
+            return None
+        return value
+
+    def execute(self, handler, command, args):
+        """Run one command and return its reply"""
+        with self._lock:
+            self.commands += 1
+            if command == "PING":
+                return "PONG"
+            if command in ("SELECT", "AUTH"):
+                return "OK"
+            if command == "GET":
+                value = self._get(args[0])
+                if value is None:
+                    self.misses += 1
+                else:
+                    self.hits += 1
+                return value
+            if command == "MGET":
+                return [self._get(key) for key in args]
+            if command == "SET":
+                expires_at = None
+                options = [arg.upper() for arg in args[2:]]
+                if b"EX" in options:
+                    expires_at = time.time() + int(args[2 + options.index(b"EX") + 1])
+                elif b"PX" in options:
+                    expires_at = time.time() + int(args[2 + options.index(b"PX") + 1]) / 1000
+                self.data[args[0]] = (args[1], expires_at)
+                return "OK"
+            if command == "INCR":
+                value = int(self._get(args[0]) or 0) + 1
+                entry = self.data.get(args[0])
+                self.data[args[0]] = (str(value).encode(), entry[1] if entry else None)
+                return value
+            if command == "DEL":
+                return sum(1 for key in args if self.data.pop(key, None) is not None)
+            if command == "DBSIZE":
+                return len(self.data)
+            if command == "FLUSHALL":
+                self.data.clear()
+                return "OK"
+            if command == "SUBSCRIBE":
+                for channel in args:
+                    self._subscribers.setdefault(channel, set()).add(handler)
+                    handler.write([b"subscribe", channel, len(self._subscribers[channel])])
+                return _SUBSCRIBED
+            if command == "PUBLISH":
+                receivers = list(self._subscribers.get(args[0], ()))
+            else:
+                return _Error(f"ERR unknown command '{command}'")
+
+        # Published messages go out after the lock is released
+        delivered = 0
+        for receiver in receivers:
+            try:
+                with self.write_lock(receiver):
+                    receiver.write([b"message", args[0], args[1]])
+                delivered += 1
+            except OSError:
+                with self._lock:
+                    self._subscribers[args[0]].discard(receiver)
+        return delivered
+
+    def start(self):
+        """Serve in a background thread"""
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        """Stop serving and release the port"""
+        self._server.shutdown()
+        self._server.server_close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a local Redis stand-in for the shared cache tier")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6379)
+    args = parser.parse_args()
+
+    server = CacheServer(args.host, args.port).start()
+    print(f"Cache server listening on {server.url}")
+    try:
+        while True:
+            time.sleep(10)
+            print(f"{len(server.data)} keys, {server.hits} hits, {server.misses} misses, {server.commands} commands")
+    except KeyboardInterrupt:
+        server.stop()
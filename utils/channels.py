@@ -0,0 +1,179 @@
+import hashlib
+import hmac
+import json
+import random
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+import httpx
+
+# A notification is a dict: {'to': [addresses], 'subject': str, 'text': str},
+# plus 'html' for email and 'data' for webhooks. Drivers take a whole list at
+# once so they can batch however their transport allows.
+
+def empty_result(channel):
+    return {'channel': channel, 'sent': 0, 'failed': 0, 'requests': 0, 'failures': []}
+
+class Channel:
+    """A notification driver that delivers a list of notifications in as few calls as it can"""
+    name = "channel"
+
+    def send(self, notifications):
+        """Deliver notifications and return a result dict of sent, failed, requests and failures"""
+        raise NotImplementedError
+
+class HTTPChannel(Channel):
+    """Shared HTTP plumbing: one pooled client, bounded concurrency and retries on 429/5xx"""
+
+    def __init__(self, timeout=10.0, max_workers=4, max_retries=2, backoff_seconds=1.0, client=None, sleep=time.sleep):
+        self.timeout = timeout
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.client = client
+        self.sleep = sleep
+
+    def _post(self, client, url, payload, headers=None):
+        """POST a JSON payload, retrying transient failures, and return the response"""
+        body = json.dumps(payload).encode("utf-8")
+        headers = dict(headers or {}, **{"Content-Type": "application/json"})
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = client.post(url, content=body, headers=self._sign(body, headers))
+                if response.status_code != 429 and response.status_code < 500:
+                    response.raise_for_status()
+                    return response
+                error = httpx.HTTPStatusError(f"{response.status_code} from {url}", request=response.request, response=response)
+            except httpx.TransportError as e:
+                error = e
+            if attempt == self.max_retries:
+                raise error
+            self.sleep(self.backoff_seconds * (2 ** attempt) * (0.5 + random.random() / 2))
+
+    def _sign(self, body, headers):
+        return headers
+
+    def _run(self, requests, send_one):
+        """Run send_one(client, request) for every request over one connection pool"""
+        client = self.client or httpx.Client(timeout=self.timeout)
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                return list(executor.map(lambda request: send_one(client, request), requests))
+        finally:
+            if self.client is None:
+                client.close()
+
+class SMSChannel(HTTPChannel):
+    """Send SMS through a bulk HTTP gateway, many numbers per request
+
+    Each request is a JSON POST of {"sender": ..., "messages": [{"to": [numbers],
+    "text": ...}, ...]} carrying up to batch_size numbers in total. The gateway
+    answers 2xx when it accepts the batch, optionally with {"failed": [numbers]}
+    for numbers it rejected.
+    """
+    name = "sms"
+
+    def __init__(self, url, api_key=None, sender_id=None, batch_size=100, country_code=None, **kwargs):
+        super().__init__(**kwargs)
+        self.url = url
+        self.api_key = api_key
+        self.sender_id = sender_id
+        self.batch_size = batch_size
+        self.country_code = country_code
+
+    def normalize(self, number):
+        """Strip formatting from a phone number and apply the default country code to local numbers"""
+        number = re.sub(r"[^\d+]", "", str(number or ""))
+        if self.country_code and number.startswith("0"):
+            number = f"+{self.country_code}{number[1:]}"
+        return number
+
+    def batches(self, notifications):
+        """Pack notifications into gateway requests of at most batch_size numbers"""
+        # Same text to many numbers is one message entry, whatever the notification
+        by_text = {}
+        for notification in notifications:
+            numbers = by_text.setdefault(notification['text'], {})
+            for number in notification['to']:
+                number = self.normalize(number)
+                if number:
+                    numbers[number] = None
+
+        requests, current, size = [], [], 0
+        for text, numbers in by_text.items():
+            numbers = list(numbers)
+            while numbers:
+                take = numbers[:self.batch_size - size]
+                numbers = numbers[len(take):]
+                current.append({'to': take, 'text': text})
+                size += len(take)
+                if size == self.batch_size:
+                    requests.append(current)
+                    current, size = [], 0
+        if current:
+            requests.append(current)
+        return requests
+
+    def send(self, notifications):
+        result = empty_result(self.name)
+        requests = self.batches(notifications)
+        headers = {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
+
+        def send_one(client, messages):
+            numbers = [number for message in messages for number in message['to']]
+            try:
+                response = self._post(client, self.url, {'sender': self.sender_id, 'messages': messages}, headers)
+                try:
+                    rejected = response.json().get('failed') or []
+                except ValueError:
+                    rejected = []
+                return numbers, rejected, None
+            except Exception as e:
+                return numbers, numbers, str(e)
+
+        for numbers, rejected, error in self._run(requests, send_one):
+            result['requests'] += 1
+            result['sent'] += len(numbers) - len(rejected)
+            result['failed'] += len(rejected)
+            if rejected:
+                result['failures'].append((list(rejected), error or "Rejected by gateway"))
+        return result
+
+class WebhookChannel(HTTPChannel):
+    """POST each notification as JSON to every configured URL, signed when a secret is set"""
+    name = "webhook"
+
+    def __init__(self, urls, secret=None, **kwargs):
+        super().__init__(**kwargs)
+        self.urls = [urls] if isinstance(urls, str) else list(urls)
+        self.secret = secret
+
+    def _sign(self, body, headers):
+        if not self.secret:
+            return headers
+        signature = hmac.new(self.secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+        return dict(headers, **{"X-Signature-SHA256": signature})
+
+    def send(self, notifications):
+        result = empty_result(self.name)
+        requests = [
+            (url, {'subject': n['subject'], 'text': n['text'], 'data': n.get('data')})
+            for n in notifications for url in self.urls
+        ]
+
+        def send_one(client, request):
+            url, payload = request
+            try:
+                self._post(client, url, payload)
+                return url, None
+            except Exception as e:
+                return url, str(e)
+
+        for url, error in self._run(requests, send_one):
+            result['requests'] += 1
+            if error:
+                result['failed'] += 1
+                result['failures'].append(([url], error))
+            else:
+                result['sent'] += 1
+        return result
@@ -0,0 +1,88 @@
+import threading
+import time
+from collections import OrderedDict
+import plotly.io as pio
+import streamlit as st
+
+# Upper bounds for the shared figure cache
+MAX_CACHE_ENTRIES = 256
+MAX_CACHE_BYTES = 64 * 1024 * 1024
+# Data versions only track writes made by this process, so bound how long a
+# figure can outlive changes made elsewhere
+CACHE_TTL_SECONDS = 300
+
+class FigureCache:
+    """LRU cache of Plotly figures keyed by (chart id, data version, filters)"""
+
+    def __init__(self, max_entries=MAX_CACHE_ENTRIES, max_bytes=MAX_CACHE_BYTES, ttl=CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Get a cached figure, marking it as recently used"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[2] > self.ttl:
+                self.total_bytes -= self._entries.pop(key)[1]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, figure):
+        """Store a figure, evicting least recently used entries over the caps"""
+        # Size the entry by its serialized spec, which is what the browser receives
+        size = len(pio.to_json(figure, validate=False))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self.total_bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (figure, size, time.monotonic())
+            self.total_bytes += size
+            while self._entries and (
+                len(self._entries) > self.max_entries or self.total_bytes > self.max_bytes
+            ):
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self.total_bytes -= evicted_size
+
+    def stats(self):
+        """Get cache usage counters"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.total_bytes,
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+@st.cache_resource
+def get_figure_cache():
+    """Get the process-wide figure cache"""
+    return FigureCache()
+
+def cached_figure(chart_id, data_version, filters, build):
+    """Get a figure from the cache, calling build() only on a miss"""
+    key = (chart_id, tuple(data_version), tuple(filters))
+    cache = get_figure_cache()
+    figure = cache.get(key)
+    if figure is None:
+        figure = build()
+        cache.put(key, figure)
+    return figure
+
+def plot_cached(chart_id, data_version, filters, build):
+    """Render a cached Plotly figure at full container width"""
+    st.plotly_chart(
+        cached_figure(chart_id, data_version, filters, build),
+        use_container_width=True
+    )
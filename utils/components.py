@@ -0,0 +1,110 @@
+import streamlit as st
+import pandas as pd
+from utils.database import search_members, search_contributions
+
+@st.fragment
+def paginated_table(key, fetch_page, to_frame, sort_options, filters=(), version=None, page_size=25, prefetch_pages=1):
+    """Render a table that only fetches and ships the visible page
+
+    fetch_page(after, limit, sort_by, descending) must return rows ordered by
+    (sort_by, id) starting after the (sort value, id) cursor. Each fetch pulls
+    prefetch_pages extra pages, so the following page renders without a query.
+    """
+    sort_col, order_col = st.columns([2, 1])
+    with sort_col:
+        sort_label = st.selectbox("Sort by", options=list(sort_options.keys()), key=f"{key}_sort")
+    with order_col:
+        order = st.selectbox("Order", options=["Ascending", "Descending"], key=f"{key}_order")
+    sort_by = sort_options[sort_label]
+    descending = order == "Descending"
+
+    # Go back to the first page whenever the sort, filters or data change
+    signature = (sort_by, descending, tuple(filters), version)
+    if st.session_state.get(f"{key}_signature") != signature:
+        st.session_state[f"{key}_signature"] = signature
+        st.session_state[f"{key}_cursors"] = [None]
+        st.session_state[f"{key}_buffer"] = {}
+    cursors = st.session_state[f"{key}_cursors"]
+    buffer = st.session_state[f"{key}_buffer"]
+
+    # Use prefetched rows when they cover the whole page, otherwise query
+    cursor = cursors[-1]
+    rows, exhausted = buffer.get(cursor, (None, False))
+    if rows is None or (not exhausted and len(rows) <= page_size):
+        limit = page_size * (1 + prefetch_pages) + 1
+        rows = fetch_page(cursor, limit, sort_by, descending)
+        exhausted = len(rows) < limit
+
+    visible = rows[:page_size]
+    has_next = len(rows) > page_size
+    next_cursor = (visible[-1][sort_by], visible[-1]['id']) if has_next else None
+
+    # Only keep the rows that can serve the next page
+    buffer.clear()
+    if has_next:
+        buffer[next_cursor] = (rows[page_size:], exhausted)
+
+    if visible:
+        st.dataframe(to_frame(visible), use_container_width=True, hide_index=True)
+    else:
+        st.info("No records found")
+
+    prev_col, page_col, next_col = st.columns([1, 2, 1])
+    with prev_col:
+        if st.button("◀ Previous", key=f"{key}_prev", disabled=len(cursors) == 1):
+            cursors.pop()
+            st.rerun(scope="fragment")
+    with page_col:
+        st.caption(f"Page {len(cursors)}")
+    with next_col:
+        if st.button("Next ▶", key=f"{key}_next", disabled=not has_next):
+            cursors.append(next_cursor)
+            st.rerun(scope="fragment")
+
+def contributions_frame(rows):
+    """Format contribution rows for display"""
+    columns = ['Member', 'Amount (GH₵)', 'Type', 'Date', 'Week']
+    if not rows:
+        return pd.DataFrame(columns=columns)
+    df = pd.DataFrame(rows)
+    df['member_name'] = df['youth_members'].apply(lambda x: x['full_name'])
+    display_df = df[['member_name', 'amount', 'contribution_type', 'payment_date', 'week_number']]
+    display_df.columns = columns
+    return display_df
+
+def search_picker(label, key, search, format_option, limit=20):
+    """Typeahead selector: a search box feeding a selectbox of the top matches
+
+    Only the matching rows are fetched, and options are keyed by ID so
+    the selection never needs a list scan. Returns the selected row or None.
+    """
+    query = st.text_input(label, key=f"{key}_query", placeholder="Type to search...")
+    matches = search(query, limit)
+    if not matches:
+        st.info("No matches found")
+        return None
+
+    options = {row['id']: row for row in matches}
+    selected_id = st.selectbox(
+        f"Matches ({len(matches)})",
+        options=list(options.keys()),
+        format_func=lambda row_id: format_option(options[row_id]),
+        key=f"{key}_select"
+    )
+    return options.get(selected_id)
+
+def member_picker(label, key, limit=20):
+    """Typeahead member selector backed by the server-side name search"""
+    return search_picker(
+        label, key, search_members,
+        lambda m: f"{m['full_name']} ({m['birthday']})",
+        limit
+    )
+
+def contribution_picker(label, key, limit=20):
+    """Typeahead contribution selector backed by the server-side member name search"""
+    return search_picker(
+        label, key, search_contributions,
+        lambda c: f"{c['youth_members']['full_name']} - GH₵{c['amount']} ({c['payment_date']})",
+        limit
+    )
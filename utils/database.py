@@ -2,6 +2,22 @@ from supabase import create_client
 import streamlit as st
 import pandas as pd
 from datetime import datetime
+import functools
+import threading
+import time
+import uuid
+from utils.shared_cache import get_shared_cache
+
+# Per-table write counters used to key derived caches (DataFrames, charts, ...).
+# With a shared cache tier they follow the shared versions, so a write on any
+# replica retires every replica's entries for the table.
+_data_versions = {}
+_data_versions_lock = threading.Lock()
+_data_versions_synced_at = 0.0
+# Without a shared tier, versions start at zero in every process
+_process_scope = f"process:{uuid.uuid4().hex}"
+# Callbacks that update derived structures in place when contributions are added
+_contribution_listeners = []
 
 def init_connection():
     """Initialize Supabase connection with token refresh"""
@@ -21,9 +37,87 @@ def init_connection():
         st.error(f"Connection error: {str(e)}")
         return None
 
-@st.cache_data(ttl=5, show_spinner=False)
+def _merge_data_versions(versions):
+    """Adopt versions bumped elsewhere; versions only move forward"""
+    with _data_versions_lock:
+        for table, version in versions.items():
+            if version > _data_versions.get(table, 0):
+                _data_versions[table] = version
+
+def _shared_cache():
+    cache = get_shared_cache()
+    if cache is not None:
+        # Backends that can push tell us about bumps as they happen
+        cache.listen(_merge_data_versions)
+    return cache
+
+def _sync_data_versions(tables):
+    """Poll the shared tier for other replicas' versions, at most once per poll interval"""
+    global _data_versions_synced_at
+    cache = _shared_cache()
+    if cache is None or time.monotonic() - _data_versions_synced_at < cache.poll_seconds:
+        return
+    _data_versions_synced_at = time.monotonic()
+    with _data_versions_lock:
+        names = set(_data_versions) | set(tables)
+    versions = cache.versions(names)
+    if versions:
+        _merge_data_versions(versions)
+
+def get_data_version(*tables):
+    """Get the current data version for one or more tables"""
+    _sync_data_versions(tables)
+    with _data_versions_lock:
+        return tuple(_data_versions.get(table, 0) for table in tables)
+
+def get_data_version_scope():
+    """Name where data versions mean the same data: the shared tier's store, or only this process"""
+    cache = _shared_cache()
+    return cache.backend.scope if cache is not None else _process_scope
+
+def bump_data_version(*tables):
+    """Mark tables as modified so caches keyed on their version are refreshed, on every replica"""
+    cache = _shared_cache()
+    bumped = cache.bump(tables) if cache is not None else None
+    if bumped:
+        _merge_data_versions(bumped)
+        return
+    with _data_versions_lock:
+        for table in tables:
+            _data_versions[table] = _data_versions.get(table, 0) + 1
+
+def shared_tier(func):
+    """Look a fetch up in the shared cache tier before running it; its first argument is the data version
+
+    Empty results aren't shared, since the fetches also return [] on error.
+    """
+    @functools.wraps(func)
+    def wrapper(*args):
+        cache = _shared_cache()
+        if cache is None:
+            return func(*args)
+        key = cache.key(func.__name__, args)
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+        result = func(*args)
+        if result:
+            cache.set(key, result)
+        return result
+    return wrapper
+
+def add_contribution_listener(callback):
+    """Register callback(rows) to be called with newly inserted contribution rows"""
+    if callback not in _contribution_listeners:
+        _contribution_listeners.append(callback)
+
 def get_youth_members():
     """Get all youth members with their department info"""
+    return _fetch_youth_members(get_data_version("youth_members"))
+
+@st.cache_data(ttl=5, show_spinner=False)
+@shared_tier
+def _fetch_youth_members(version):
     try:
         supabase = init_connection()
         if not supabase:
@@ -59,6 +153,7 @@ def add_youth_member(full_name, birthday, department_id, phone_number=None, emai
         }
         
         result = supabase.table("youth_members").insert(data).execute()
+        bump_data_version("youth_members")
         
         # Clear caches immediately
         st.cache_data.clear()
@@ -69,9 +164,13 @@ def add_youth_member(full_name, birthday, department_id, phone_number=None, emai
         print(f"Add member error: {str(e)}")  # For debugging
         return False
 
-@st.cache_data(ttl=5, show_spinner=False)
 def get_contributions(member_id=None):
     """Get all contributions with member info"""
+    return _fetch_contributions(get_data_version("contributions", "youth_members"), member_id)
+
+@st.cache_data(ttl=5, show_spinner=False)
+@shared_tier
+def _fetch_contributions(version, member_id):
     try:
         supabase = init_connection()
         if not supabase:
@@ -99,7 +198,7 @@ def get_contributions(member_id=None):
 def add_contribution(member_id, amount, contribution_type, payment_date, week_number=None):
     supabase = init_connection()
     date_obj = datetime.strptime(payment_date, '%Y-%m-%d')
-    return supabase.table("contributions").insert({
+    result = supabase.table("contributions").insert({
         "member_id": member_id,
         "amount": amount,
         "contribution_type": contribution_type,
@@ -108,10 +207,311 @@ def add_contribution(member_id, amount, contribution_type, payment_date, week_nu
         "month": date_obj.month,
         "year": date_obj.year
     }).execute()
+    bump_data_version("contributions")
+    for callback in _contribution_listeners:
+        try:
+            callback(result.data or [])
+        except Exception as e:
+            print(f"Contribution listener error: {str(e)}")
+    return result
+
+def _quote_filter_value(value):
+    """Quote a value for use inside a PostgREST or=() filter"""
+    text = str(value).replace('\\', '\\\\').replace('"', '\\"')
+    return f'"{text}"'
+
+def _order_by(query, *columns, descending=False):
+    """Sort by several columns in a single order= param, as PostgREST expects"""
+    direction = ".desc" if descending else ""
+    query.params = query.params.add("order", ",".join(f"{column}{direction}" for column in columns))
+    return query
+
+def _match_any(query, *conditions):
+    """Add an or=() filter; the pinned postgrest client has no or_()"""
+    query.params = query.params.add("or", f"({','.join(conditions)})")
+    return query
+
+def _apply_keyset(query, sort_by, descending, after):
+    """Order a query by (sort_by, id) and start it after the given cursor"""
+    query = _order_by(query, sort_by, "id", descending=descending)
+    if after is not None:
+        sort_value, last_id = after
+        op = "lt" if descending else "gt"
+        value = _quote_filter_value(sort_value)
+        query = _match_any(
+            query,
+            f"{sort_by}.{op}.{value}",
+            f"and({sort_by}.eq.{value},id.{op}.{_quote_filter_value(last_id)})"
+        )
+    return query
+
+# Search results the paginated member table pages through, at most
+MEMBER_SEARCH_LIMIT = 10000
+
+def _limit(query, count):
+    """Cap the rows returned; RPC builders in the pinned postgrest client have no limit()"""
+    query.params = query.params.add("limit", str(count))
+    return query
+
+def _members_query(supabase, department_id=None, search=None, ranked=True):
+    """Build the filtered youth members query used by pages and exports
+
+    Searches go through search_youth_members, so they match as typo-tolerantly
+    as the member search box; ranked=False falls back to substring matching.
+    """
+    columns = "id, full_name, birthday, department_id, phone_number, email"
+    if search and ranked:
+        query = supabase.rpc("search_youth_members", {
+            "search_query": search,
+            "max_results": MEMBER_SEARCH_LIMIT
+        })
+        query.params = query.params.add("select", columns)
+    else:
+        query = supabase.table("youth_members").select(columns)
+    
+    if department_id:
+        query = query.eq("department_id", department_id)
+    if search and not ranked:
+        pattern = _quote_filter_value(f"%{search}%")
+        query = _match_any(
+            query, f"full_name.ilike.{pattern}", f"phone_number.ilike.{pattern}", f"email.ilike.{pattern}"
+        )
+    return query
+
+def _contributions_query(supabase, contribution_type=None, start_date=None, end_date=None, member_id=None):
+    """Build the filtered contributions query used by pages and exports"""
+    query = supabase.table("contributions")\
+        .select(
+            "id, amount, contribution_type, payment_date, week_number, month, year, member_id, "
+            "youth_members!inner(full_name, department_id)"
+        )
+    
+    if contribution_type and contribution_type != "All":
+        query = query.eq("contribution_type", contribution_type)
+    if start_date:
+        query = query.gte("payment_date", str(start_date))
+    if end_date:
+        query = query.lte("payment_date", str(end_date))
+    if member_id:
+        query = query.eq("member_id", member_id)
+    return query
+
+def _iter_batches(build_query, sort_by, batch_size):
+    """Yield keyset-paginated batches of rows until the query is exhausted"""
+    supabase = init_connection()
+    if not supabase:
+        raise RuntimeError("Database connection unavailable")
+    after = None
+    while True:
+        rows = _limit(_apply_keyset(build_query(supabase), sort_by, False, after), batch_size).execute().data
+        if rows:
+            yield rows
+        if len(rows) < batch_size:
+            return
+        after = (rows[-1][sort_by], rows[-1]['id'])
+
+def iter_youth_members(batch_size=1000, department_id=None, search=None):
+    """Stream youth members by name in uncached batches; raises on query errors"""
+    return _iter_batches(
+        lambda supabase: _members_query(supabase, department_id, search), "full_name", batch_size
+    )
+
+def iter_contributions(batch_size=1000, contribution_type=None, start_date=None, end_date=None, member_id=None):
+    """Stream contributions oldest first in uncached batches; raises on query errors"""
+    return _iter_batches(
+        lambda supabase: _contributions_query(supabase, contribution_type, start_date, end_date, member_id),
+        "payment_date", batch_size
+    )
+
+@st.cache_data(ttl=5, show_spinner=False)
+def _fetch_members_page(version, after, limit, sort_by, descending, department_id, search):
+    try:
+        supabase = init_connection()
+        if not supabase:
+            return []
+            
+        query = _members_query(supabase, department_id, search)
+        try:
+            return _limit(_apply_keyset(query, sort_by, descending, after), limit).execute().data
+        except Exception as e:
+            if not search:
+                raise
+            print(f"Ranked member search unavailable: {str(e)}")
+        
+        query = _members_query(supabase, department_id, search, ranked=False)
+        return _limit(_apply_keyset(query, sort_by, descending, after), limit).execute().data
+    except Exception as e:
+        print(f"Error fetching members page: {str(e)}")
+        return []
+
+def get_members_page(after=None, limit=50, sort_by="full_name", descending=False, department_id=None, search=None):
+    """Get one keyset-paginated page of youth members, filtered in the database"""
+    return _fetch_members_page(
+        get_data_version("youth_members"), after, limit, sort_by, descending, department_id, search
+    )
+
+@st.cache_data(ttl=5, show_spinner=False)
+def _fetch_contributions_page(version, after, limit, sort_by, descending, contribution_type, start_date, end_date, member_id):
+    try:
+        supabase = init_connection()
+        if not supabase:
+            return []
+            
+        query = _contributions_query(supabase, contribution_type, start_date, end_date, member_id)
+        response = _apply_keyset(query, sort_by, descending, after).limit(limit).execute()
+        return response.data
+    except Exception as e:
+        print(f"Error fetching contributions page: {str(e)}")
+        return []
+
+def get_contributions_page(after=None, limit=50, sort_by="payment_date", descending=True,
+                           contribution_type=None, start_date=None, end_date=None, member_id=None):
+    """Get one keyset-paginated page of contributions, filtered in the database"""
+    return _fetch_contributions_page(
+        get_data_version("contributions", "youth_members"), after, limit, sort_by, descending,
+        contribution_type, start_date, end_date, member_id
+    )
+
+def _escape_like(text):
+    """Escape LIKE wildcards in user input"""
+    return text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+@st.cache_data(ttl=5, show_spinner=False)
+def _search_members(version, query, limit):
+    try:
+        supabase = init_connection()
+        if not supabase:
+            return []
+            
+        columns = "id, full_name, birthday, department_id"
+        if not query:
+            query = supabase.table("youth_members").select(columns)
+            return _order_by(query, "full_name", "id").limit(limit).execute().data
+        
+        # Ranked, typo-tolerant search across name, phone and email
+        try:
+            return supabase.rpc("search_youth_members", {
+                "search_query": query,
+                "max_results": limit
+            }).execute().data
+        except Exception as e:
+            print(f"Ranked member search unavailable: {str(e)}")
+        
+        # Prefix matches first, then fill up with substring matches from the trigram index
+        escaped = _escape_like(query)
+        query = supabase.table("youth_members").select(columns).ilike("full_name", f"{escaped}%")
+        matches = _order_by(query, "full_name", "id").limit(limit).execute().data
+        if len(matches) < limit:
+            seen = {m['id'] for m in matches}
+            query = supabase.table("youth_members").select(columns).ilike("full_name", f"%{escaped}%")
+            extra = _order_by(query, "full_name", "id").limit(limit).execute().data
+            matches += [m for m in extra if m['id'] not in seen][:limit - len(matches)]
+        return matches
+    except Exception as e:
+        print(f"Error searching members: {str(e)}")
+        return []
+
+def search_members(query, limit=20):
+    """Get the top members matching the query by name, phone or email"""
+    return _search_members(get_data_version("youth_members"), query.strip(), limit)
+
+@st.cache_data(ttl=5, show_spinner=False)
+def _search_contributions(version, query, limit):
+    try:
+        supabase = init_connection()
+        if not supabase:
+            return []
+            
+        q = supabase.table("contributions")\
+            .select("id, amount, contribution_type, payment_date, week_number, member_id, youth_members!inner(full_name)")
+        if query:
+            q = q.ilike("youth_members.full_name", f"%{_escape_like(query)}%")
+        return _order_by(q, "payment_date", "id", descending=True).limit(limit).execute().data
+    except Exception as e:
+        print(f"Error searching contributions: {str(e)}")
+        return []
+
+def search_contributions(query, limit=20):
+    """Get the most recent contributions whose member name matches the query"""
+    return _search_contributions(get_data_version("contributions", "youth_members"), query.strip(), limit)
+
+@st.cache_data(ttl=5, show_spinner=False)
+@shared_tier
+def _fetch_contribution_defaulters(version, month, year, contribution_type):
+    try:
+        supabase = init_connection()
+        if not supabase:
+            return []
+            
+        response = supabase.rpc("contribution_defaulters", {
+            "target_month": month,
+            "target_year": year,
+            "target_type": contribution_type
+        }).execute()
+        return response.data
+    except Exception as e:
+        print(f"Error fetching defaulters: {str(e)}")
+        return []
+
+def get_contribution_defaulters(month, year, contribution_type="BIRTHDAY"):
+    """Get members with no contribution of the given type in a month, with department names"""
+    return _fetch_contribution_defaulters(
+        get_data_version("contributions", "youth_members", "departments"), month, year, contribution_type
+    )
+
+@st.cache_data(ttl=5, show_spinner=False)
+@shared_tier
+def _fetch_defaulters_by_department(version, month, year, contribution_type):
+    try:
+        supabase = init_connection()
+        if not supabase:
+            return []
+            
+        response = supabase.rpc("contribution_defaulters_by_department", {
+            "target_month": month,
+            "target_year": year,
+            "target_type": contribution_type
+        }).execute()
+        return response.data
+    except Exception as e:
+        print(f"Error fetching defaulters by department: {str(e)}")
+        return []
+
+def get_defaulters_by_department(month, year, contribution_type="BIRTHDAY"):
+    """Get member and defaulter counts per department for a month"""
+    return _fetch_defaulters_by_department(
+        get_data_version("contributions", "youth_members", "departments"), month, year, contribution_type
+    )
 
 @st.cache_data(ttl=5, show_spinner=False)
+@shared_tier
+def _fetch_compliance_matrix(version, year, contribution_type):
+    try:
+        supabase = init_connection()
+        if not supabase:
+            return []
+            
+        response = supabase.table("contribution_compliance")\
+            .select("member_id, month, payments, total_amount")\
+            .eq("year", year)\
+            .eq("contribution_type", contribution_type)\
+            .execute()
+        return response.data
+    except Exception as e:
+        print(f"Error fetching compliance matrix: {str(e)}")
+        return []
+
+def get_compliance_matrix(year, contribution_type="BIRTHDAY"):
+    """Get the (member, month) cells with at least one payment of the given type in a year"""
+    return _fetch_compliance_matrix(get_data_version("contributions"), year, contribution_type)
+
 def get_departments():
     """Get all departments"""
+    return _fetch_departments(get_data_version("departments"))
+
+@st.cache_data(ttl=5, show_spinner=False)
+@shared_tier
+def _fetch_departments(version):
     try:
         supabase = init_connection()
         if not supabase:
@@ -134,9 +534,13 @@ def get_departments():
         print(f"Error fetching departments: {str(e)}")
         return []
 
-@st.cache_data(ttl=5, show_spinner=False)
 def get_monthly_birthdays(month):
     """Get birthdays for a specific month"""
+    return _fetch_monthly_birthdays(get_data_version("youth_members", "departments"), month)
+
+@st.cache_data(ttl=5, show_spinner=False)
+@shared_tier
+def _fetch_monthly_birthdays(version, month):
     try:
         supabase = init_connection()
         if not supabase:
@@ -168,6 +572,7 @@ def update_youth_member(member_id, full_name, birthday, department_id, phone_num
             "email": email,
             "updated_at": datetime.now().isoformat()
         }).eq("id", member_id).execute()
+        bump_data_version("youth_members")
         
         # Clear all caches immediately
         st.cache_data.clear()
@@ -199,6 +604,7 @@ def delete_youth_member(member_id):
             .delete()\
             .eq("id", member_id)\
             .execute()
+        bump_data_version("youth_members", "contributions")
             
         # Clear all caches immediately
         st.cache_data.clear()
@@ -212,18 +618,22 @@ def delete_youth_member(member_id):
 def add_department(name, description=None):
     """Add a new department"""
     supabase = init_connection()
-    return supabase.table("departments").insert({
+    result = supabase.table("departments").insert({
         "name": name,
         "description": description
     }).execute()
+    bump_data_version("departments")
+    return result
 
 def update_department(dept_id, name, description=None):
     """Update an existing department"""
     supabase = init_connection()
-    return supabase.table("departments").update({
+    result = supabase.table("departments").update({
         "name": name,
         "description": description
     }).eq("id", dept_id).execute()
+    bump_data_version("departments")
+    return result
 
 def delete_department(dept_id):
     """Delete a department"""
@@ -234,6 +644,7 @@ def delete_department(dept_id):
     }).eq("department_id", dept_id).execute()
     # Then delete the department
     result = supabase.table("departments").delete().eq("id", dept_id).execute()
+    bump_data_version("departments", "youth_members")
     clear_cache()  # Clear cache after deletion
     return result
 
@@ -248,34 +659,267 @@ def check_users_exist():
         print(f"Error checking users table: {str(e)}")
         return True  # Assume users exist if we can't check
 
-def add_email_recipient(email):
-    """Add new email recipient"""
+def add_email_recipient(email, delivery_mode="digest", department_ids=None, windows=None, channels=None, phone_number=None):
+    """Add new email recipient, subscribed to every department and window unless given"""
     try:
         supabase = init_connection()
         response = supabase.table('email_recipients').insert({
-            'email': email
+            'email': email,
+            'delivery_mode': delivery_mode,
+            'department_ids': department_ids or None,
+            'windows': windows or None,
+            'channels': channels or ['email'],
+            'phone_number': phone_number or None
         }).execute()
+        bump_data_version("email_recipients")
         return True
     except Exception as e:
         st.error(f"Error adding email recipient: {str(e)}")
         return False
 
+def update_email_recipient_mode(email, delivery_mode):
+    """Switch a recipient between the daily digest and separate reminder emails"""
+    try:
+        supabase = init_connection()
+        response = supabase.table('email_recipients').update({
+            'delivery_mode': delivery_mode
+        }).eq('email', email).execute()
+        bump_data_version("email_recipients")
+        return True
+    except Exception as e:
+        st.error(f"Error updating email recipient: {str(e)}")
+        return False
+
+def update_email_recipient_subscription(email, department_ids=None, windows=None, channels=None, phone_number=None):
+    """Set which departments, windows and channels a recipient hears about; empty means all"""
+    try:
+        supabase = init_connection()
+        response = supabase.table('email_recipients').update({
+            'department_ids': department_ids or None,
+            'windows': windows or None,
+            'channels': channels or ['email'],
+            'phone_number': phone_number or None
+        }).eq('email', email).execute()
+        bump_data_version("email_recipients")
+        return True
+    except Exception as e:
+        st.error(f"Error updating email recipient: {str(e)}")
+        return False
+
 def get_email_recipients():
     """Get all email recipients"""
     try:
-        supabase = init_connection()
-        response = supabase.table('email_recipients').select('*').execute()
-        return response.data
+        return _fetch_email_recipients(get_data_version("email_recipients"))
     except Exception as e:
         st.error(f"Error fetching email recipients: {str(e)}")
         return []
 
+# Recipients only change through the functions here, which bump the version,
+# so the cache can live much longer than the other tables'
+@st.cache_data(ttl=300, show_spinner=False)
+@shared_tier
+def _fetch_email_recipients(version):
+    supabase = init_connection()
+    # Errors propagate so a failed fetch isn't cached
+    response = supabase.table('email_recipients').select('*').order('email').execute()
+    return response.data
+
+def email_recipient_exists(email):
+    """Check whether an address is already a recipient with an indexed lookup"""
+    supabase = init_connection()
+    response = supabase.table('email_recipients').select('email').eq('email', email).limit(1).execute()
+    return bool(response.data)
+
 def delete_email_recipient(email):
     """Delete email recipient"""
     try:
         supabase = init_connection()
         response = supabase.table('email_recipients').delete().eq('email', email).execute()
+        bump_data_version("email_recipients")
         return True
     except Exception as e:
         st.error(f"Error deleting email recipient: {str(e)}")
-        return False 
\ No newline at end of file
+        return False
+
+def add_notification_retry(recipients, subject, message, attempts, last_error, next_attempt_at):
+    """Queue a failed notification to be sent again at next_attempt_at"""
+    try:
+        supabase = init_connection()
+        supabase.table('notification_retries').insert({
+            'recipients': list(recipients),
+            'subject': subject,
+            'message': message,
+            'attempts': attempts,
+            'last_error': last_error,
+            'next_attempt_at': next_attempt_at.isoformat()
+        }).execute()
+        return True
+    except Exception as e:
+        print(f"Error queueing notification retry: {str(e)}")
+        return False
+
+def get_due_notification_retries(now, limit=100):
+    """Get queued notifications whose next attempt is due, oldest first"""
+    supabase = init_connection()
+    response = supabase.table('notification_retries').select('*')\
+        .lte('next_attempt_at', now.isoformat())\
+        .order('next_attempt_at')\
+        .limit(limit)\
+        .execute()
+    return response.data
+
+def get_notification_retries():
+    """Get every queued notification, soonest first"""
+    try:
+        supabase = init_connection()
+        response = supabase.table('notification_retries').select('id, recipients, subject, attempts, last_error, next_attempt_at')\
+            .order('next_attempt_at')\
+            .execute()
+        return response.data
+    except Exception as e:
+        print(f"Error fetching notification retries: {str(e)}")
+        return []
+
+def reschedule_notification_retry(retry_id, attempts, last_error, next_attempt_at):
+    """Record another failed attempt and when to try again"""
+    supabase = init_connection()
+    supabase.table('notification_retries').update({
+        'attempts': attempts,
+        'last_error': last_error,
+        'next_attempt_at': next_attempt_at.isoformat()
+    }).eq('id', retry_id).execute()
+
+def delete_notification_retry(retry_id):
+    """Remove a notification from the retry queue"""
+    supabase = init_connection()
+    supabase.table('notification_retries').delete().eq('id', retry_id).execute()
+
+def add_dead_letter(recipients, subject, message, attempts, last_error):
+    """Store a notification that will not be retried automatically"""
+    try:
+        supabase = init_connection()
+        supabase.table('notification_dead_letters').insert({
+            'recipients': list(recipients),
+            'subject': subject,
+            'message': message,
+            'attempts': attempts,
+            'last_error': last_error
+        }).execute()
+        return True
+    except Exception as e:
+        print(f"Error storing dead letter: {str(e)}")
+        return False
+
+def get_dead_letters(dead_letter_ids=None):
+    """Get dead-lettered notifications, newest first, optionally only the given ids"""
+    supabase = init_connection()
+    query = supabase.table('notification_dead_letters').select('*')
+    if dead_letter_ids:
+        query = query.in_('id', list(dead_letter_ids))
+    return query.order('failed_at', desc=True).execute().data
+
+def delete_dead_letter(dead_letter_id):
+    """Remove a dead-lettered notification"""
+    supabase = init_connection()
+    supabase.table('notification_dead_letters').delete().eq('id', dead_letter_id).execute()
+
+def get_payment_reminder_targets(month, year, contribution_type="BIRTHDAY"):
+    """Get the month's defaulters who haven't been sent a payment reminder yet"""
+    supabase = init_connection()
+    response = supabase.rpc("payment_reminder_targets", {
+        "target_month": month,
+        "target_year": year,
+        "target_type": contribution_type
+    }).execute()
+    return response.data
+
+def record_payment_reminders(member_channels, month, year, contribution_type="BIRTHDAY"):
+    """Mark members as reminded for the cycle, given {member_id: [channels]}"""
+    if not member_channels:
+        return
+    supabase = init_connection()
+    supabase.table('payment_reminders').upsert([
+        {
+            'member_id': member_id,
+            'contribution_type': contribution_type,
+            'year': year,
+            'month': month,
+            'channels': channels
+        }
+        for member_id, channels in member_channels.items()
+    ], on_conflict='contribution_type,year,month,member_id').execute()
+
+def save_reminder_payload(slot_date, time_of_day, version, payload):
+    """Store a precomputed reminder payload for a slot, replacing any earlier one"""
+    try:
+        supabase = init_connection()
+        supabase.table('reminder_payloads').upsert({
+            'slot_date': slot_date.isoformat(),
+            'time_of_day': time_of_day,
+            'version': version,
+            'payload': payload
+        }, on_conflict='slot_date,time_of_day').execute()
+        return True
+    except Exception as e:
+        print(f"Error saving reminder payload: {str(e)}")
+        return False
+
+def get_reminder_payload(slot_date, time_of_day):
+    """Get the precomputed reminder payload for a slot, if there is one"""
+    try:
+        supabase = init_connection()
+        response = supabase.table('reminder_payloads').select('*')\
+            .eq('slot_date', slot_date.isoformat())\
+            .eq('time_of_day', time_of_day)\
+            .limit(1)\
+            .execute()
+        return response.data[0] if response.data else None
+    except Exception as e:
+        print(f"Error fetching reminder payload: {str(e)}")
+        return None
+
+def delete_reminder_payloads_before(slot_date):
+    """Drop precomputed payloads for slots before a date"""
+    try:
+        supabase = init_connection()
+        supabase.table('reminder_payloads').delete().lt('slot_date', slot_date.isoformat()).execute()
+    except Exception as e:
+        print(f"Error deleting old reminder payloads: {str(e)}")
+
+def get_scheduler_state():
+    """Get each scheduled job's last run as {name: {last_fire_at, last_run_at, last_status, last_message}}"""
+    supabase = init_connection()
+    response = supabase.table('scheduler_jobs').select('*').execute()
+    state = {}
+    for row in response.data:
+        name = row.pop('name')
+        for key in ('last_fire_at', 'last_run_at'):
+            row[key] = datetime.fromisoformat(row[key]) if row.get(key) else None
+        state[name] = row
+    return state
+
+def save_scheduler_run(name, last_fire_at, last_run_at, last_status, last_message=None):
+    """Record a scheduled job's latest run"""
+    supabase = init_connection()
+    supabase.table('scheduler_jobs').upsert({
+        'name': name,
+        'last_fire_at': last_fire_at.isoformat(),
+        'last_run_at': last_run_at.isoformat(),
+        'last_status': last_status,
+        'last_message': last_message
+    }, on_conflict='name').execute()
+
+def acquire_scheduler_lease(name, holder, ttl_seconds):
+    """Take or renew a scheduler lease; True if holder now holds it"""
+    supabase = init_connection()
+    response = supabase.rpc("acquire_scheduler_lease", {
+        "lease_name": name,
+        "lease_holder": holder,
+        "ttl_seconds": ttl_seconds
+    }).execute()
+    return bool(response.data)
+
+def release_scheduler_lease(name, holder):
+    """Give up a lease if holder still holds it"""
+    supabase = init_connection()
+    supabase.table('scheduler_leases').delete().eq('name', name).eq('holder', holder).execute()
@@ -1,46 +1,207 @@
+import calendar
+import hashlib
+import json
 import smtplib
 import ssl
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from datetime import datetime, timedelta
-from utils.database import get_youth_members, get_email_recipients, get_departments
+import threading
+from datetime import date, datetime, timedelta
+from utils.database import (
+    get_youth_members,
+    get_email_recipients,
+    get_departments,
+    get_data_version,
+    get_reminder_payload,
+    save_reminder_payload,
+    delete_reminder_payloads_before
+)
+from utils.channels import Channel, SMSChannel, WebhookChannel, empty_result
+from utils.mailer import Dispatcher, build_messages
+from utils.routing import RoutingTable, get_routing_table
+from utils.reminder_schedule import ReminderEngine, DEFAULT_TIMEZONE, DEFAULT_WINDOW_MINUTES
+from utils.notification_queue import MAX_ATTEMPTS, drain_retries, queue_failures
+from utils.locks import hold_lease
+from utils.smtp_sink import SMTPSink
 import streamlit as st
+from utils.templates import (
+    Safe,
+    render_members,
+    REMINDER_HTML,
+    REMINDER_TEXT,
+    DIGEST_HTML,
+    DIGEST_TEXT,
+    DIGEST_SECTION_HTML,
+    DIGEST_SECTION_TEXT,
+    TEST_HTML,
+    TEST_TEXT
+)
 
-def send_birthday_email(recipients, subject, body):
-    """Send email using SMTP"""
+# Days ahead reminders look when email settings don't say otherwise
+DEFAULT_HORIZON_DAYS = 3
+
+_last_dispatch = {}
+
+_settings_overrides = {}
+
+def set_notification_settings(section, settings=None):
+    """Override a secrets section ("email", "sms", "webhook" or "schedule") for this process; None restores it"""
+    if settings is None:
+        _settings_overrides.pop(section, None)
+    else:
+        _settings_overrides[section] = dict(settings)
+
+def get_notification_settings(section):
+    """Get a secrets section with any overrides applied"""
     try:
-        # Get email credentials from Streamlit secrets
-        smtp_server = st.secrets["email"]["smtp_server"]
-        smtp_port = st.secrets["email"]["smtp_port"]  # Using 465 for SSL
-        sender_email = st.secrets["email"]["sender_email"]
-        sender_password = st.secrets["email"]["sender_password"]
-
-        # Create message
-        message = MIMEMultipart()
-        message["From"] = sender_email
-        message["To"] = ", ".join(recipients)
-        message["Subject"] = subject
-        message.attach(MIMEText(body, "html"))
-
-        # Create secure SSL/TLS context
-        context = ssl.create_default_context()
-
-        # Connect using SSL
-        with smtplib.SMTP_SSL(smtp_server, smtp_port, context=context) as server:
-            # Login
+        settings = dict(st.secrets[section])
+    except Exception:
+        settings = {}
+    settings.update(_settings_overrides.get(section, {}))
+    return settings
+
+def set_email_settings(settings=None):
+    """Override the email secrets for this process, e.g. from a script; None restores them"""
+    set_notification_settings("email", settings)
+
+def get_email_settings():
+    """Get the email settings: the [email] secrets with any overrides applied"""
+    return get_notification_settings("email")
+
+def _email_setting(key, default):
+    """Read an optional email setting"""
+    return get_email_settings().get(key, default)
+
+_local_sink = None
+_local_sink_lock = threading.Lock()
+
+def get_local_sink(store_dir=None):
+    """Get the process-wide local SMTP sink used when local_sink is enabled, starting it on first use"""
+    global _local_sink
+    with _local_sink_lock:
+        if _local_sink is None:
+            _local_sink = SMTPSink(store_dir=store_dir).start()
+        return _local_sink
+
+def _smtp_connector(settings):
+    """Get a function that opens a logged-in SMTP session with the given settings"""
+    sender_email = settings["sender_email"]
+    sender_password = settings.get("sender_password")
+    if settings.get("local_sink"):
+        # Deliver to an in-process sink instead of a real server
+        sink = get_local_sink(settings.get("local_sink_dir"))
+        smtp_server, smtp_port, security = sink.host, sink.port, "none"
+    else:
+        smtp_server = settings["smtp_server"]
+        smtp_port = settings["smtp_port"]  # Using 465 for SSL
+        security = settings.get("smtp_security", "ssl")
+
+    def connect():
+        if security == "ssl":
+            server = smtplib.SMTP_SSL(smtp_server, smtp_port, context=ssl.create_default_context(), timeout=30)
+        else:
+            server = smtplib.SMTP(smtp_server, smtp_port, timeout=30)
+            if security == "starttls":
+                server.starttls(context=ssl.create_default_context())
+        if sender_password:
             server.login(sender_email, sender_password)
-            # Send email
-            server.send_message(message)
-            
-        return True
+        return server
+    return connect
+
+def get_dispatcher(settings=None):
+    """Build a dispatcher from the connection and optional throughput settings"""
+    # Settings are read here, on the script thread, rather than in the send workers
+    settings = settings or get_email_settings()
+    return Dispatcher(
+        _smtp_connector(settings),
+        max_workers=int(settings.get("send_workers", 4)),
+        sessions=int(settings.get("smtp_sessions", 2)),
+        rate_per_second=float(settings.get("send_rate_per_second", 5)),
+        max_retries=int(settings.get("send_retries", 3)),
+        backoff_seconds=float(settings.get("send_backoff_seconds", 1))
+    )
+
+def get_last_dispatch():
+    """Get the metrics of this process's most recent dispatch, if any"""
+    return _last_dispatch.get('metrics')
+
+def send_emails(emails):
+    """Send (recipients, subject, body, text_body) emails in one dispatch run
+
+    Recipients never see each other: each gets their own copy, or with
+    dispatch_mode = "bcc" copies go to hidden batches of bcc_batch_size.
+    """
+    settings = get_email_settings()
+    mode = settings.get("dispatch_mode", "individual")
+    batch_size = int(settings.get("bcc_batch_size", 50))
+
+    messages = []
+    for recipients, subject, body, text_body in emails:
+        messages.extend(build_messages(settings["sender_email"], recipients, subject, body, text_body, mode, batch_size))
+
+    result = get_dispatcher(settings).send(messages)
+    _last_dispatch['metrics'] = dict(result.summary(), finished_at=datetime.now())
+    for recipients, error in result.failures:
+        print(f"Error sending email to {', '.join(recipients)}: {error}")
+    return result
+
+def retry_failed_notifications():
+    """Send the queued notifications that are due for another attempt, unless a drain is already running"""
+    # Due rows aren't claimed when read, so two drains at once would send them twice
+    with hold_lease("notification_retries") as lease:
+        if not lease.acquired:
+            return {'sent': 0, 'retrying': 0, 'dead_lettered': 0, 'in_progress': True}
+        return drain_retries(get_dispatcher(), int(_email_setting("retry_max_attempts", MAX_ATTEMPTS)))
+
+class EmailChannel(Channel):
+    """Email through the SMTP dispatcher, saving failures to the retry queue"""
+    name = "email"
+
+    def __init__(self, retry_queue=True):
+        self.retry_queue = retry_queue
+
+    def send(self, notifications):
+        max_attempts = int(_email_setting("retry_max_attempts", MAX_ATTEMPTS))
+        # Everything goes out in one run over shared sessions
+        dispatch = send_emails([(n['to'], n['subject'], n['html'], n['text']) for n in notifications])
+        result = dict(empty_result(self.name), sent=dispatch.sent, failed=dispatch.failed, failures=dispatch.failures)
+        result['requests'] = dispatch.sent + dispatch.failed
+        if dispatch.failed and self.retry_queue:
+            # Nothing is lost: failures wait in the retry queue or the dead letters
+            queued, dead_lettered = queue_failures(dispatch, max_attempts)
+            result['queued'], result['dead_lettered'] = len(queued), len(dead_lettered)
+            result['retrying'] = queued
+        return result
+
+def get_channels(retry_queue=True):
+    """Get the configured notification channels by name; email is always on"""
+    channels = {"email": EmailChannel(retry_queue)}
+    sms = get_notification_settings("sms")
+    if sms.get("gateway_url"):
+        channels["sms"] = SMSChannel(
+            sms["gateway_url"],
+            api_key=sms.get("api_key"),
+            sender_id=sms.get("sender_id"),
+            batch_size=int(sms.get("batch_size", 100)),
+            country_code=sms.get("country_code"),
+            max_workers=int(sms.get("max_workers", 4))
+        )
+    webhook = get_notification_settings("webhook")
+    if webhook.get("urls"):
+        channels["webhook"] = WebhookChannel(webhook["urls"], secret=webhook.get("secret"))
+    return channels
+
+def send_birthday_email(recipients, subject, body, text_body=None):
+    """Send email using SMTP, with an optional plain-text alternative to the HTML body"""
+    try:
+        result = send_emails([(recipients, subject, body, text_body)])
+        if result.failures:
+            st.error(f"Error sending email: {result.failures[0][1]}")
+        return result.sent > 0 and not result.failures
     except Exception as e:
         st.error(f"Error sending email: {str(e)}")
         return False
 
-def format_birthday_email(birthday_list, days_until, time_of_day):
-    """Format the birthday email HTML content"""
-    today = datetime.now().strftime("%B %d, %Y")
-    
+def format_birthday_email(birthday_list, days_until, time_of_day, today=None):
+    """Format a single-window reminder as (html, text) bodies"""
     if days_until == 0:
         header = "🎂 Today's Birthdays"
         intro = "The following members are celebrating their birthdays today:"
@@ -48,167 +209,286 @@ def format_birthday_email(birthday_list, days_until, time_of_day):
         header = f"🎈 Upcoming Birthdays in {days_until} {'Day' if days_until == 1 else 'Days'}"
         intro = f"This is a {time_of_day} reminder for upcoming birthdays:"
     
-    html = f"""
-    <html>
-    <body style="font-family: Arial, sans-serif;">
-        <h2>{header}</h2>
-        <p>{intro}</p>
-        <div style="background-color: #f8f9fa; padding: 15px; border-radius: 5px;">
-    """
-    
-    for member in birthday_list:
-        html += f"""
-            <div style="margin-bottom: 15px; padding: 10px; background-color: white; border-radius: 5px;">
-                <h3 style="margin: 0; color: #4c1d95;">👤 {member['name']}</h3>
-                <p style="margin: 5px 0; color: #1e1b4b;">
-                    📅 Birthday: {member['birthday']}<br>
-                    🏢 Department: {member['department']}
-                </p>
-            </div>
-        """
-    
-    html += f"""
-        </div>
-        <p style="color: #666; font-size: 0.9em;">
-            Sent on: {today} ({time_of_day} reminder)
-        </p>
-    </body>
-    </html>
-    """
-    return html
+    members_html, members_text = render_members(birthday_list)
+    values = {
+        'header': header,
+        'intro': intro,
+        'sent_on': (today or datetime.now()).strftime("%B %d, %Y"),
+        'time_of_day': time_of_day
+    }
+    return (
+        REMINDER_HTML.render(members=members_html, **values),
+        REMINDER_TEXT.render(members=members_text, **values)
+    )
 
-def check_and_send_birthday_reminders(force_send=False):
-    try:
-        # Get all necessary data
-        members = get_youth_members()
-        recipients = get_email_recipients()
-        departments = get_departments()
-        dept_mapping = {dept['id']: dept['name'] for dept in departments}
-        
-        if not members or not recipients:
-            return "No members or recipients found.", False
-            
-        recipient_emails = [r['email'] for r in recipients]
-        today = datetime.now()
-        current_hour = today.hour
-        
-        # Initialize lists for different notification types
-        today_birthdays = []
-        tomorrow_birthdays = []
-        two_days_birthdays = []
-        three_days_birthdays = []
-        
-        for member in members:
-            if member.get('birthday'):
-                # Convert DD/MM to datetime
-                day, month = member['birthday'].split('/')
-                bday_this_year = datetime(today.year, int(month), int(day))
-                
-                # If birthday has passed this year, look at next year
-                if bday_this_year < today:
-                    bday_this_year = datetime(today.year + 1, int(month), int(day))
-                
-                # Calculate days until birthday
-                days_until = (bday_this_year.date() - today.date()).days
-                
-                # Get department name
-                department = dept_mapping.get(member['department_id'], 'No Department')
-                
-                member_info = {
+def format_test_email(name, birthday, department):
+    """Format the configuration test email as (html, text) bodies"""
+    values = {'name': name, 'birthday': birthday, 'department': department}
+    return TEST_HTML.render(**values), TEST_TEXT.render(**values)
+
+def get_reminder_horizon():
+    """Get how many days ahead reminders look, from the email settings"""
+    return int(_email_setting("reminder_horizon_days", DEFAULT_HORIZON_DAYS))
+
+def get_reminder_engine(clock=None):
+    """Get the reminder slots and timezone from the [schedule] settings"""
+    schedule = get_notification_settings("schedule")
+    return ReminderEngine(
+        schedule.get("timezone", DEFAULT_TIMEZONE),
+        schedule.get("slots"),
+        int(schedule.get("slot_window_minutes", DEFAULT_WINDOW_MINUTES)),
+        clock
+    )
+
+def next_birthday(birthday, today):
+    """Get the date of a DD/MM birthday on or after today; 29/02 falls on 28/02 outside leap years"""
+    day, month = (int(part) for part in birthday.split('/'))
+    for year in (today.year, today.year + 1):
+        if (month, day) == (2, 29) and not calendar.isleap(year):
+            celebrated = date(year, 2, 28)
+        else:
+            celebrated = date(year, month, day)
+        # If birthday has passed this year, look at next year
+        if celebrated >= today.date():
+            return celebrated
+
+def get_upcoming_birthdays(members, dept_mapping, today, horizon_days):
+    """Group members by days until their birthday, from today up to the horizon"""
+    windows = {}
+    for member in members:
+        if member.get('birthday'):
+            days_until = (next_birthday(member['birthday'], today) - today.date()).days
+            if days_until <= horizon_days:
+                windows.setdefault(days_until, []).append({
                     'name': member['full_name'],
                     'birthday': member['birthday'],
-                    'department': department,
+                    'department': dept_mapping.get(member['department_id'], 'No Department'),
+                    'department_id': member['department_id'],
+                    'phone_number': member.get('phone_number'),
                     'days_until': days_until
+                })
+    return windows
+
+def window_label(days_until):
+    """Describe a reminder window, such as today, tomorrow or in 3 days"""
+    if days_until == 0:
+        return "today"
+    if days_until == 1:
+        return "tomorrow"
+    return f"in {days_until} days"
+
+def window_subject(days_until):
+    """Get the subject line of a single-window reminder"""
+    if days_until == 0:
+        return "🎂 Birthday Today!"
+    if days_until == 1:
+        return "🎈 Birthday Tomorrow!"
+    return f"🎈 Birthdays in {days_until} Days!"
+
+def format_birthday_digest(windows, time_of_day, today=None):
+    """Format one email covering every reminder window, soonest first, as (html, text) bodies"""
+    sections_html = []
+    sections_text = []
+    for days_until in sorted(windows):
+        # Member fragments are cached, so windows and emails share them
+        members_html, members_text = render_members(windows[days_until])
+        label = window_label(days_until).capitalize()
+        sections_html.append(DIGEST_SECTION_HTML.render(label=label, members=members_html))
+        sections_text.append(DIGEST_SECTION_TEXT.render(label=label, members=members_text))
+
+    sent_on = (today or datetime.now()).strftime("%B %d, %Y")
+    return (
+        DIGEST_HTML.render(sections=Safe("".join(sections_html)), sent_on=sent_on, time_of_day=time_of_day),
+        DIGEST_TEXT.render(sections="".join(sections_text), sent_on=sent_on, time_of_day=time_of_day)
+    )
+
+def digest_subject(windows):
+    """Summarize the digest's windows in its subject line"""
+    counts = ", ".join(f"{len(windows[d])} {window_label(d)}" for d in sorted(windows))
+    return f"🎂 Birthday Digest: {counts}"
+
+def format_birthday_sms(windows):
+    """Summarize every window in one short text for admin phones"""
+    parts = [
+        f"{window_label(d).capitalize()}: {', '.join(m['name'] for m in windows[d])}"
+        for d in sorted(windows)
+    ]
+    return "Birthdays - " + "; ".join(parts)
+
+def route_birthday_reminders(windows, recipients, time_of_day, channels, today=None, routing=None, engine=None):
+    """Build each channel's notifications for one reminder slot
+
+    Recipients only hear about the departments and windows they subscribe
+    to; everyone who would see the same members shares one message. The
+    engine deciding the slot also decides which slot carries SMS.
+    """
+    routing = routing or RoutingTable(recipients, {m.get('department_id') for ms in windows.values() for m in ms}, max(windows))
+    routes = {}
+    if "email" in channels:
+        emails = routes["email"] = []
+        for addresses, view in routing.fan_out(windows, "email"):
+            # Recipients choose one digest per slot or a separate email per window
+            digest_emails = [a for a in addresses if routing.delivery_modes[a] == 'digest']
+            individual_emails = [a for a in addresses if routing.delivery_modes[a] == 'individual']
+            if digest_emails:
+                body, text_body = format_birthday_digest(view, time_of_day, today)
+                emails.append({'to': digest_emails, 'subject': digest_subject(view), 'html': body, 'text': text_body})
+            if individual_emails:
+                # Furthest window first, as the separate reminders always went out
+                for days_until in sorted(view, reverse=True):
+                    body, text_body = format_birthday_email(view[days_until], days_until, time_of_day, today)
+                    emails.append({'to': individual_emails, 'subject': window_subject(days_until), 'html': body, 'text': text_body})
+
+    # Texts cost money, so they only go out with the day's first reminder
+    if "sms" in channels and time_of_day == (engine or get_reminder_engine()).first_slot:
+        sms = get_notification_settings("sms")
+        texts = routes["sms"] = []
+        if sms.get("admin_numbers"):
+            texts.append({'to': list(sms["admin_numbers"]), 'subject': digest_subject(windows), 'text': format_birthday_sms(windows)})
+        for numbers, view in routing.fan_out(windows, "sms"):
+            texts.append({'to': numbers, 'subject': digest_subject(view), 'text': format_birthday_sms(view)})
+        if sms.get("member_greetings") and windows.get(0):
+            greeting = sms.get("greeting", "Happy birthday, {name}! Wishing you a blessed year ahead.")
+            for member in windows[0]:
+                if member.get('phone_number'):
+                    texts.append({'to': [member['phone_number']], 'subject': "Birthday greeting", 'text': greeting.format(name=member['name'])})
+
+    if "webhook" in channels:
+        _, text_body = format_birthday_digest(windows, time_of_day, today)
+        routes["webhook"] = [{
+            'to': [],
+            'subject': digest_subject(windows),
+            'text': text_body,
+            'data': {
+                'event': "birthday_reminder",
+                'time_of_day': time_of_day,
+                'windows': {
+                    str(d): [{k: m[k] for k in ('name', 'birthday', 'department')} for m in windows[d]]
+                    for d in sorted(windows)
                 }
-                
-                # Categorize based on days until birthday
-                if days_until == 0:
-                    today_birthdays.append(member_info)
-                elif days_until == 1:
-                    tomorrow_birthdays.append(member_info)
-                elif days_until == 2:
-                    two_days_birthdays.append(member_info)
-                elif days_until == 3:
-                    three_days_birthdays.append(member_info)
-        
-        # Check if there are any upcoming birthdays
-        has_upcoming_birthdays = (
-            today_birthdays or tomorrow_birthdays or 
-            two_days_birthdays or three_days_birthdays
+            }
+        }]
+    return routes
+
+def _channel_status(result):
+    """Describe one channel's result for the reminder status message"""
+    if result['channel'] == "email":
+        status = f"{result['sent']} {'message' if result['sent'] == 1 else 'messages'} sent"
+    else:
+        status = f"{result['sent']} {result['channel']} sent in {result['requests']} {'request' if result['requests'] == 1 else 'requests'}"
+    if result['failed']:
+        status += f", {result['failed']} failed"
+        if 'queued' in result:
+            status += f": {result['queued']} queued for retry, {result['dead_lettered']} dead-lettered"
+    return status
+
+def reminder_payload_version(members, recipients, departments, horizon_days, channels):
+    """Fingerprint everything a reminder payload is built from"""
+    source = {
+        'members': sorted(
+            [m['id'], m['full_name'], m.get('birthday'), m.get('department_id'), m.get('phone_number')] for m in members
+        ),
+        'recipients': sorted(
+            [r['email'], r.get('delivery_mode', 'digest'), r.get('department_ids'), r.get('windows'), r.get('channels'), r.get('phone_number')]
+            for r in recipients
+        ),
+        'departments': sorted([d['id'], d['name']] for d in departments),
+        'horizon_days': horizon_days,
+        'channels': sorted(channels),
+        'sms': get_notification_settings("sms"),
+        'webhook': get_notification_settings("webhook")
+    }
+    return hashlib.sha1(json.dumps(source, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+def build_reminder_payload(members, recipients, dept_mapping, slot_time, horizon_days, time_of_day, channels, routing=None, engine=None):
+    """Scan members and render every channel's notifications for one reminder slot"""
+    windows = get_upcoming_birthdays(members, dept_mapping, slot_time, horizon_days)
+    routing = routing or RoutingTable(recipients, dept_mapping, horizon_days)
+    routes = route_birthday_reminders(windows, recipients, time_of_day, channels, slot_time, routing, engine) if windows else {}
+    return {'windows': windows, 'routes': routes}
+
+def precompute_reminder_payloads(slot_date=None, engine=None):
+    """Build and store a day's payload for every slot, tomorrow's (in the organisation's timezone) by default"""
+    engine = engine or get_reminder_engine()
+    slot_date = slot_date or engine.now().date() + timedelta(days=1)
+    members = get_youth_members()
+    recipients = get_email_recipients()
+    departments = get_departments()
+    dept_mapping = {dept['id']: dept['name'] for dept in departments}
+    channels = get_channels()
+    horizon_days = get_reminder_horizon()
+    version = reminder_payload_version(members, recipients, departments, horizon_days, channels)
+
+    stored = 0
+    for time_of_day, _ in engine.slots:
+        payload = build_reminder_payload(
+            members, recipients, dept_mapping, engine.slot_time(time_of_day, slot_date), horizon_days, time_of_day, channels,
+            engine=engine
         )
+        # Window keys become strings in JSON
+        payload['windows'] = {str(d): members_in_window for d, members_in_window in payload['windows'].items()}
+        stored += save_reminder_payload(slot_date, time_of_day, version, payload)
+    delete_reminder_payloads_before(slot_date - timedelta(days=1))
+    return f"Precomputed {stored} reminder payloads for {slot_date.strftime('%d %b %Y')}"
+
+def load_reminder_payload(slot_date, time_of_day, version):
+    """Get a stored payload for the slot if it was built from the same data, else None"""
+    row = get_reminder_payload(slot_date, time_of_day)
+    if not row or row['version'] != version:
+        return None
+    payload = row['payload']
+    payload['windows'] = {int(d): members_in_window for d, members_in_window in payload['windows'].items()}
+    return payload
+
+def check_and_send_birthday_reminders(force_send=False, horizon_days=None, members=None, recipients=None, departments=None,
+                                      retry_queue=True, time_of_day=None, engine=None, channels=None):
+    try:
+        # Get all necessary data, unless it was passed in (e.g. by the benchmark)
+        injected = members is not None or recipients is not None or departments is not None or channels is not None
+        members = get_youth_members() if members is None else members
+        recipients = get_email_recipients() if recipients is None else recipients
+        departments = get_departments() if departments is None else departments
+        dept_mapping = {dept['id']: dept['name'] for dept in departments}
         
-        if not has_upcoming_birthdays:
-            return "No upcoming birthdays in the next 3 days", True
-        
-        # Morning reminder time: 9 AM (9:00)
-        # Afternoon reminder time: 2 PM (14:00)
-        is_morning_time = 8 <= current_hour < 10
-        is_afternoon_time = 13 <= current_hour < 15
-        
-        # For testing, force send if requested
-        if force_send:
-            is_morning_time = True  # Use morning format for test
-        
-        notifications_sent = False
+        channels = get_channels(retry_queue) if channels is None else channels
         
-        if force_send or is_morning_time or is_afternoon_time:
-            time_of_day = "morning" if (force_send or is_morning_time) else "afternoon"
-            
-            # Format and send emails based on timing
-            if three_days_birthdays:
-                # Birthdays in 3 days
-                body = format_birthday_email(three_days_birthdays, 3, time_of_day)
-                send_birthday_email(
-                    recipient_emails, 
-                    "🎈 Birthdays in 3 Days!", 
-                    body
-                )
-                notifications_sent = True
-            
-            if two_days_birthdays:
-                # Birthdays in 2 days
-                body = format_birthday_email(two_days_birthdays, 2, time_of_day)
-                send_birthday_email(
-                    recipient_emails, 
-                    "🎈 Birthdays in 2 Days!", 
-                    body
-                )
-                notifications_sent = True
-            
-            if tomorrow_birthdays:
-                # Tomorrow's birthdays
-                body = format_birthday_email(tomorrow_birthdays, 1, time_of_day)
-                send_birthday_email(
-                    recipient_emails, 
-                    "🎈 Birthday Tomorrow!", 
-                    body
-                )
-                notifications_sent = True
-            
-            if today_birthdays:
-                # Today's birthdays
-                body = format_birthday_email(today_birthdays, 0, time_of_day)
-                send_birthday_email(
-                    recipient_emails, 
-                    "🎂 Birthday Today!", 
-                    body
-                )
-                notifications_sent = True
+        if not members or not (recipients or len(channels) > 1):
+            return "No members or recipients found.", False
             
-            if notifications_sent:
-                summary = []
-                if three_days_birthdays:
-                    summary.append(f"{len(three_days_birthdays)} in 3 days")
-                if two_days_birthdays:
-                    summary.append(f"{len(two_days_birthdays)} in 2 days")
-                if tomorrow_birthdays:
-                    summary.append(f"{len(tomorrow_birthdays)} tomorrow")
-                if today_birthdays:
-                    summary.append(f"{len(today_birthdays)} today")
-                    
-                return f"Birthday reminders sent for: {', '.join(summary)}", True
-        else:
-            return "Reminders will be sent at 9 AM and 2 PM", True
+        # Slots are decided in the organisation's timezone, not the host's
+        engine = engine or get_reminder_engine()
+        today = engine.now()
+        horizon_days = get_reminder_horizon() if horizon_days is None else horizon_days
+
+        # The scheduler names its slot; otherwise it's the one we're in, and force send uses the first
+        time_of_day = time_of_day or engine.current_slot(today) or (engine.first_slot if force_send else None)
+        if time_of_day is None:
+            if not get_upcoming_birthdays(members, dept_mapping, today, horizon_days):
+                return f"No upcoming birthdays in the next {horizon_days} days", True
+            return f"Reminders will be sent at {engine.describe()}", True
+
+        # Tonight's precomputed payload is shipped as is unless its source data changed
+        payload = None
+        if not injected:
+            version = reminder_payload_version(members, recipients, departments, horizon_days, channels)
+            payload = load_reminder_payload(today.date(), time_of_day, version)
+        precomputed = payload is not None
+        if not precomputed:
+            # The routing table is rebuilt only when recipients or departments change
+            routing = None
+            if not injected:
+                routing = get_routing_table(recipients, departments, horizon_days, get_data_version("email_recipients", "departments"))
+            payload = build_reminder_payload(members, recipients, dept_mapping, today, horizon_days, time_of_day, channels, routing, engine)
+
+        windows, routes = payload['windows'], payload['routes']
+        if not windows:
+            return f"No upcoming birthdays in the next {horizon_days} days", True
+
+        results = [channels[name].send(notifications) for name, notifications in routes.items() if notifications]
+        summary = ", ".join(f"{len(windows[d])} {window_label(d)}" for d in sorted(windows, reverse=True))
+        status = "; ".join(_channel_status(result) for result in results) or "nothing to send"
+        source = " from the precomputed payload" if precomputed else ""
+        return f"Birthday reminders sent for: {summary} ({status}){source}", all(r['failed'] == 0 for r in results)
             
     except Exception as e:
-        return f"Error checking birthdays: {str(e)}", False 
\ No newline at end of file
+        return f"Error checking birthdays: {str(e)}", False
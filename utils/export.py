@@ -0,0 +1,198 @@
+import csv
+import hashlib
+import os
+import tempfile
+import time
+import xlsxwriter
+import streamlit as st
+from utils.database import (
+    get_data_version_scope,
+    get_departments,
+    get_contribution_defaulters,
+    get_defaulters_by_department,
+    iter_contributions,
+    iter_youth_members
+)
+
+# Generated files are kept on disk and reused until the data changes, for
+# at most EXPORT_TTL_SECONDS so edits made outside the app still show up
+EXPORT_DIR = os.path.join(tempfile.gettempdir(), "birthday_management_exports")
+MAX_EXPORT_FILES = 32
+EXPORT_TTL_SECONDS = 15 * 60
+# Temporary files this old belong to an export that died part way
+STALE_TMP_SECONDS = 60 * 60
+
+XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+CSV_MIME = "text/csv"
+
+CONTRIBUTION_HEADERS = ['Member', 'Amount (GH₵)', 'Type', 'Date', 'Week']
+MEMBER_HEADERS = ['Name', 'Birthday', 'Department', 'Phone', 'Email']
+DEFAULTER_HEADERS = ['Name', 'Department', 'Phone', 'Email']
+DEPARTMENT_HEADERS = ['Department', 'Members', 'Defaulters', 'Compliance (%)', 'Contributions', 'Amount (GH₵)']
+
+def write_xlsx(path, sheets):
+    """Write (name, headers, batches) sheets to an XLSX file one row at a time
+
+    constant_memory mode flushes each row to disk as soon as the next one
+    starts, so memory use doesn't grow with the number of rows.
+    """
+    workbook = xlsxwriter.Workbook(path, {'constant_memory': True})
+    try:
+        header_format = workbook.add_format({'bold': True, 'bg_color': '#F2F2F2'})
+        for name, headers, batches in sheets:
+            worksheet = workbook.add_worksheet(name)
+            worksheet.set_column(0, len(headers) - 1, 18)
+            worksheet.write_row(0, 0, headers, header_format)
+            row_number = 1
+            for batch in batches:
+                for row in batch:
+                    worksheet.write_row(row_number, 0, row)
+                    row_number += 1
+    finally:
+        workbook.close()
+
+def write_csv(path, headers, batches):
+    """Write batches of rows to a CSV file, one batch at a time"""
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(headers)
+        for batch in batches:
+            writer.writerows(batch)
+
+def _age(path):
+    try:
+        return time.time() - os.path.getmtime(path)
+    except OSError:
+        return None
+
+def _prune_exports():
+    """Delete expired files, abandoned temporary files and the oldest files beyond MAX_EXPORT_FILES"""
+    kept = []
+    for name in os.listdir(EXPORT_DIR):
+        path = os.path.join(EXPORT_DIR, name)
+        age = _age(path)
+        if age is None:
+            continue
+        if name.endswith(".tmp"):
+            expired = age > STALE_TMP_SECONDS
+        else:
+            expired = age > EXPORT_TTL_SECONDS
+            kept.append((age, path))
+        if expired:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+    kept.sort()
+    for _, path in kept[MAX_EXPORT_FILES:]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+def cached_export(report_id, data_version, filters, suffix, write):
+    """Get the path of a generated file, calling write(path) only on a miss
+
+    Data versions only identify the data within their scope (the shared
+    tier, or this process), so the scope is part of the key.
+    """
+    key = repr((report_id, get_data_version_scope(), tuple(data_version), tuple(filters)))
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+    path = os.path.join(EXPORT_DIR, f"{report_id}-{digest}{suffix}")
+    age = _age(path)
+    if age is not None and age < EXPORT_TTL_SECONDS:
+        return path
+
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+    # Write to a temporary name so a failed or concurrent export never
+    # leaves a partial file behind under the cached name
+    fd, tmp_path = tempfile.mkstemp(dir=EXPORT_DIR, suffix=".tmp")
+    os.close(fd)
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    _prune_exports()
+    return path
+
+def download_export(label, path, file_name, mime, key=None):
+    """Offer a generated file for download"""
+    with open(path, "rb") as f:
+        st.download_button(label=label, data=f, file_name=file_name, mime=mime, key=key)
+
+def contribution_rows(batches):
+    """Format contribution batches as Member, Amount, Type, Date, Week rows"""
+    for batch in batches:
+        yield [
+            [
+                c['youth_members']['full_name'],
+                c['amount'],
+                c['contribution_type'],
+                c['payment_date'],
+                c.get('week_number')
+            ]
+            for c in batch
+        ]
+
+def member_rows(batches, department_names):
+    """Format member batches as Name, Birthday, Department, Phone, Email rows"""
+    for batch in batches:
+        yield [
+            [
+                m['full_name'],
+                m['birthday'],
+                department_names.get(m.get('department_id'), 'No Department'),
+                m.get('phone_number'),
+                m.get('email')
+            ]
+            for m in batch
+        ]
+
+def write_members_csv(path, department_id=None):
+    """Stream every youth member into a CSV file"""
+    department_names = {d['id']: d['name'] for d in get_departments()}
+    write_csv(path, MEMBER_HEADERS, member_rows(iter_youth_members(department_id=department_id), department_names))
+
+def write_contributions_report(path, contribution_type, start_date, end_date, month, year):
+    """Write the contributions, defaulters and department summary sheets
+
+    Department totals are accumulated while the contributions stream past,
+    so the rows are only read once.
+    """
+    department_names = {d['id']: d['name'] for d in get_departments()}
+    # Defaulters are tracked per type; fall back to birthday dues for "All"
+    defaulter_type = contribution_type if contribution_type != "All" else "BIRTHDAY"
+    totals = {}
+
+    def contributions():
+        for batch in iter_contributions(
+            contribution_type=contribution_type, start_date=start_date, end_date=end_date
+        ):
+            for c in batch:
+                name = department_names.get(c['youth_members'].get('department_id'), 'No Department')
+                count, amount = totals.get(name, (0, 0.0))
+                totals[name] = (count + 1, amount + float(c['amount'] or 0))
+            yield from contribution_rows([batch])
+
+    def defaulters():
+        yield [
+            [d['full_name'], d['department_name'], d.get('phone_number'), d.get('email')]
+            for d in get_contribution_defaulters(month, year, defaulter_type)
+        ]
+
+    def department_summary():
+        rows = []
+        for d in get_defaulters_by_department(month, year, defaulter_type):
+            members = d['member_count']
+            compliance = round((members - d['defaulter_count']) / members * 100, 1) if members else 0
+            count, amount = totals.get(d['department_name'], (0, 0.0))
+            rows.append([d['department_name'], members, d['defaulter_count'], compliance, count, amount])
+        yield rows
+
+    write_xlsx(path, [
+        ("Contributions", CONTRIBUTION_HEADERS, contributions()),
+        ("Defaulters", DEFAULTER_HEADERS, defaulters()),
+        ("Department Summary", DEPARTMENT_HEADERS, department_summary())
+    ])
@@ -0,0 +1,73 @@
+import heapq
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from datetime import date
+import streamlit as st
+
+def _day(value):
+    """Get the ordinal day of a payment date string, date or datetime"""
+    if hasattr(value, 'toordinal'):
+        return value.toordinal()
+    return date.fromisoformat(str(value)[:10]).toordinal()
+
+class ContributionLedger:
+    """Per-member contributions sorted by date with running totals
+
+    Each member has one ledger per contribution type plus one across all
+    types. Range totals are the difference of two prefix sums found by
+    bisecting the sorted dates, so any query is O(log n) per member.
+    """
+
+    def __init__(self, contributions):
+        entries = defaultdict(list)
+        self.member_names = {}
+        for c in contributions:
+            if not c.get('payment_date'):
+                continue
+            member_id = c['member_id']
+            entry = (_day(c['payment_date']), float(c['amount'] or 0))
+            entries[(member_id, None)].append(entry)
+            entries[(member_id, c.get('contribution_type'))].append(entry)
+            if c.get('youth_members'):
+                self.member_names[member_id] = c['youth_members']['full_name']
+            else:
+                self.member_names.setdefault(member_id, 'Unknown')
+
+        self._days = {}
+        self._totals = {}
+        for key, rows in entries.items():
+            rows.sort()
+            running = [0.0]
+            for _, amount in rows:
+                running.append(running[-1] + amount)
+            self._days[key] = [day for day, _ in rows]
+            self._totals[key] = running
+
+    def summary(self, member_id, contribution_type=None, start=None, end=None):
+        """Get a member's total, count and average between two dates, inclusive"""
+        key = (member_id, contribution_type)
+        days = self._days.get(key)
+        if not days:
+            return {'total': 0.0, 'count': 0, 'average': 0.0}
+        lo = bisect_left(days, _day(start)) if start else 0
+        hi = bisect_right(days, _day(end)) if end else len(days)
+        count = max(hi - lo, 0)
+        total = self._totals[key][hi] - self._totals[key][lo] if count else 0.0
+        return {'total': total, 'count': count, 'average': total / count if count else 0.0}
+
+    def top_contributors(self, n=5, contribution_type=None, start=None, end=None):
+        """Get the n members with the largest totals between two dates"""
+        totals = (
+            (self.summary(member_id, contribution_type, start, end)['total'], member_id)
+            for member_id in self.member_names
+        )
+        return [
+            {'member_id': member_id, 'full_name': self.member_names[member_id], 'total': total}
+            for total, member_id in heapq.nlargest(n, totals)
+            if total > 0
+        ]
+
+@st.cache_resource(ttl=300, max_entries=4, show_spinner=False)
+def get_contribution_ledger(_contributions, version):
+    """Get the ledger for the cached contribution list at a data version"""
+    return ContributionLedger(_contributions or [])
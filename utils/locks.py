@@ -0,0 +1,180 @@
+import json
+import os
+import socket
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from utils.database import acquire_scheduler_lease, release_scheduler_lease
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# A holder that stops renewing (say it crashed) loses its lease after this long
+LEASE_SECONDS = 120
+
+class DatabaseLeases:
+    """Leases in the scheduler_leases table, shared by every replica and the workflow
+
+    A lock table rather than advisory locks: PostgREST pools connections,
+    so a session-level lock can't be held from one call to the next.
+    """
+    name = "database"
+
+    def acquire(self, name, holder, ttl):
+        return acquire_scheduler_lease(name, holder, ttl)
+
+    def release(self, name, holder):
+        release_scheduler_lease(name, holder)
+
+class FileLeases:
+    """Leases as JSON files in a directory, shared by the processes on one host"""
+    name = "file"
+
+    def __init__(self, directory=None):
+        self.directory = directory or os.path.join(tempfile.gettempdir(), "birthday_management_leases")
+        os.makedirs(self.directory, exist_ok=True)
+
+    @contextmanager
+    def _guard(self):
+        # Every read-modify-write of a lease file happens under one lock file
+        with open(os.path.join(self.directory, ".guard"), "a+") as guard:
+            if fcntl:
+                fcntl.flock(guard, fcntl.LOCK_EX)
+            else:
+                guard.seek(0)
+                msvcrt.locking(guard.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(guard, fcntl.LOCK_UN)
+                else:
+                    guard.seek(0)
+                    msvcrt.locking(guard.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def _path(self, name):
+        return os.path.join(self.directory, "".join(c if c.isalnum() or c in "-_" else "_" for c in name) + ".json")
+
+    def acquire(self, name, holder, ttl):
+        path = self._path(name)
+        with self._guard():
+            try:
+                with open(path) as f:
+                    lease = json.load(f)
+                if lease['holder'] != holder and lease['expires_at'] > time.time():
+                    return False
+            except (OSError, ValueError, KeyError):
+                pass
+            with open(path, "w") as f:
+                json.dump({'holder': holder, 'expires_at': time.time() + ttl}, f)
+            return True
+
+    def release(self, name, holder):
+        path = self._path(name)
+        with self._guard():
+            try:
+                with open(path) as f:
+                    if json.load(f)['holder'] != holder:
+                        return
+                os.remove(path)
+            except (OSError, ValueError, KeyError):
+                pass
+
+class FallbackLeases:
+    """Use the primary store, falling back to the secondary while the primary errors"""
+
+    def __init__(self, primary, fallback):
+        self.primary = primary
+        self.fallback = fallback
+        self.name = f"{primary.name} (falls back to {fallback.name})"
+
+    def acquire(self, name, holder, ttl):
+        try:
+            return self.primary.acquire(name, holder, ttl)
+        except Exception as e:
+            print(f"Lease store unavailable, using {self.fallback.name} leases: {str(e)}")
+            return self.fallback.acquire(name, holder, ttl)
+
+    def release(self, name, holder):
+        try:
+            self.primary.release(name, holder)
+        except Exception:
+            pass
+        self.fallback.release(name, holder)
+
+class Lease:
+    """One holder's claim on a named lease, renewed by a heartbeat thread while held
+
+    If the store can't be reached at all the lease counts as acquired, so
+    reminders still go out, at the risk of a duplicate.
+    """
+
+    def __init__(self, store, name, ttl=LEASE_SECONDS):
+        self.store = store
+        self.name = name
+        self.ttl = ttl
+        self.holder = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.acquired = False
+        self.lost = False
+        self._stop = threading.Event()
+        self._heartbeat = None
+
+    def _renew(self):
+        try:
+            return self.store.acquire(self.name, self.holder, self.ttl)
+        except Exception as e:
+            print(f"Error taking lease {self.name}: {str(e)}")
+            return True
+
+    def _beat(self):
+        while not self._stop.wait(self.ttl / 3):
+            if not self._renew():
+                # Someone else took it after we stalled past the ttl
+                print(f"Lost lease {self.name}")
+                self.lost = True
+                return
+
+    def acquire(self):
+        """Take the lease if it's free or expired and start renewing it"""
+        self.acquired = self._renew()
+        if self.acquired:
+            self._heartbeat = threading.Thread(target=self._beat, name=f"lease:{self.name}", daemon=True)
+            self._heartbeat.start()
+        return self.acquired
+
+    def release(self):
+        """Stop renewing and free the lease for the next holder"""
+        self._stop.set()
+        if self.acquired:
+            try:
+                self.store.release(self.name, self.holder)
+            except Exception as e:
+                print(f"Error releasing lease {self.name}: {str(e)}")
+            self.acquired = False
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_lease_store():
+    """Get the process-wide lease store: the database, with local files as fallback"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = FallbackLeases(DatabaseLeases(), FileLeases())
+        return _store
+
+def hold_lease(name, ttl=LEASE_SECONDS, store=None):
+    """Get a Lease to use in a with block; check .acquired before doing the work"""
+    return Lease(store or get_lease_store(), name, ttl)
@@ -0,0 +1,220 @@
+import queue
+import random
+import smtplib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+def is_transient(error):
+    """Whether a send error is worth retrying: 4xx replies, dropped connections and network errors"""
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 400 <= error.smtp_code < 500
+    if isinstance(error, smtplib.SMTPServerDisconnected):
+        return True
+    # Every other SMTPException is also an OSError, but is a permanent refusal
+    return isinstance(error, OSError) and not isinstance(error, smtplib.SMTPException)
+
+def build_messages(sender, recipients, subject, body, text_body=None, mode="individual", batch_size=50):
+    """Build (message, envelope recipients) pairs for one email
+
+    "individual" sends each recipient their own copy; "bcc" sends copies
+    to batches of up to batch_size hidden recipients, so no address is
+    ever shown to another recipient either way.
+    """
+    if mode == "bcc":
+        batches = [recipients[i:i + batch_size] for i in range(0, len(recipients), batch_size)]
+    else:
+        batches = [[recipient] for recipient in recipients]
+
+    messages = []
+    for batch in batches:
+        message = MIMEMultipart("alternative" if text_body else "mixed")
+        message["From"] = sender
+        # BCC batches are addressed to the sender; the envelope carries the recipients
+        message["To"] = batch[0] if mode != "bcc" else sender
+        message["Subject"] = subject
+        # Clients show the last alternative they support, so HTML goes last
+        if text_body:
+            message.attach(MIMEText(text_body, "plain"))
+        message.attach(MIMEText(body, "html"))
+        messages.append((message, batch))
+    return messages
+
+class TokenBucket:
+    """Thread-safe token bucket allowing rate sends per second with bursts up to capacity"""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available, then take it"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+class SMTPPool:
+    """A few logged-in SMTP sessions shared by the dispatch workers"""
+
+    def __init__(self, connect, size):
+        self.connect = connect
+        self.size = size
+        self.opened = 0
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take an idle session, opening one if under the size limit, else wait"""
+        while True:
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                pass
+            with self._lock:
+                can_open = self.opened < self.size
+                if can_open:
+                    self.opened += 1
+            if can_open:
+                try:
+                    return self.connect()
+                except Exception:
+                    with self._lock:
+                        self.opened -= 1
+                    raise
+            # Poll rather than block, so a slot freed by a failed connect is noticed
+            try:
+                return self._idle.get(timeout=0.05)
+            except queue.Empty:
+                continue
+
+    def release(self, session):
+        """Return a healthy session to the pool"""
+        self._idle.put(session)
+
+    def discard(self, session):
+        """Close a broken session so the next acquire opens a fresh one"""
+        with self._lock:
+            self.opened -= 1
+        try:
+            session.close()
+        except Exception:
+            pass
+
+    def close(self):
+        """Log out of every idle session"""
+        while True:
+            try:
+                session = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            with self._lock:
+                self.opened -= 1
+            try:
+                session.quit()
+            except Exception:
+                pass
+
+class DispatchResult:
+    """Counts and timings from one dispatch run"""
+
+    def __init__(self):
+        self.sent = 0
+        self.failed = 0
+        self.retries = 0
+        self.delivered_recipients = 0
+        self.failures = []
+        # (message, recipients, error, transient) for every send that gave up
+        self.failed_messages = []
+        self.elapsed = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def throughput(self):
+        return self.sent / self.elapsed if self.elapsed > 0 else 0.0
+
+    def summary(self):
+        """Get the metrics as a plain dict"""
+        return {
+            "sent": self.sent,
+            "failed": self.failed,
+            "retries": self.retries,
+            "recipients": self.delivered_recipients,
+            "elapsed_seconds": round(self.elapsed, 3),
+            "messages_per_second": round(self.throughput, 2)
+        }
+
+class Dispatcher:
+    """Send messages through a bounded worker pool over pooled SMTP sessions
+
+    Every send waits on a shared token bucket, and transient failures are
+    retried with exponential backoff and jitter on a fresh session.
+    """
+
+    def __init__(self, connect, max_workers=4, sessions=2, rate_per_second=5.0, burst=None,
+                 max_retries=3, backoff_seconds=1.0, sleep=time.sleep):
+        self.connect = connect
+        self.max_workers = max_workers
+        self.sessions = sessions
+        self.bucket = TokenBucket(rate_per_second, burst)
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.sleep = sleep
+
+    def _send_one(self, pool, message, recipients, result):
+        for attempt in range(self.max_retries + 1):
+            self.bucket.acquire()
+            session = None
+            try:
+                session = pool.acquire()
+                refused = session.send_message(message, to_addrs=recipients) or {}
+                pool.release(session)
+                with result._lock:
+                    result.sent += 1
+                    result.delivered_recipients += len(recipients) - len(refused)
+                    if refused:
+                        result.failures.append((list(refused), "Recipient refused"))
+                        result.failed_messages.append((message, list(refused), "Recipient refused", False))
+                return
+            except Exception as e:
+                if session is not None:
+                    # Refusals leave the session usable; anything else may not
+                    if isinstance(e, smtplib.SMTPRecipientsRefused):
+                        pool.release(session)
+                    else:
+                        pool.discard(session)
+                if attempt < self.max_retries and is_transient(e):
+                    with result._lock:
+                        result.retries += 1
+                    self.sleep(self.backoff_seconds * (2 ** attempt) * (0.5 + random.random() / 2))
+                    continue
+                with result._lock:
+                    result.failed += 1
+                    result.failures.append((recipients, str(e)))
+                    result.failed_messages.append((message, recipients, str(e), is_transient(e)))
+                return
+
+    def send(self, messages):
+        """Send (message, recipients) pairs concurrently and return the run's metrics"""
+        result = DispatchResult()
+        pool = SMTPPool(self.connect, self.sessions)
+        started = time.monotonic()
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                for message, recipients in messages:
+                    executor.submit(self._send_one, pool, message, recipients, result)
+        finally:
+            pool.close()
+            result.elapsed = time.monotonic() - started
+        return result
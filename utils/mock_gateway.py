@@ -0,0 +1,92 @@
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+class _GatewayHandler(BaseHTTPRequestHandler):
+    """Accept JSON POSTs on any path, as the SMS gateway or a webhook receiver"""
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        status, reply = self.server.gateway.receive(self.path, dict(self.headers), body)
+        data = json.dumps(reply).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+class MockGateway:
+    """Local stand-in for the bulk SMS gateway and webhook receivers
+
+    Every request is recorded. Numbers that aren't 9-15 digits are reported
+    as failed, and latency seconds and a fail_rate of 503 replies can be
+    injected to exercise the channel drivers.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, fail_rate=0.0, seed=None):
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.requests = []
+        self.messages_received = 0
+        self.rejected = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), _GatewayHandler)
+        self._server.daemon_threads = True
+        self._server.gateway = self
+        self.host, self.port = self._server.server_address[:2]
+        self.url = f"http://{self.host}:{self.port}"
+
+    def receive(self, path, headers, body):
+        """Record one request and return the (status, reply) to send back"""
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            if self._random.random() < self.fail_rate:
+                return 503, {'error': "Injected gateway failure"}
+            try:
+                payload = json.loads(body or b"{}")
+            except ValueError:
+                return 400, {'error': "Body is not JSON"}
+            self.requests.append({'path': path, 'headers': headers, 'payload': payload})
+            failed = []
+            for message in payload.get('messages', []) if isinstance(payload, dict) else []:
+                for number in message.get('to', []):
+                    if re.fullmatch(r"\+?\d{9,15}", number):
+                        self.messages_received += 1
+                    else:
+                        failed.append(number)
+            self.rejected += len(failed)
+            return 200, {'accepted': True, 'failed': failed}
+
+    def start(self):
+        """Serve in a background thread"""
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        """Stop serving and release the port"""
+        self._server.shutdown()
+        self._server.server_close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a local mock SMS gateway and webhook receiver")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8030)
+    args = parser.parse_args()
+
+    gateway = MockGateway(args.host, args.port).start()
+    print(f"Mock gateway listening on {gateway.url}")
+    try:
+        while True:
+            time.sleep(5)
+            print(f"{len(gateway.requests)} requests, {gateway.messages_received} SMS accepted, {gateway.rejected} rejected")
+    except KeyboardInterrupt:
+        gateway.stop()
@@ -0,0 +1,113 @@
+import argparse
+import email
+import random
+from datetime import datetime, timedelta, timezone
+from utils.database import (
+    add_notification_retry,
+    get_due_notification_retries,
+    get_notification_retries,
+    reschedule_notification_retry,
+    delete_notification_retry,
+    add_dead_letter,
+    get_dead_letters,
+    delete_dead_letter
+)
+
+# Failed sends are retried after 5 minutes, then 10, 20, ... up to 6 hours apart
+RETRY_BASE_SECONDS = 5 * 60
+RETRY_MAX_SECONDS = 6 * 60 * 60
+MAX_ATTEMPTS = 5
+
+def next_attempt_at(attempts, now):
+    """When to try again after the given number of failed attempts, with jitter"""
+    delay = min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+    return now + timedelta(seconds=delay * (0.5 + random.random() / 2))
+
+def queue_failures(result, max_attempts=MAX_ATTEMPTS, now=None):
+    """Persist a dispatch run's failed messages and return the (queued, dead_lettered) recipient lists
+
+    Temporary failures go to the retry queue; permanent ones, such as a
+    refused address, go straight to the dead letters.
+    """
+    now = now or datetime.now(timezone.utc)
+    queued, dead_lettered = [], []
+    for message, recipients, error, transient in result.failed_messages:
+        if transient and max_attempts > 1:
+            stored = add_notification_retry(
+                recipients, message['Subject'], message.as_string(), 1, error, next_attempt_at(1, now)
+            )
+            if stored:
+                queued.extend(recipients)
+        else:
+            stored = add_dead_letter(recipients, message['Subject'], message.as_string(), 1, error)
+            if stored:
+                dead_lettered.extend(recipients)
+        if not stored:
+            print(f"Notification to {', '.join(recipients)} could not be saved for retry: {error}")
+    return queued, dead_lettered
+
+def drain_retries(dispatcher, max_attempts=MAX_ATTEMPTS, now=None, limit=100):
+    """Send every queued notification that is due and return counts of sent, retrying and dead-lettered"""
+    now = now or datetime.now(timezone.utc)
+    summary = {'sent': 0, 'retrying': 0, 'dead_lettered': 0}
+    due = get_due_notification_retries(now, limit)
+    if not due:
+        return summary
+
+    messages = [(email.message_from_string(row['message']), row['recipients']) for row in due]
+    result = dispatcher.send(messages)
+    failed = {id(message): (recipients, error, transient) for message, recipients, error, transient in result.failed_messages}
+
+    for (message, _), row in zip(messages, due):
+        failure = failed.get(id(message))
+        try:
+            if failure is None:
+                delete_notification_retry(row['id'])
+                summary['sent'] += 1
+                continue
+            recipients, error, transient = failure
+            attempts = row['attempts'] + 1
+            if transient and attempts < max_attempts:
+                reschedule_notification_retry(row['id'], attempts, error, next_attempt_at(attempts, now))
+                summary['retrying'] += 1
+            elif add_dead_letter(recipients, row['subject'], row['message'], attempts, error):
+                delete_notification_retry(row['id'])
+                summary['dead_lettered'] += 1
+        except Exception as e:
+            # The row stays queued and is picked up by the next drain
+            print(f"Error updating notification retry {row['id']}: {str(e)}")
+    return summary
+
+def replay_dead_letters(dead_letter_ids=None, now=None):
+    """Move dead letters, or just the given ones, back onto the retry queue to be sent now"""
+    now = now or datetime.now(timezone.utc)
+    replayed = 0
+    for row in get_dead_letters(dead_letter_ids):
+        # Replayed notifications get the full number of attempts again
+        if add_notification_retry(row['recipients'], row['subject'], row['message'], 0, row['last_error'], now):
+            delete_dead_letter(row['id'])
+            replayed += 1
+    return replayed
+
+if __name__ == "__main__":
+    from utils.email_service import retry_failed_notifications
+
+    parser = argparse.ArgumentParser(description="Inspect and replay failed birthday notifications")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list", help="Show queued retries and dead letters")
+    commands.add_parser("drain", help="Send every queued retry that is due")
+    replay = commands.add_parser("replay", help="Requeue dead letters and send them now")
+    replay.add_argument("ids", nargs="*", type=int, help="Dead letter ids (default: all)")
+    args = parser.parse_args()
+
+    if args.command == "list":
+        for row in get_notification_retries():
+            print(f"retry #{row['id']}: {row['subject']} to {', '.join(row['recipients'])}, "
+                  f"attempt {row['attempts']}, next at {row['next_attempt_at']} ({row['last_error']})")
+        for row in get_dead_letters():
+            print(f"dead letter #{row['id']}: {row['subject']} to {', '.join(row['recipients'])}, "
+                  f"{row['attempts']} attempts, failed at {row['failed_at']} ({row['last_error']})")
+    else:
+        if args.command == "replay":
+            print(f"Requeued {replay_dead_letters(args.ids or None)} dead letters")
+        print(retry_failed_notifications())
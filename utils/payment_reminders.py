@@ -0,0 +1,156 @@
+import threading
+from datetime import date, datetime
+from utils.database import get_payment_reminder_targets, record_payment_reminders
+from utils.locks import hold_lease
+from utils.templates import PAYMENT_REMINDER_HTML, PAYMENT_REMINDER_TEXT, PAYMENT_REMINDER_SMS
+
+BATCH_SIZE = 200
+
+def render_payment_reminders(members, contribution_type, period):
+    """Render every member's reminders in one pass as email and SMS channel notifications"""
+    subject = f"💰 {contribution_type.title()} Contribution Reminder - {period}"
+    sent_on = datetime.now().strftime("%B %d, %Y")
+    routes = {'email': [], 'sms': []}
+    for member in members:
+        values = {
+            'name': member['full_name'],
+            'contribution_type': contribution_type.lower(),
+            'period': period,
+            'department': member.get('department_name') or 'No Department'
+        }
+        if member.get('email'):
+            routes['email'].append({
+                'to': [member['email']],
+                'subject': subject,
+                'html': PAYMENT_REMINDER_HTML.render(sent_on=sent_on, **values),
+                'text': PAYMENT_REMINDER_TEXT.render(**values),
+                'member_id': member['id']
+            })
+        if member.get('phone_number'):
+            routes['sms'].append({
+                'to': [member['phone_number']],
+                'subject': subject,
+                'text': PAYMENT_REMINDER_SMS.render(**values),
+                'member_id': member['id']
+            })
+    return routes
+
+class PaymentReminderJob:
+    """One background run reminding a cycle's defaulters, with progress the page can poll
+
+    A cycle is a contribution type in a month. Members reminded in a
+    cycle are recorded batch by batch, so a rerun, or a run after a
+    crash, only reaches the ones still left.
+    """
+
+    def __init__(self, month, year, contribution_type, channels, batch_size=BATCH_SIZE):
+        self.month = month
+        self.year = year
+        self.contribution_type = contribution_type
+        self.channels = channels
+        self.batch_size = batch_size
+        self.status = "starting"
+        self.error = None
+        self.total = 0
+        self.processed = 0
+        self.reminded = 0
+        self.no_contact = 0
+        self.sent = 0
+        self.failed = 0
+        self.started_at = None
+        self.finished_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def done(self):
+        return self.status in ("finished", "failed")
+
+    def progress(self):
+        """Get a consistent snapshot of the run's counts and throughput"""
+        with self._lock:
+            elapsed = ((self.finished_at or datetime.now()) - self.started_at).total_seconds() if self.started_at else 0.0
+            return {
+                'status': self.status,
+                'error': self.error,
+                'total': self.total,
+                'processed': self.processed,
+                'reminded': self.reminded,
+                'no_contact': self.no_contact,
+                'sent': self.sent,
+                'failed': self.failed,
+                'fraction': self.processed / self.total if self.total else (1.0 if self.done else 0.0),
+                'elapsed_seconds': round(elapsed, 1),
+                'messages_per_second': round(self.sent / elapsed, 2) if elapsed > 0 else 0.0
+            }
+
+    def _send_batch(self, members, period):
+        """Send one batch on every channel and return {member_id: [channels that reached them]}"""
+        reached = {}
+        for name, notifications in render_payment_reminders(members, self.contribution_type, period).items():
+            channel = self.channels.get(name)
+            if channel is None or not notifications:
+                continue
+            result = channel.send(notifications)
+            # Failures saved to the retry queue will still be delivered
+            failed = {a for recipients, _ in result['failures'] for a in recipients} - set(result.get('retrying', []))
+            normalize = getattr(channel, "normalize", lambda address: address)
+            for notification in notifications:
+                if not any(normalize(address) in failed for address in notification['to']):
+                    reached.setdefault(notification['member_id'], []).append(name)
+            with self._lock:
+                self.sent += result['sent']
+                self.failed += result['failed']
+        return reached
+
+    def run(self):
+        """Find the cycle's unreminded defaulters and remind them batch by batch"""
+        with self._lock:
+            self.status = "running"
+            self.started_at = datetime.now()
+        try:
+            # Other replicas serve the same cycle; only one of them sends it at a time
+            with hold_lease(f"payment_reminders:{self.contribution_type}:{self.year}:{self.month}") as lease:
+                if not lease.acquired:
+                    raise RuntimeError("These reminders are already being sent from another server")
+                period = date(self.year, self.month, 1).strftime("%B %Y")
+                members = get_payment_reminder_targets(self.month, self.year, self.contribution_type)
+                with self._lock:
+                    self.total = len(members)
+
+                for start in range(0, len(members), self.batch_size):
+                    batch = members[start:start + self.batch_size]
+                    reached = self._send_batch(batch, period)
+                    record_payment_reminders(reached, self.month, self.year, self.contribution_type)
+                    with self._lock:
+                        self.processed += len(batch)
+                        self.reminded += len(reached)
+                        self.no_contact += sum(1 for m in batch if not (m.get('email') or m.get('phone_number')))
+
+            with self._lock:
+                self.status = "finished"
+        except Exception as e:
+            print(f"Error sending payment reminders: {str(e)}")
+            with self._lock:
+                self.status = "failed"
+                self.error = str(e)
+        finally:
+            with self._lock:
+                self.finished_at = datetime.now()
+
+# The latest run per cycle, shared by every session of the app
+_jobs = {}
+_jobs_lock = threading.Lock()
+
+def start_payment_reminders(month, year, contribution_type, channels):
+    """Start reminding the cycle's defaulters in the background, or return the run already in progress"""
+    cycle = (contribution_type, year, month)
+    with _jobs_lock:
+        job = _jobs.get(cycle)
+        if job is None or job.done:
+            job = _jobs[cycle] = PaymentReminderJob(month, year, contribution_type, channels)
+            threading.Thread(target=job.run, daemon=True).start()
+        return job
+
+def get_payment_reminder_job(month, year, contribution_type):
+    """Get the latest reminder run for a cycle in this process, if any"""
+    return _jobs.get((contribution_type, year, month))
@@ -0,0 +1,147 @@
+# Kept free of Streamlit and database imports so report worker processes
+# start quickly and only ever see the precomputed rollup they are given
+import io
+from xml.sax.saxutils import escape
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib.units import cm
+from reportlab.graphics.shapes import Drawing, String
+from reportlab.graphics.charts.barcharts import VerticalBarChart
+from reportlab.graphics.charts.piecharts import Pie
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+
+# Same palette as the contribution tracker
+CUSTOM_COLORS = ['#F13C59', '#BE61CA', '#633EBB']
+CHART_WIDTH = 16 * cm
+CHART_HEIGHT = 6 * cm
+
+def _money(amount):
+    # The built-in PDF fonts have no cedi sign
+    return f"GHS {amount:,.2f}"
+
+def _table(headers, rows, col_widths=None):
+    table = Table([headers] + rows, colWidths=col_widths, repeatRows=1)
+    table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#633EBB')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 9),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#F4F0FB')]),
+        ('GRID', (0, 0), (-1, -1), 0.25, colors.HexColor('#D9D9D9')),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE')
+    ]))
+    return table
+
+def _bar_chart(title, labels, values, color):
+    """Draw a bar chart as a vector drawing"""
+    drawing = Drawing(CHART_WIDTH, CHART_HEIGHT)
+    drawing.add(String(0, CHART_HEIGHT - 12, title, fontName='Helvetica-Bold', fontSize=10))
+    chart = VerticalBarChart()
+    chart.x, chart.y = 30, 30
+    chart.width, chart.height = CHART_WIDTH - 40, CHART_HEIGHT - 60
+    chart.data = [list(values) or [0]]
+    chart.categoryAxis.categoryNames = [str(label) for label in labels] or ['']
+    chart.categoryAxis.labels.fontName = chart.valueAxis.labels.fontName = 'Helvetica'
+    chart.categoryAxis.labels.fontSize = chart.valueAxis.labels.fontSize = 7
+    chart.valueAxis.valueMin = 0
+    chart.bars[0].fillColor = colors.HexColor(color)
+    chart.bars[0].strokeColor = None
+    drawing.add(chart)
+    return drawing
+
+def _pie_chart(title, totals):
+    """Draw a pie chart of totals by label as a vector drawing"""
+    drawing = Drawing(CHART_WIDTH, CHART_HEIGHT)
+    drawing.add(String(0, CHART_HEIGHT - 12, title, fontName='Helvetica-Bold', fontSize=10))
+    pie = Pie()
+    pie.x, pie.y = CHART_WIDTH / 2 - 60, 10
+    pie.width = pie.height = CHART_HEIGHT - 40
+    pie.data = list(totals.values())
+    pie.labels = [f"{label} ({value / sum(totals.values()) * 100:.0f}%)" for label, value in totals.items()]
+    pie.slices.strokeColor = colors.white
+    pie.slices.fontName = 'Helvetica'
+    pie.slices.fontSize = 8
+    for i in range(len(pie.data)):
+        pie.slices[i].fillColor = colors.HexColor(CUSTOM_COLORS[i % len(CUSTOM_COLORS)])
+    drawing.add(pie)
+    return drawing
+
+def render_report_pdf(rollup, department=None):
+    """Render the monthly report for one department, or all of them, to PDF bytes"""
+    section = rollup['overall'] if department is None else rollup['departments'][department]
+    styles = getSampleStyleSheet()
+    styles['Heading2'].keepWithNext = 1
+    output = io.BytesIO()
+    doc = SimpleDocTemplate(
+        output, pagesize=A4,
+        leftMargin=2 * cm, rightMargin=2 * cm, topMargin=1.5 * cm, bottomMargin=1.5 * cm,
+        title=f"Contribution Report {rollup['period']}"
+    )
+
+    story = [
+        Paragraph(f"Monthly Contribution Report - {escape(department or 'All Departments')}", styles['Title']),
+        Paragraph(
+            f"{rollup['period']} &middot; {rollup['contribution_type'].title()} contributions "
+            f"&middot; generated {rollup['generated_at']}",
+            styles['Normal']
+        ),
+        Spacer(1, 0.5 * cm)
+    ]
+
+    # Summary
+    members = section['members']
+    compliance = (members - section['defaulters']) / members * 100 if members else 0
+    story.append(_table(['Measure', 'Value'], [
+        ['Total Collected', _money(section['total'])],
+        ['Contributions', f"{section['count']:,}"],
+        ['Contributors', f"{section['contributors']:,}"],
+        ['Members', f"{members:,}"],
+        [f"{rollup['defaulter_type'].title()} Defaulters", f"{section['defaulters']:,}"],
+        ['Compliance Rate', f"{compliance:.1f}%"]
+    ], col_widths=[8 * cm, 8 * cm]))
+    story.append(Spacer(1, 0.5 * cm))
+
+    # Charts
+    story.append(_bar_chart(
+        'Daily Contributions (GHS)', range(1, len(section['by_day']) + 1), section['by_day'], '#633EBB'
+    ))
+    if section['by_type']:
+        story.append(_pie_chart('Contributions by Type', section['by_type']))
+    if department is None and rollup['departments']:
+        names = sorted(rollup['departments'])
+        story.append(_bar_chart(
+            'Total Contributions by Department (GHS)',
+            names, [rollup['departments'][name]['total'] for name in names], '#BE61CA'
+        ))
+        story.append(Paragraph("Department Summary", styles['Heading2']))
+        story.append(_table(
+            ['Department', 'Members', 'Defaulters', 'Contributions', 'Amount'],
+            [
+                [
+                    name,
+                    rollup['departments'][name]['members'],
+                    rollup['departments'][name]['defaulters'],
+                    rollup['departments'][name]['count'],
+                    _money(rollup['departments'][name]['total'])
+                ]
+                for name in names
+            ]
+        ))
+
+    # Detail tables
+    if section['top_contributors']:
+        story.append(Paragraph("Top Contributors", styles['Heading2']))
+        story.append(_table(
+            ['Name', 'Department', 'Amount'],
+            [[name, dept, _money(total)] for name, dept, total in section['top_contributors']]
+        ))
+    if section['birthdays']:
+        story.append(Paragraph("Birthdays This Month", styles['Heading2']))
+        story.append(_table(['Name', 'Birthday', 'Department'], [list(row) for row in section['birthdays']]))
+    if section['defaulter_list']:
+        story.append(Paragraph("Defaulters", styles['Heading2']))
+        story.append(_table(['Name', 'Department', 'Phone'], [list(row) for row in section['defaulter_list']]))
+
+    doc.build(story)
+    return output.getvalue()
@@ -0,0 +1,78 @@
+from datetime import datetime, time, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+DEFAULT_TIMEZONE = "UTC"
+DEFAULT_SLOTS = {"morning": "09:00", "afternoon": "14:00"}
+# A run this close to a slot's time, either side, belongs to that slot
+DEFAULT_WINDOW_MINUTES = 60
+
+def _parse_time(value):
+    if isinstance(value, time):
+        return value
+    hour, _, minute = str(value).partition(":")
+    return time(int(hour), int(minute or 0))
+
+class ReminderEngine:
+    """Decides which reminder slot a moment falls in, in the organisation's timezone
+
+    Slots are local wall-clock times such as {"morning": "09:00"}. The clock
+    returns an aware datetime (UTC by default), so the same decision is
+    made whatever timezone the host runs in.
+    """
+
+    def __init__(self, tz=DEFAULT_TIMEZONE, slots=None, window_minutes=DEFAULT_WINDOW_MINUTES, clock=None):
+        self.tz = ZoneInfo(tz) if isinstance(tz, str) else tz
+        self.slots = sorted(
+            ((name, _parse_time(at)) for name, at in (slots or DEFAULT_SLOTS).items()),
+            key=lambda slot: slot[1]
+        )
+        if not self.slots:
+            raise ValueError("At least one reminder slot is required")
+        self.window = timedelta(minutes=window_minutes)
+        self.clock = clock or (lambda: datetime.now(timezone.utc))
+
+    @property
+    def first_slot(self):
+        """The day's earliest slot, which also carries SMS"""
+        return self.slots[0][0]
+
+    def now(self):
+        """Get the current time in the organisation's timezone"""
+        return self.clock().astimezone(self.tz)
+
+    def slot_time(self, name, day):
+        """Get when a slot falls on a local date"""
+        return datetime.combine(day, dict(self.slots)[name], tzinfo=self.tz)
+
+    def current_slot(self, now=None):
+        """Get the name of the slot whose window contains now, or None"""
+        now = (now or self.now()).astimezone(timezone.utc)
+        local_day = now.astimezone(self.tz).date()
+        for name, _ in self.slots:
+            # A window can reach across midnight
+            for day in (local_day - timedelta(days=1), local_day, local_day + timedelta(days=1)):
+                start = self.slot_time(name, day).astimezone(timezone.utc)
+                if start - self.window <= now < start + self.window:
+                    return name
+        return None
+
+    def next_slot(self, now=None):
+        """Get the (name, local time) of the first slot after now"""
+        now = (now or self.now()).astimezone(self.tz)
+        for day in (now.date(), now.date() + timedelta(days=1)):
+            for name, _ in self.slots:
+                at = self.slot_time(name, day)
+                if at > now:
+                    return name, at
+        raise ValueError("No reminder slot in the next two days")
+
+    def cron(self, name):
+        """Get a slot as a daily cron expression"""
+        at = dict(self.slots)[name]
+        return f"{at.minute} {at.hour} * * *"
+
+    def describe(self):
+        """List the slots, e.g. "9:00 AM and 2:00 PM (Africa/Accra)" """
+        times = [at.strftime("%I:%M %p").lstrip("0") for _, at in self.slots]
+        listed = times[0] if len(times) == 1 else f"{', '.join(times[:-1])} and {times[-1]}"
+        return f"{listed} ({self.tz})"
@@ -0,0 +1,166 @@
+import calendar
+import heapq
+import multiprocessing
+import os
+import re
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date, datetime
+import streamlit as st
+from utils.database import (
+    get_data_version,
+    get_departments,
+    get_contribution_defaulters,
+    get_defaulters_by_department,
+    get_monthly_birthdays,
+    iter_contributions
+)
+from utils.export import cached_export
+from utils.pdf_render import render_report_pdf
+
+REPORT_WORKERS = min(4, os.cpu_count() or 1)
+TOP_CONTRIBUTORS = 10
+TRACKED_TABLES = ("contributions", "youth_members", "departments")
+
+def _empty_section(days):
+    return {
+        'total': 0.0,
+        'count': 0,
+        'contributors': 0,
+        'members': 0,
+        'defaulters': 0,
+        'by_type': {},
+        'by_day': [0.0] * days,
+        'top_contributors': [],
+        'birthdays': [],
+        'defaulter_list': []
+    }
+
+@st.cache_data(ttl=300, max_entries=16, show_spinner=False)
+def _build_rollup(version, month, year, contribution_type):
+    """Aggregate one month into plain per-department sections a worker can render"""
+    days = calendar.monthrange(year, month)[1]
+    start, end = date(year, month, 1), date(year, month, days)
+    department_names = {d['id']: d['name'] for d in get_departments()}
+    # Defaulters are tracked per type; fall back to birthday dues for "All"
+    defaulter_type = contribution_type if contribution_type != "All" else "BIRTHDAY"
+    overall = _empty_section(days)
+    sections = {}
+
+    # Contributions are streamed once, updating the overall and department sections
+    member_totals = {}
+    for batch in iter_contributions(contribution_type=contribution_type, start_date=start, end_date=end):
+        for c in batch:
+            department = department_names.get(c['youth_members'].get('department_id'), 'No Department')
+            amount = float(c['amount'] or 0)
+            day = int(str(c['payment_date'])[8:10])
+            for section in (overall, sections.setdefault(department, _empty_section(days))):
+                section['total'] += amount
+                section['count'] += 1
+                section['by_type'][c['contribution_type']] = section['by_type'].get(c['contribution_type'], 0.0) + amount
+                section['by_day'][day - 1] += amount
+            entry = member_totals.setdefault(c['member_id'], [c['youth_members']['full_name'], department, 0.0])
+            entry[2] += amount
+
+    by_department = {}
+    for name, department, total in member_totals.values():
+        by_department.setdefault(department, []).append((name, department, total))
+    overall['contributors'] = len(member_totals)
+    overall['top_contributors'] = heapq.nlargest(TOP_CONTRIBUTORS, [tuple(e) for e in member_totals.values()], key=lambda e: e[2])
+    for department, entries in by_department.items():
+        sections[department]['contributors'] = len(entries)
+        sections[department]['top_contributors'] = heapq.nlargest(TOP_CONTRIBUTORS, entries, key=lambda e: e[2])
+
+    for row in get_defaulters_by_department(month, year, defaulter_type):
+        section = sections.setdefault(row['department_name'], _empty_section(days))
+        section['members'] = row['member_count']
+        section['defaulters'] = row['defaulter_count']
+        overall['members'] += row['member_count']
+        overall['defaulters'] += row['defaulter_count']
+
+    for row in get_contribution_defaulters(month, year, defaulter_type):
+        entry = (row['full_name'], row['department_name'], row.get('phone_number') or '')
+        overall['defaulter_list'].append(entry)
+        sections.setdefault(row['department_name'], _empty_section(days))['defaulter_list'].append(entry)
+
+    birthdays = sorted(get_monthly_birthdays(month), key=lambda m: m['birthday'])
+    for member in birthdays:
+        department = (member.get('departments') or {}).get('name', 'No Department')
+        entry = (member['full_name'], member['birthday'], department)
+        overall['birthdays'].append(entry)
+        sections.setdefault(department, _empty_section(days))['birthdays'].append(entry)
+
+    return {
+        'period': start.strftime('%B %Y'),
+        'contribution_type': contribution_type,
+        'defaulter_type': defaulter_type,
+        'generated_at': datetime.now().strftime('%d %b %Y %H:%M'),
+        'overall': overall,
+        'departments': sections
+    }
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def _get_pool():
+    """Get the shared report worker pool, starting it on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Spawned workers don't inherit the web server's threads or sockets
+            _pool = ProcessPoolExecutor(
+                max_workers=REPORT_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _pool
+
+def _reset_pool():
+    """Drop a pool whose workers died so the next report starts a fresh one"""
+    global _pool
+    with _pool_lock:
+        _pool = None
+
+def _file_name(department):
+    return re.sub(r"[^\w\- ]", "_", department).strip() or "department"
+
+def get_monthly_report(month, year, contribution_type="All", department=None):
+    """Get the path of a monthly PDF report, rendering it in a worker process on a miss"""
+    version = get_data_version(*TRACKED_TABLES)
+
+    def write(path):
+        rollup = _build_rollup(version, month, year, contribution_type)
+        if department is not None and department not in rollup['departments']:
+            raise ValueError(f"No report data for {department}")
+        try:
+            pdf = _get_pool().submit(render_report_pdf, rollup, department).result()
+        except BrokenProcessPool:
+            _reset_pool()
+            raise
+        with open(path, "wb") as f:
+            f.write(pdf)
+
+    return cached_export("monthly_report", version, (year, month, contribution_type, department), ".pdf", write)
+
+def get_department_reports(month, year, contribution_type="All"):
+    """Get the path of a ZIP with the overall and every department's report, rendered in parallel"""
+    version = get_data_version(*TRACKED_TABLES)
+
+    def write(path):
+        rollup = _build_rollup(version, month, year, contribution_type)
+        try:
+            pool = _get_pool()
+            futures = {pool.submit(render_report_pdf, rollup): "All Departments"}
+            futures.update({
+                pool.submit(render_report_pdf, rollup, department): department
+                for department in rollup['departments']
+            })
+            with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+                for future in as_completed(futures):
+                    archive.writestr(f"{_file_name(futures[future])}.pdf", future.result())
+        except BrokenProcessPool:
+            _reset_pool()
+            raise
+
+    return cached_export("department_reports", version, (year, month, contribution_type), ".zip", write)
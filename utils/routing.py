@@ -0,0 +1,63 @@
+import streamlit as st
+
+class RoutingTable:
+    """Precomputed fan-out from (channel, department, window) to the recipients subscribed to it
+
+    A recipient without department_ids or windows hears about every
+    department or window; members without a known department are
+    routed under None.
+    """
+
+    def __init__(self, recipients, department_ids, horizon_days):
+        self.department_ids = set(department_ids)
+        self.delivery_modes = {}
+        routes = {}
+        every_department = list(self.department_ids) + [None]
+        every_window = range(horizon_days + 1)
+        for recipient in recipients:
+            for channel in recipient.get('channels') or ['email']:
+                address = recipient['email'] if channel == 'email' else recipient.get('phone_number')
+                if not address:
+                    continue
+                self.delivery_modes[address] = recipient.get('delivery_mode', 'digest')
+                for department_id in recipient.get('department_ids') or every_department:
+                    for days_until in recipient.get('windows') or every_window:
+                        routes.setdefault((channel, department_id, days_until), set()).add(address)
+        self._routes = {key: frozenset(addresses) for key, addresses in routes.items()}
+
+    def audience(self, channel, department_id, days_until):
+        """Get the addresses subscribed to a department's birthdays in a window"""
+        return self._routes.get((channel, department_id, days_until), frozenset())
+
+    def fan_out(self, windows, channel):
+        """Split windows into [(addresses, windows)] so recipients who see the same members share a message"""
+        # Members are grouped by (window, department) once; each group's audience is one lookup
+        groups = {}
+        for days_until, members in windows.items():
+            for member in members:
+                department_id = member.get('department_id')
+                if department_id not in self.department_ids:
+                    department_id = None
+                groups.setdefault((days_until, department_id), []).append(member)
+
+        # Groups are visited in the same order for everyone, so equal views give equal keys
+        views = {}
+        for key, members in groups.items():
+            for address in self.audience(channel, key[1], key[0]):
+                views.setdefault(address, []).append(key)
+        by_view = {}
+        for address, keys in views.items():
+            by_view.setdefault(tuple(keys), []).append(address)
+
+        fanned_out = []
+        for keys, addresses in by_view.items():
+            view = {}
+            for key in keys:
+                view.setdefault(key[0], []).extend(groups[key])
+            fanned_out.append((sorted(addresses), view))
+        return fanned_out
+
+@st.cache_resource(ttl=300, max_entries=4, show_spinner=False)
+def get_routing_table(_recipients, _departments, horizon_days, version):
+    """Get the routing table for the recipients and departments at a data version"""
+    return RoutingTable(_recipients, [d['id'] for d in _departments], horizon_days)
@@ -0,0 +1,232 @@
+import threading
+from contextlib import contextmanager
+from datetime import datetime, time, timedelta
+
+class CronSchedule:
+    """A five-field cron expression: minute, hour, day of month, month and day of week
+
+    Fields take *, numbers, ranges (1-5), lists (1,15) and steps (*/15);
+    day of week runs from 0 (Sunday) to 6, with 7 also meaning Sunday.
+    """
+    RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+
+    def __init__(self, expression):
+        self.expression = expression
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Expected 5 cron fields, got {len(fields)}: {expression!r}")
+        self.minutes, self.hours, self.days, self.months, weekdays = [
+            self._parse(field, low, high) for field, (low, high) in zip(fields, self.RANGES)
+        ]
+        self.weekdays = {day % 7 for day in weekdays}
+        # As in cron, a restricted day of month OR day of week matches when both are given
+        self._any_day = fields[2] == "*"
+        self._any_weekday = fields[4] == "*"
+
+    @staticmethod
+    def _parse(field, low, high):
+        values = set()
+        for part in field.split(","):
+            part, _, step = part.partition("/")
+            if part == "*":
+                start, end = low, high
+            elif "-" in part:
+                start, end = (int(v) for v in part.split("-", 1))
+            else:
+                start = int(part)
+                end = high if step else start
+            if start < low or end > high or start > end:
+                raise ValueError(f"Cron field {field!r} is outside {low}-{high}")
+            values.update(range(start, end + 1, int(step or 1)))
+        return sorted(values)
+
+    def _day_matches(self, day):
+        if day.month not in self.months:
+            return False
+        in_days = day.day in self.days
+        in_weekdays = (day.weekday() + 1) % 7 in self.weekdays
+        if self._any_day or self._any_weekday:
+            return in_days and in_weekdays
+        return in_days or in_weekdays
+
+    def next_after(self, moment):
+        """Get the first fire time strictly after moment"""
+        start = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        day = start.date()
+        # Five years covers schedules that only fire on 29 February
+        for _ in range(5 * 366):
+            if self._day_matches(day):
+                for hour in self.hours:
+                    for minute in self.minutes:
+                        candidate = datetime.combine(day, time(hour, minute), tzinfo=moment.tzinfo)
+                        if candidate >= start:
+                            return candidate
+            day += timedelta(days=1)
+        raise ValueError(f"Cron expression {self.expression!r} never fires")
+
+    def previous_before(self, moment):
+        """Get the latest fire time at or before moment"""
+        end = moment.replace(second=0, microsecond=0)
+        day = end.date()
+        for _ in range(5 * 366):
+            if self._day_matches(day):
+                for hour in reversed(self.hours):
+                    for minute in reversed(self.minutes):
+                        candidate = datetime.combine(day, time(hour, minute), tzinfo=moment.tzinfo)
+                        if candidate <= end:
+                            return candidate
+            day -= timedelta(days=1)
+        raise ValueError(f"Cron expression {self.expression!r} never fires")
+
+class Job:
+    """A named function fired on a cron schedule
+
+    A run missed by no more than misfire_grace (during downtime, say) is
+    caught up once; older ones are skipped.
+    """
+
+    def __init__(self, name, schedule, func, misfire_grace=timedelta(hours=1)):
+        self.name = name
+        self.schedule = CronSchedule(schedule)
+        self.func = func
+        self.misfire_grace = misfire_grace
+
+class Scheduler:
+    """Fire jobs from a background thread, each run under its own lease so one replica does it
+
+    Each job's last handled fire time is persisted through save_run, so a
+    restart knows what it missed. lease(name) returns a context manager
+    with .acquired, such as utils.locks.hold_lease; without one, nothing
+    is coordinated. The thread sleeps until the next fire time, but no
+    longer than a lease lasts, so a run a crashed replica held is retried.
+    """
+
+    def __init__(self, jobs, load_state, save_run, lease=None, lease_seconds=120, clock=datetime.now):
+        self.jobs = {job.name: job for job in jobs}
+        self.load_state = load_state
+        self.save_run = save_run
+        self.lease = lease
+        self.lease_seconds = lease_seconds
+        self.clock = clock
+        self._state = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _refresh_state(self):
+        try:
+            state = self.load_state()
+        except Exception as e:
+            print(f"Error loading scheduler state: {str(e)}")
+            return
+        # Show stored times in the clock's timezone
+        tz = self.clock().tzinfo
+        for run in state.values():
+            for key in ('last_fire_at', 'last_run_at'):
+                if tz is not None and run.get(key) is not None:
+                    run[key] = run[key].astimezone(tz)
+        with self._lock:
+            self._state.update(state)
+
+    def _record(self, job, fire_at, status, message=None):
+        run = {'last_fire_at': fire_at, 'last_run_at': self.clock(), 'last_status': status, 'last_message': message}
+        with self._lock:
+            self._state[job.name] = run
+        try:
+            self.save_run(job.name, **run)
+        except Exception as e:
+            print(f"Error saving scheduler state for {job.name}: {str(e)}")
+
+    def _handled(self, job, fire_at):
+        with self._lock:
+            last_fire_at = self._state.get(job.name, {}).get('last_fire_at')
+        return last_fire_at is not None and last_fire_at >= fire_at
+
+    @contextmanager
+    def _hold(self, job):
+        if self.lease is None:
+            yield True
+            return
+        with self.lease(f"job:{job.name}", self.lease_seconds) as lease:
+            yield lease.acquired
+
+    def run_pending(self, now=None):
+        """Run every job whose latest fire time hasn't been handled yet and return their names"""
+        now = now or self.clock()
+        ran = []
+        for job in self.jobs.values():
+            fire_at = job.schedule.previous_before(now)
+            if self._handled(job, fire_at):
+                continue
+            if now - fire_at > job.misfire_grace:
+                # Too late to be useful; remember it so it isn't reconsidered
+                self._record(job, fire_at, "skipped", f"Missed the {fire_at:%Y-%m-%d %H:%M} run")
+                continue
+            with self._hold(job) as acquired:
+                if not acquired:
+                    # Another replica is running it
+                    continue
+                if self.lease is not None:
+                    # It may have finished elsewhere since our last look
+                    self._refresh_state()
+                    if self._handled(job, fire_at):
+                        continue
+                try:
+                    result = job.func()
+                    self._record(job, fire_at, "ok", None if result is None else str(result))
+                except Exception as e:
+                    print(f"Scheduled job {job.name} failed: {str(e)}")
+                    self._record(job, fire_at, "failed", str(e))
+            ran.append(job.name)
+        return ran
+
+    def next_run_at(self, job_name, now=None):
+        """Get when a job fires next"""
+        return self.jobs[job_name].schedule.next_after(now or self.clock())
+
+    def status(self):
+        """Get each job's schedule, last run and next fire time"""
+        now = self.clock()
+        with self._lock:
+            state = dict(self._state)
+        return [
+            dict(
+                {'name': job.name, 'schedule': job.schedule.expression, 'next_run_at': job.schedule.next_after(now)},
+                **state.get(job.name, {'last_fire_at': None, 'last_run_at': None, 'last_status': None, 'last_message': None})
+            )
+            for job in self.jobs.values()
+        ]
+
+    def tick(self):
+        """Run what's due and return seconds until the next tick"""
+        if self.lease is not None:
+            # Other replicas may have run jobs since the last tick
+            self._refresh_state()
+        self.run_pending()
+
+        now = self.clock()
+        next_fire = min(job.schedule.next_after(now) for job in self.jobs.values())
+        return max(1.0, min((next_fire - now).total_seconds(), self.lease_seconds))
+
+    def run_forever(self):
+        """Tick until stopped"""
+        while not self._stop.is_set():
+            try:
+                wait = self.tick()
+            except Exception as e:
+                print(f"Scheduler tick failed: {str(e)}")
+                wait = 60
+            self._stop.wait(wait)
+
+    def start(self):
+        """Run in a background thread, unless one is already running"""
+        if self._thread is not None and self._thread.is_alive():
+            return self
+        self._refresh_state()
+        self._thread = threading.Thread(target=self.run_forever, name="scheduler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop after the current tick"""
+        self._stop.set()
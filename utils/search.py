@@ -0,0 +1,95 @@
+import re
+import unicodedata
+from collections import defaultdict
+import numpy as np
+import streamlit as st
+
+# Minimum share of the query's trigrams a member must contain to match,
+# same as pg_trgm's default word_similarity_threshold. A single typo in a
+# five letter name still scores 0.67.
+MIN_SCORE = 0.6
+
+def normalize_text(text):
+    """Lowercase, strip accents and collapse whitespace"""
+    if not text:
+        return ""
+    text = unicodedata.normalize("NFKD", str(text))
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return " ".join(text.lower().split())
+
+def normalize_phone(phone):
+    """Keep only the digits of a phone number"""
+    return re.sub(r"\D", "", str(phone)) if phone else ""
+
+def trigrams(text):
+    """Get pg_trgm style trigrams: each word padded with two leading spaces and one trailing"""
+    grams = set()
+    for word in re.split(r"[^0-9a-z]+", text):
+        if word:
+            padded = f"  {word} "
+            grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+def _member_trigrams(member):
+    grams = trigrams(normalize_text(member.get('full_name')))
+    grams |= trigrams(normalize_text(member.get('email')))
+    grams |= trigrams(normalize_phone(member.get('phone_number')))
+    return grams
+
+class MemberSearchIndex:
+    """In-memory trigram index over member name, email and normalized phone"""
+
+    def __init__(self, members):
+        self.members = list(members)
+        self._fields = [
+            (
+                normalize_text(m.get('full_name')),
+                normalize_text(m.get('email')),
+                normalize_phone(m.get('phone_number'))
+            )
+            for m in self.members
+        ]
+        postings = defaultdict(list)
+        for position, member in enumerate(self.members):
+            for gram in _member_trigrams(member):
+                postings[gram].append(position)
+        self._postings = {gram: np.array(ids, dtype=np.int32) for gram, ids in postings.items()}
+
+    def search(self, query, limit=50, min_score=MIN_SCORE):
+        """Get members ranked by how much of the query they contain, tolerating typos"""
+        text = normalize_text(query)
+        digits = normalize_phone(query)
+        # Treat queries that are mostly digits as phone numbers
+        if len(digits) >= 3 and len(digits) >= len(text.replace(" ", "")) - 2:
+            text = digits
+        query_grams = trigrams(text)
+        if not query_grams or not self.members:
+            return []
+
+        hits = [self._postings[g] for g in query_grams if g in self._postings]
+        if not hits:
+            return []
+        scores = np.bincount(np.concatenate(hits), minlength=len(self.members)) / len(query_grams)
+
+        candidates = np.nonzero(scores >= min_score)[0]
+        # Exact substring matches outrank fuzzy ones
+        ranked = sorted(
+            candidates.tolist(),
+            key=lambda i: (
+                not any(text in field for field in self._fields[i]),
+                -scores[i],
+                self._fields[i][0]
+            )
+        )
+        if limit is not None:
+            ranked = ranked[:limit]
+        return [self.members[i] for i in ranked]
+
+    def search_ids(self, query, limit=None, min_score=MIN_SCORE):
+        """Get the IDs of matching members, best match first"""
+        return [m['id'] for m in self.search(query, limit, min_score)]
+
+@st.cache_resource(ttl=300, max_entries=4, show_spinner=False)
+def get_member_search_index(_members, version):
+    """Get the search index for the cached member list at a data version"""
+    return MemberSearchIndex(_members or [])
@@ -0,0 +1,320 @@
+import hashlib
+import json
+import os
+import socket
+import sqlite3
+import tempfile
+import threading
+import time
+import zlib
+from urllib.parse import urlparse
+import streamlit as st
+
+# The same as the in-memory tier's, so edits made outside the app show up no later with it on
+DEFAULT_TTL_SECONDS = 5
+DEFAULT_POLL_SECONDS = 2.0
+COMPRESS_MIN_BYTES = 1024
+# Bumped when the value format changes, so old entries are never read back
+KEY_PREFIX = "bm:v1"
+VERSIONS_CHANNEL = "bm:versions"
+
+class SQLiteBackend:
+    """Cache entries and table versions in one SQLite file, shared by the processes on a host"""
+    name = "sqlite"
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(tempfile.gettempdir(), "birthday_management_cache.sqlite3")
+        self.scope = f"sqlite:{os.path.abspath(self.path)}"
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._local = threading.local()
+        db = self._db()
+        db.execute("pragma journal_mode=wal")
+        db.execute("create table if not exists entries (key text primary key, value blob not null, expires_at real not null)")
+        db.execute("create table if not exists versions (name text primary key, version integer not null)")
+
+    def _db(self):
+        # sqlite3 connections can't be shared between threads
+        if getattr(self._local, "db", None) is None:
+            self._local.db = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+        return self._local.db
+
+    def get(self, key):
+        row = self._db().execute("select value, expires_at from entries where key = ?", (key,)).fetchone()
+        return row[0] if row and row[1] > time.time() else None
+
+    def set(self, key, value, ttl):
+        db = self._db()
+        db.execute("insert or replace into entries (key, value, expires_at) values (?, ?, ?)", (key, value, time.time() + ttl))
+        # Expired entries are swept now and then rather than on every write
+        if hash(key) % 50 == 0:
+            db.execute("delete from entries where expires_at < ?", (time.time(),))
+
+    def versions(self, names):
+        names = list(names)
+        if not names:
+            return {}
+        rows = self._db().execute(
+            f"select name, version from versions where name in ({','.join('?' * len(names))})", names
+        ).fetchall()
+        return dict(rows)
+
+    def bump(self, names):
+        db = self._db()
+        db.execute("begin immediate")
+        try:
+            for name in names:
+                db.execute(
+                    "insert into versions (name, version) values (?, 1) "
+                    "on conflict (name) do update set version = version + 1", (name,)
+                )
+            bumped = self.versions(names)
+            db.execute("commit")
+        except Exception:
+            db.execute("rollback")
+            raise
+        return bumped
+
+class RESPConnection:
+    """A minimal client for the Redis protocol (RESP2)"""
+
+    def __init__(self, host, port, db=0, password=None, timeout=5.0):
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.reader = self.sock.makefile("rb")
+        if password:
+            self.command("AUTH", password)
+        if db:
+            self.command("SELECT", db)
+
+    def send(self, *args):
+        parts = [f"*{len(args)}\r\n".encode()]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode("utf-8")
+            parts.append(f"${len(data)}\r\n".encode() + data + b"\r\n")
+        self.sock.sendall(b"".join(parts))
+
+    def read(self):
+        line = self.reader.readline()
+        if not line:
+            raise ConnectionError("Cache server closed the connection")
+        kind, rest = line[:1], line[1:-2]
+        if kind == b"+":
+            return rest.decode()
+        if kind == b"-":
+            raise RuntimeError(rest.decode())
+        if kind == b":":
+            return int(rest)
+        if kind == b"$":
+            length = int(rest)
+            if length < 0:
+                return None
+            data = self.reader.read(length + 2)
+            return data[:-2]
+        if kind == b"*":
+            length = int(rest)
+            return None if length < 0 else [self.read() for _ in range(length)]
+        raise ConnectionError(f"Unexpected reply from cache server: {line!r}")
+
+    def command(self, *args):
+        self.send(*args)
+        return self.read()
+
+    def close(self):
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+
+class RedisBackend:
+    """Cache entries and table versions in Redis, or anything that speaks its protocol
+
+    Version bumps are published, so listeners hear about them at once
+    instead of on their next poll.
+    """
+    name = "redis"
+
+    def __init__(self, url="redis://localhost:6379/0"):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.db = int(parsed.path.strip("/") or 0)
+        self.password = parsed.password
+        self.scope = f"redis:{self.host}:{self.port}/{self.db}"
+        self._local = threading.local()
+
+    def _connect(self):
+        return RESPConnection(self.host, self.port, self.db, self.password)
+
+    def _command(self, *args):
+        # One connection per thread; a dropped one is replaced once
+        for attempt in range(2):
+            connection = getattr(self._local, "connection", None)
+            try:
+                if connection is None:
+                    connection = self._local.connection = self._connect()
+                return connection.command(*args)
+            except (OSError, ConnectionError):
+                if connection is not None:
+                    connection.close()
+                self._local.connection = None
+                if attempt:
+                    raise
+
+    def get(self, key):
+        return self._command("GET", key)
+
+    def set(self, key, value, ttl):
+        self._command("SET", key, value, "EX", max(1, int(ttl)))
+
+    def versions(self, names):
+        names = list(names)
+        if not names:
+            return {}
+        values = self._command("MGET", *[f"{KEY_PREFIX}:version:{name}" for name in names])
+        return {name: int(value) for name, value in zip(names, values) if value is not None}
+
+    def bump(self, names):
+        bumped = {name: self._command("INCR", f"{KEY_PREFIX}:version:{name}") for name in names}
+        self._command("PUBLISH", VERSIONS_CHANNEL, json.dumps(bumped))
+        return bumped
+
+    def listen(self, callback):
+        """Call callback({table: version}) for every bump from any replica, reconnecting as needed"""
+        def run():
+            while True:
+                connection = None
+                try:
+                    connection = self._connect()
+                    connection.sock.settimeout(None)
+                    connection.command("SUBSCRIBE", VERSIONS_CHANNEL)
+                    while True:
+                        kind, _, data = connection.read()
+                        if kind == b"message":
+                            callback(json.loads(data))
+                except Exception as e:
+                    print(f"Cache version subscription dropped: {str(e)}")
+                finally:
+                    if connection is not None:
+                        connection.close()
+                time.sleep(5)
+
+        threading.Thread(target=run, name="cache-versions", daemon=True).start()
+
+class SharedCache:
+    """The cache tier replicas share: compressed JSON values under versioned keys, plus the table versions
+
+    Keys include the data version of the tables a value was read from, so
+    a write on any replica retires the old entries by bumping the version;
+    nothing is ever cleared. Backend errors count as misses.
+    """
+
+    def __init__(self, backend, ttl=DEFAULT_TTL_SECONDS, poll_seconds=DEFAULT_POLL_SECONDS, compress_min_bytes=COMPRESS_MIN_BYTES):
+        self.backend = backend
+        self.ttl = ttl
+        self.poll_seconds = poll_seconds
+        self.compress_min_bytes = compress_min_bytes
+        self.hits = 0
+        self.misses = 0
+        self._listening = False
+
+    def key(self, name, args):
+        """Build the key for a fetch and its arguments, the data version among them"""
+        digest = hashlib.sha1(json.dumps(args, default=str).encode("utf-8")).hexdigest()
+        return f"{KEY_PREFIX}:{name}:{digest}"
+
+    def _encode(self, value):
+        data = json.dumps(value, separators=(",", ":"), default=str).encode("utf-8")
+        if len(data) >= self.compress_min_bytes:
+            return b"z" + zlib.compress(data)
+        return b"j" + data
+
+    def _decode(self, raw):
+        data = zlib.decompress(raw[1:]) if raw[:1] == b"z" else raw[1:]
+        return json.loads(data)
+
+    def get(self, key):
+        """Get a cached value, or None on a miss"""
+        try:
+            raw = self.backend.get(key)
+        except Exception as e:
+            print(f"Error reading shared cache: {str(e)}")
+            raw = None
+        if raw is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return self._decode(raw)
+
+    def set(self, key, value):
+        """Store a JSON-serialisable value for the ttl"""
+        try:
+            self.backend.set(key, self._encode(value), self.ttl)
+        except Exception as e:
+            print(f"Error writing shared cache: {str(e)}")
+
+    def versions(self, names):
+        """Get the shared versions of tables, or None if the backend can't be reached"""
+        try:
+            return self.backend.versions(names)
+        except Exception as e:
+            print(f"Error reading shared data versions: {str(e)}")
+            return None
+
+    def bump(self, names):
+        """Increment tables' shared versions and return them, or None if the backend can't be reached"""
+        try:
+            return self.backend.bump(names)
+        except Exception as e:
+            print(f"Error bumping shared data versions: {str(e)}")
+            return None
+
+    def listen(self, callback):
+        """Have callback({table: version}) hear every bump as it happens, if the backend can push"""
+        if not self._listening and hasattr(self.backend, "listen"):
+            self._listening = True
+            self.backend.listen(callback)
+
+_cache = None
+_cache_configured = False
+_cache_lock = threading.Lock()
+
+def _cache_from_settings(settings):
+    backend = settings.get("backend", "none")
+    if backend == "sqlite":
+        store = SQLiteBackend(settings.get("path"))
+    elif backend == "redis":
+        store = RedisBackend(settings.get("url", "redis://localhost:6379/0"))
+    elif backend == "none":
+        return None
+    else:
+        raise ValueError(f"Unknown cache backend {backend!r}")
+    return SharedCache(
+        store,
+        int(settings.get("ttl_seconds", DEFAULT_TTL_SECONDS)),
+        float(settings.get("poll_seconds", DEFAULT_POLL_SECONDS)),
+        int(settings.get("compress_min_bytes", COMPRESS_MIN_BYTES))
+    )
+
+def configure_shared_cache(settings=None):
+    """Set up the shared tier from settings like the [cache] secrets, e.g. from a script; None turns it off"""
+    global _cache, _cache_configured
+    with _cache_lock:
+        _cache = _cache_from_settings(settings or {})
+        _cache_configured = True
+        return _cache
+
+def get_shared_cache():
+    """Get the shared cache tier from the [cache] secrets, or None when it's off"""
+    global _cache, _cache_configured
+    with _cache_lock:
+        if not _cache_configured:
+            try:
+                settings = dict(st.secrets["cache"])
+            except Exception:
+                settings = {}
+            try:
+                _cache = _cache_from_settings(settings)
+            except Exception as e:
+                print(f"Shared cache unavailable: {str(e)}")
+                _cache = None
+            _cache_configured = True
+        return _cache
@@ -0,0 +1,173 @@
+import argparse
+import os
+import random
+import socketserver
+import threading
+import time
+from datetime import datetime
+
+class _SinkHandler(socketserver.StreamRequestHandler):
+    """Speak just enough SMTP for smtplib: EHLO, AUTH, MAIL, RCPT, DATA, RSET, NOOP and QUIT"""
+
+    def reply(self, line):
+        self.wfile.write(line.encode("ascii") + b"\r\n")
+
+    def readline(self):
+        return self.rfile.readline().decode("utf-8", "replace").rstrip("\r\n")
+
+    def handle(self):
+        sink = self.server.sink
+        mail_from, rcpt_tos = None, []
+        self.reply("220 localhost birthday reminder SMTP sink")
+        while True:
+            line = self.readline()
+            command = line[:4].upper()
+
+            if command == "EHLO":
+                self.reply("250-localhost")
+                self.reply("250-AUTH PLAIN LOGIN")
+                self.reply("250-8BITMIME")
+                self.reply("250 SMTPUTF8")
+            elif command == "HELO":
+                self.reply("250 localhost")
+            elif command == "AUTH":
+                # Any credentials are accepted
+                parts = line.split()
+                if len(parts) == 2 and parts[1].upper() == "LOGIN":
+                    self.reply("334 VXNlcm5hbWU6")
+                    self.readline()
+                    self.reply("334 UGFzc3dvcmQ6")
+                    self.readline()
+                elif len(parts) == 2:
+                    self.reply("334 ")
+                    self.readline()
+                self.reply("235 2.7.0 Authentication successful")
+            elif command == "MAIL":
+                mail_from, rcpt_tos = line.split(":", 1)[1].split()[0].strip("<>"), []
+                self.reply("250 OK")
+            elif command == "RCPT":
+                rcpt_tos.append(line.split(":", 1)[1].split()[0].strip("<>"))
+                self.reply("250 OK")
+            elif command == "DATA":
+                if not rcpt_tos:
+                    self.reply("503 5.5.1 Need RCPT first")
+                    continue
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                lines = []
+                while True:
+                    data_line = self.rfile.readline()
+                    if not data_line or data_line in (b".\r\n", b".\n"):
+                        break
+                    # Undo dot-stuffing
+                    lines.append(data_line[1:] if data_line.startswith(b"..") else data_line)
+                outcome = sink.receive(mail_from, rcpt_tos, b"".join(lines))
+                if outcome == "drop":
+                    return
+                if outcome == "fail":
+                    self.reply("451 4.3.0 Injected temporary failure")
+                else:
+                    self.reply("250 OK: queued")
+                mail_from, rcpt_tos = None, []
+            elif command == "RSET":
+                mail_from, rcpt_tos = None, []
+                self.reply("250 OK")
+            elif command == "NOOP":
+                self.reply("250 OK")
+            elif command == "QUIT":
+                self.reply("221 Bye")
+                return
+            elif not line:
+                return
+            else:
+                self.reply("502 5.5.2 Command not implemented")
+
+class _SinkServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+class SMTPSink:
+    """Local SMTP server that accepts every message and keeps it in memory and/or on disk
+
+    Delays and failures can be injected to exercise the dispatcher:
+    latency seconds before each reply to DATA, fail_rate of messages
+    answered with a 451, and drop_rate of connections closed mid-send.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, store_dir=None, keep_in_memory=True,
+                 latency=0.0, fail_rate=0.0, drop_rate=0.0, seed=None):
+        self.store_dir = store_dir
+        self.keep_in_memory = keep_in_memory
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.drop_rate = drop_rate
+        self.messages = []
+        self.received = 0
+        self.failed = 0
+        self.dropped = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = _SinkServer((host, port), _SinkHandler)
+        self._server.sink = self
+        self.host, self.port = self._server.server_address[:2]
+        self._thread = None
+        if store_dir:
+            os.makedirs(store_dir, exist_ok=True)
+
+    def receive(self, mail_from, rcpt_tos, data):
+        """Store one message, or return "fail" or "drop" for an injected fault"""
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            roll = self._random.random()
+            if roll < self.drop_rate:
+                self.dropped += 1
+                return "drop"
+            if roll < self.drop_rate + self.fail_rate:
+                self.failed += 1
+                return "fail"
+            self.received += 1
+            number = self.received
+            if self.keep_in_memory:
+                self.messages.append({
+                    'mail_from': mail_from,
+                    'rcpt_tos': list(rcpt_tos),
+                    'data': data,
+                    'received_at': datetime.now()
+                })
+        if self.store_dir:
+            name = f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{number:06d}.eml"
+            with open(os.path.join(self.store_dir, name), "wb") as f:
+                f.write(data)
+        return "ok"
+
+    def start(self):
+        """Serve in a background thread"""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving and release the port"""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def stats(self):
+        """Get counts of received, failed and dropped messages"""
+        with self._lock:
+            return {"received": self.received, "failed": self.failed, "dropped": self.dropped}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a local SMTP sink that saves every message as a .eml file")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8025)
+    parser.add_argument("--dir", default="sent_mail", help="Where to write received messages")
+    args = parser.parse_args()
+
+    sink = SMTPSink(args.host, args.port, store_dir=args.dir, keep_in_memory=False)
+    print(f"SMTP sink listening on {sink.host}:{sink.port}, writing to {args.dir}")
+    sink.start()
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        sink.stop()
@@ -0,0 +1,145 @@
+import html
+from functools import lru_cache
+from string import Formatter
+
+class Safe(str):
+    """Text that is already HTML, such as a rendered fragment, and must not be escaped again"""
+
+class CompiledTemplate:
+    """A str.format style template split into literal and field parts once, up front
+
+    Rendering walks the parts and joins them, escaping every value that
+    isn't Safe when the template is HTML.
+    """
+
+    def __init__(self, source, escape=True):
+        self.escape = escape
+        self._parts = [(literal, field) for literal, field, _, _ in Formatter().parse(source)]
+
+    def render_iter(self, **values):
+        """Yield the rendered template chunk by chunk"""
+        for literal, field in self._parts:
+            if literal:
+                yield literal
+            if field is not None:
+                value = values[field]
+                if self.escape and not isinstance(value, Safe):
+                    value = html.escape(str(value))
+                yield str(value)
+
+    def render(self, **values):
+        """Render the template to a single string"""
+        rendered = "".join(self.render_iter(**values))
+        return Safe(rendered) if self.escape else rendered
+
+def html_template(source):
+    """Compile an HTML template whose values are escaped"""
+    return CompiledTemplate(source, escape=True)
+
+def text_template(source):
+    """Compile a plain-text template"""
+    return CompiledTemplate(source, escape=False)
+
+# Shared by single-window reminders and digests
+MEMBER_HTML = html_template("""
+            <div style="margin-bottom: 15px; padding: 10px; background-color: white; border-radius: 5px;">
+                <h3 style="margin: 0; color: #4c1d95;">👤 {name}</h3>
+                <p style="margin: 5px 0; color: #1e1b4b;">
+                    📅 Birthday: {birthday}<br>
+                    🏢 Department: {department}
+                </p>
+            </div>""")
+MEMBER_TEXT = text_template("  - {name} ({birthday}, {department})\n")
+
+REMINDER_HTML = html_template("""
+    <html>
+    <body style="font-family: Arial, sans-serif;">
+        <h2>{header}</h2>
+        <p>{intro}</p>
+        <div style="background-color: #f8f9fa; padding: 15px; border-radius: 5px;">{members}
+        </div>
+        <p style="color: #666; font-size: 0.9em;">
+            Sent on: {sent_on} ({time_of_day} reminder)
+        </p>
+    </body>
+    </html>
+    """)
+REMINDER_TEXT = text_template("{header}\n\n{intro}\n\n{members}\nSent on: {sent_on} ({time_of_day} reminder)\n")
+
+DIGEST_SECTION_HTML = html_template("""
+        <h3 style="margin: 15px 0 5px; color: #1e1b4b;">{label}</h3>
+        <div style="background-color: #f8f9fa; padding: 15px; border-radius: 5px;">{members}
+        </div>""")
+DIGEST_SECTION_TEXT = text_template("{label}\n{members}\n")
+
+DIGEST_HTML = html_template("""
+    <html>
+    <body style="font-family: Arial, sans-serif;">
+        <h2>🎂 Birthday Digest</h2>
+        <p>This is your {time_of_day} summary of upcoming birthdays:</p>{sections}
+        <p style="color: #666; font-size: 0.9em;">
+            Sent on: {sent_on} ({time_of_day} reminder)
+        </p>
+    </body>
+    </html>
+    """)
+DIGEST_TEXT = text_template("Birthday Digest\n\nThis is your {time_of_day} summary of upcoming birthdays:\n\n{sections}Sent on: {sent_on} ({time_of_day} reminder)\n")
+
+TEST_HTML = html_template("""
+    <html>
+    <body style="font-family: Arial, sans-serif;">
+        <h2>🎂 Birthday Notification Test</h2>
+        <p>This is a test email from your Birthday Reminder System.</p>
+        <p>The following member would be notified if it were their birthday:</p>
+        <div style="padding: 15px; background-color: #f8f9fa; border-radius: 5px; margin: 10px 0;">
+            <p><strong>Name:</strong> {name}</p>
+            <p><strong>Birthday:</strong> {birthday}</p>
+            <p><strong>Department:</strong> {department}</p>
+        </div>
+        <p>If you received this email, your notification system is working correctly! 🎉</p>
+        <p>Best regards,<br>Birthday Reminder System</p>
+    </body>
+    </html>
+    """)
+TEST_TEXT = text_template(
+    "Birthday Notification Test\n\n"
+    "This is a test email from your Birthday Reminder System.\n"
+    "The following member would be notified if it were their birthday:\n\n"
+    "  Name: {name}\n  Birthday: {birthday}\n  Department: {department}\n\n"
+    "If you received this email, your notification system is working correctly!\n"
+)
+
+PAYMENT_REMINDER_HTML = html_template("""
+    <html>
+    <body style="font-family: Arial, sans-serif;">
+        <h2>💰 Contribution Reminder</h2>
+        <p>Dear {name},</p>
+        <p>Our records show no {contribution_type} contribution from you for {period} yet.
+        If you have already paid, please let your department leader know so we can update our records.</p>
+        <p>Thank you for your support!</p>
+        <p style="color: #666; font-size: 0.9em;">{department} &middot; Sent on: {sent_on}</p>
+    </body>
+    </html>
+    """)
+PAYMENT_REMINDER_TEXT = text_template(
+    "Dear {name},\n\n"
+    "Our records show no {contribution_type} contribution from you for {period} yet. "
+    "If you have already paid, please let your department leader know so we can update our records.\n\n"
+    "Thank you for your support!\n"
+)
+PAYMENT_REMINDER_SMS = text_template(
+    "Dear {name}, a friendly reminder that your {contribution_type} contribution for {period} is outstanding. Thank you!"
+)
+
+@lru_cache(maxsize=4096)
+def render_member(name, birthday, department):
+    """Render a member's HTML and text fragments, reused across windows and emails"""
+    return (
+        MEMBER_HTML.render(name=name, birthday=birthday, department=department),
+        MEMBER_TEXT.render(name=name, birthday=birthday, department=department)
+    )
+
+def render_members(members):
+    """Join the cached fragments of a list of member dicts"""
+    fragments = [render_member(m['name'], m['birthday'], m['department']) for m in members]
+    return Safe("".join(f[0] for f in fragments)), "".join(f[1] for f in fragments)